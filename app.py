@@ -1,10 +1,13 @@
 import ctypes
+import multiprocessing
 
 from win10toast import ToastNotifier
 
 from exceptions.surplus_lines import OutputDirNotSet
 from helper import TRAY_ICON, open_config
 from interface import SurplusLinesAutomator
+from model.doc.locator import shutdown_locator
+from model.web.pool import shutdown_pool
 from model.registrations import (
     process_save,
     process_retrieval,
@@ -18,11 +21,6 @@ from view.tray_icon import TrayIcon
 from exceptions import surplus_lines as exceptions
 
 
-palette = BlueRose()
-sl_view = View(view_palette=palette)
-interface = SurplusLinesAutomator()
-
-
 class Presenter:
     def __init__(self, view: View) -> None:
         self.view = view
@@ -37,6 +35,8 @@ class Presenter:
             return False
 
     def stop_program(self):
+        shutdown_pool()
+        shutdown_locator()
         self.view.root.destroy()
 
     def process_SL_doc(self, event, producer_template: str):  # used by view
@@ -127,10 +127,17 @@ class Presenter:
 
 
 if __name__ == "__main__":
+    # The Kemah page locator can run on worker processes. Those re-import this module,  so the
+    # window and automator are only built here,  and a frozen build needs freeze_support() first.
+    multiprocessing.freeze_support()
+    palette = BlueRose()
+    sl_view = View(view_palette=palette)
+    interface = SurplusLinesAutomator()
     presenter = Presenter(view=sl_view)
     tray_icon = TrayIcon(presenter=presenter)
     thread1 = tray_icon.create_icon(src_icon=str(TRAY_ICON))
     thread1.start()
+    interface.prewarm()
 
     output_dir = interface.output_dir()
     with_initial_option = ["Choose a template"]
@@ -0,0 +1,213 @@
+"""Parses a folder of carrier PDFs in one go,  writing one JSON line per file: the Carrier's fields,
+or the error that stopped it. Nothing is stamped and nobody is asked anything.
+
+    python batch.py path/to/pdfs
+    python batch.py path/to/pdfs --recursive --workers 4 --output month_end.jsonl
+    python batch.py path/to/pdfs --override-not-applicable
+
+Files are parsed on a pool of worker processes and each line is written as soon as its file is done,
+so lines come in the order files finish. A summary with the throughput goes to stderr at the end.
+A file that kills its worker process breaks the pool: the files lost with it are parsed again on a
+new pool,  and one caught in ISOLATE_AFTER broken pools gets a pool of its own to tell whether it's
+the file to blame,  which is then recorded as failed.
+Docs that don't look like they need a stamp are reported as errors,  unless --override-not-applicable
+is given,  in which case they're parsed anyway (what answering "Retry" to the prompt does).
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, TextIO
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from model.doc.locator import PageLocator, set_locator
+from model.doc.parser import DocParser
+from model.doc.session import DocSession
+from model.doc.text_cache import get_text_cache
+
+
+log = logging.getLogger(__name__)
+
+# Broken pools a file can be lost with before it's parsed on a pool of its own.
+ISOLATE_AFTER = 2
+
+
+def pdfs_in(directory: Path, recursive: bool = False) -> list[Path]:
+    paths = directory.rglob("*") if recursive else directory.iterdir()
+    return sorted(path for path in paths if path.is_file() and path.suffix.lower() == ".pdf")
+
+
+def failed(pdf_path: Path, error: Exception, seconds: float = 0.0) -> dict:
+    "The record of a file that couldn't be parsed."
+    return {
+        "file": str(pdf_path),
+        "ok": False,
+        "error": {"type": type(error).__name__, "message": str(error)},
+        "seconds": round(seconds, 4),
+    }
+
+
+def parse_file(pdf_path: Path, override_not_applicable: bool = False) -> dict:
+    "Parses one PDF into a JSON-ready record. Never raises: a failure is recorded with its error."
+    start = time.perf_counter()
+    record = {"file": str(pdf_path)}
+    try:
+        with DocSession(pdf_path, cache=get_text_cache()) as session:
+            parser = DocParser(pdf_path=pdf_path, session=session)
+            market, trans_type = parser.build_market_class(
+                pdf_path, override_not_applicable=override_not_applicable
+            )
+            carrier = market.build(pdf_path)
+    except Exception as e:
+        log.debug(
+            msg="Failed to parse {0}.".format(pdf_path),
+            exc_info=1,
+        )
+        record.update(failed(pdf_path, e))
+    else:
+        record["ok"] = True
+        record["transaction_type"] = trans_type
+        record["carrier"] = {**asdict(carrier), "pdf_path": str(carrier.pdf_path)}
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _init_worker(log_level: int) -> None:
+    logging.basicConfig(level=log_level, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    # The batch already runs a process per file,  so the Kemah page search stays in-process.
+    set_locator(PageLocator(workers=0))
+
+
+def _parse_on_pool(
+    files: list[Path],
+    workers: int,
+    override_not_applicable: bool,
+    log_level: int,
+    write,
+) -> list[Path]:
+    """Parses the files on a new pool,  writing each record as it's done. Returns the files lost when a
+    worker process died and broke the pool."""
+    lost = []
+    submitted = {}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(log_level,)
+    ) as pool:
+        futures = {}
+        for path in files:
+            try:
+                futures[pool.submit(parse_file, path, override_not_applicable)] = path
+            except BrokenProcessPool:
+                lost.append(path)
+                continue
+            submitted[path] = time.perf_counter()
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                lost.append(path)
+                continue
+            except Exception as e:
+                log.warning(
+                    msg="Couldn't get {0}'s record back from its worker.".format(path),
+                    exc_info=1,
+                )
+                record = failed(path, e, time.perf_counter() - submitted[path])
+            write(record)
+    return lost
+
+
+def run(
+    files: Iterable[Path],
+    out: TextIO,
+    workers: int = None,
+    override_not_applicable: bool = False,
+    log_level: int = logging.ERROR,
+) -> dict:
+    "Parses the files,  writing each record to `out` as it's done. Returns the summary."
+    files = list(files)
+    workers = workers or os.cpu_count() or 1
+    counts = {"parsed": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def write(record: dict) -> None:
+        counts["parsed" if record["ok"] else "failed"] += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    if workers == 1:
+        _init_worker(log_level)
+        for path in files:
+            write(parse_file(path, override_not_applicable))
+    else:
+        strikes = dict.fromkeys(files, 0)
+        pending = files
+        while pending:
+            lost = _parse_on_pool(pending, workers, override_not_applicable, log_level, write)
+            if lost:
+                log.warning(
+                    msg="A worker process died, {0} file(s) were lost with its pool.".format(len(lost)),
+                )
+            pending = []
+            for path in lost:
+                strikes[path] += 1
+                if strikes[path] < ISOLATE_AFTER:
+                    pending.append(path)
+                elif _parse_on_pool([path], 1, override_not_applicable, log_level, write):
+                    write(failed(path, BrokenProcessPool("A worker process died parsing this file.")))
+    seconds = time.perf_counter() - start
+    return {
+        "files": len(files),
+        **counts,
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "files_per_second": round(len(files) / seconds, 2) if seconds else 0.0,
+    }
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse a folder of carrier PDFs into JSON lines.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--recursive", action="store_true", help="include PDFs in subfolders")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: CPU count)")
+    parser.add_argument("--output", type=Path, help="write the JSON lines here instead of stdout")
+    parser.add_argument(
+        "--override-not-applicable",
+        action="store_true",
+        help="parse docs that don't look like they need a stamp instead of reporting them",
+    )
+    parser.add_argument("--log-level", default="ERROR", help="log level for stderr (default: ERROR)")
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        parser.error("{0} is not a folder".format(args.directory))
+    files = pdfs_in(args.directory, args.recursive)
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run(
+            files,
+            out,
+            workers=args.workers,
+            override_not_applicable=args.override_not_applicable,
+            log_level=getattr(logging, args.log_level.upper()),
+        )
+    finally:
+        if args.output:
+            out.close()
+    print(
+        "Parsed {parsed} of {files} file(s), {failed} failed, in {seconds} s on {workers} "
+        "process(es): {files_per_second} files/s.".format(**summary),
+        file=sys.stderr,
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Compares model.carriers.dates.find_date with datefinder on effective-date blocks as the carriers
+print them: import time,  time per block (cold and with find_date's cache warm) and whether the two
+agree on each block.
+
+    python -m benchmarks.dates
+    python -m benchmarks.dates --repeat 200 --output dates.json
+"""
+import argparse
+import platform
+import subprocess
+import sys
+
+import datefinder
+
+from benchmarks.stats import summarize, timed, write_report
+from model.carriers.dates import find_date
+
+# (carrier formats,  block,  the date the block means)
+CORPUS = [
+    (("day_month_year",), "From 00.01 1 March 2024 to 00.01 1 March 2025 Local Standard Time", "2024-03-01"),
+    (("day_month_year",), "12 November 2023", "2023-11-12"),
+    (("day_month_year",), "It is hereby noted and agreed that with effect from 2 April 2024 the cover hereunder is cancelled.", "2024-04-02"),
+    (("day_month_year",), "with effect from 15 Jan 2024, Additional Premium US$ 350.00", "2024-01-15"),
+    (("month_day_year",), "January 5, 2024", "2024-01-05"),
+    (("month_day_year",), "Quote valid 60 days from December 12, 2023", "2023-12-12"),
+    (("day_month_year",), "05 Jan 2024 at 12:01 AM Standard Time at the address of the Named Insured", "2024-01-05"),
+    (("day_month_year",), "28 Feb 2024 at 12:01 AM", "2024-02-28"),
+    (("numeric_mdy", "month_day_year"), "3/4/2024", "2024-03-04"),
+    (("numeric_mdy", "month_day_year"), "Date: 11/30/2023 Agent: 0042 Page 1 of 3", "2023-11-30"),
+    (("numeric_mdy", "month_day_year"), "Endorsement Effective: 06/01/2024 12:01 AM", "2024-06-01"),
+    (("numeric_mdy", "month_day_year"), "Policy Period: 04/15/2024 to 04/15/2025", "2024-04-15"),
+]
+
+
+def import_seconds(module: str) -> float:
+    "How long importing the module takes in a fresh interpreter."
+    code = "import time; s = time.perf_counter(); import {0}; print(time.perf_counter() - s)".format(module)
+    return float(subprocess.check_output([sys.executable, "-c", code], text=True))
+
+
+def first_datefinder(text: str):
+    for found in datefinder.find_dates(text):
+        return found
+    return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    timings = {"datefinder": [], "find_date_cold": [], "find_date_cached": []}
+    for _ in range(args.repeat):
+        for formats, text, _expected in CORPUS:
+            with timed(timings["datefinder"]):
+                first_datefinder(text)
+            find_date.cache_clear()
+            with timed(timings["find_date_cold"]):
+                find_date(text, formats)
+            with timed(timings["find_date_cached"]):
+                find_date(text, formats)
+    blocks = []
+    for formats, text, expected in CORPUS:
+        by_datefinder = first_datefinder(text)
+        by_find_date = find_date(text, formats)
+        blocks.append({
+            "block": text,
+            "expected": expected,
+            "datefinder": by_datefinder.date().isoformat() if by_datefinder else None,
+            "find_date": by_find_date.date().isoformat() if by_find_date else None,
+        })
+    return {
+        "settings": {
+            "blocks": len(CORPUS),
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "import_ms": {
+            "datefinder": round(import_seconds("datefinder") * 1000, 1),
+            "model.carriers.dates": round(import_seconds("model.carriers.dates") * 1000, 1),
+        },
+        "correct": {
+            "datefinder": sum(block["datefinder"] == block["expected"] for block in blocks),
+            "find_date": sum(block["find_date"] == block["expected"] for block in blocks),
+        },
+        **{name: summarize(samples) for name, samples in timings.items()},
+        "blocks": blocks,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark effective-date parsing against datefinder.")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
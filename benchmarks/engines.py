@@ -0,0 +1,101 @@
+"""Compares the browser engines on this host: cold launch time,  per-call latency and the resident memory
+of the browser and everything it spawned,  all against the local stand-in.
+
+    python -m benchmarks.engines
+    python -m benchmarks.engines --engines edge firefox --payloads 100 --latency 0.1
+    python -m benchmarks.engines --scripted --wait eager --output engines.json
+
+An engine that can't be launched here (not installed,  no driver) is reported with its error instead
+of stopping the run,  so the same command works on every host.
+"""
+import argparse
+import platform
+
+from benchmarks.scraper import make_payloads
+from benchmarks.stats import summarize, timed, write_report
+from model.web.engines import ENGINES
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+from model.web.stand_in import StandInServer
+
+
+def measure(engine: str, uri: str, args: argparse.Namespace) -> dict:
+    pool = DriverPool(launcher=None, size=1, max_calls=0)
+    driver = Driver(
+        pool=pool,
+        eager=args.wait == "eager",
+        scripted=args.scripted,
+        block_requests=args.lean,
+        lean_profile=args.lean,
+        report_page_weight=False,
+        engine=engine,
+    )
+    pool.launcher = driver.launch_browser
+    launch, call, rss = [], [], []
+    try:
+        for _ in range(args.launches):
+            with timed(launch):
+                session = pool.checkout()
+            pool.checkin(session, discard=True, count=False)
+        for i, payload in enumerate(make_payloads(args.warmup + args.payloads, uri, seed=args.seed)):
+            with timed(call):
+                driver.send_call(payload)
+                driver.get_response()
+            rss.append(driver.session.memory_mb())
+            driver.close()
+            if i < args.warmup:
+                call.pop()
+                rss.pop()
+    finally:
+        pool.close()
+    return {
+        "launch": summarize(launch),
+        "call": summarize(call),
+        "rss_mb": {
+            "mean": round(sum(rss) / len(rss), 1) if rss else 0.0,
+            "max": round(max(rss), 1) if rss else 0.0,
+        },
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    results = {}
+    with StandInServer(latency=args.latency, jitter=args.jitter) as server:
+        for engine in args.engines:
+            try:
+                results[engine] = measure(engine, server.uri, args)
+            except Exception as e:
+                results[engine] = {"error": "{0}: {1}".format(type(e).__name__, e)}
+    return {
+        "settings": {
+            "payloads": args.payloads,
+            "launches": args.launches,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "warmup": args.warmup,
+            "wait": args.wait,
+            "scripted": args.scripted,
+            "lean": args.lean,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "engines": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the browser engines offline.")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--payloads", type=int, default=50)
+    parser.add_argument("--launches", type=int, default=3, help="cold browser launches to time")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response time, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random response time, seconds")
+    parser.add_argument("--wait", choices=["normal", "eager"], default="normal")
+    parser.add_argument("--scripted", action="store_true", help="use the one-script fill and read")
+    parser.add_argument("--lean", action="store_true", help="block requests and use the lean profile")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
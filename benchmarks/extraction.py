@@ -0,0 +1,101 @@
+"""Times field extraction per document for each carrier: building the PageIndex,  detecting the doc
+type and running the carrier's rules for every field.
+
+    python -m benchmarks.extraction
+    python -m benchmarks.extraction --filler 200 --repeat 500 --output extraction.json
+
+The documents are text blocks shaped like each carrier's first pages,  padded with `--filler`
+wording blocks per page,  so PDF text extraction isn't part of the timings.
+"""
+import argparse
+import platform
+
+from benchmarks.stats import summarize, timed, write_report
+from model.carriers.base import CarrierBuilder
+from model.carriers.builders.concept import ConceptBuilder
+from model.carriers.builders.kemah import KemahBuilder
+from model.carriers.builders.yachtinsure import YachtinsureBuilder
+
+
+def filler(count: int, page: int) -> list[str]:
+    return [
+        "Section {0}.{1}: the insured vessel, its tender and equipment are covered as scheduled, "
+        "subject to the terms and conditions of this policy.".format(page, i)
+        for i in range(count)
+    ]
+
+
+def concept(count: int) -> list[list[str]]:
+    return [
+        ["Concept Special Risks Ltd", "Temporary Binder", "Assured:", "Jane Doe", "Period of Cover:",
+         "From 00.01 1 March 2024 to 1 March 2025", "Total Premium:",
+         "US$12,500.00 cancelling US$50.00 Certificate fee", "Declaration Number:", "CSR-24-0012"]
+        + filler(count, 0),
+        filler(count, 1),
+        ["1. Definitions"] + filler(count, 2),
+    ]
+
+
+def kemah(count: int) -> list[list[str]]:
+    return [
+        ["KMYSS", "Recreational Yacht Insurance Binder", "Additional Insured: First Bank",
+         "Named Insured: John Doe", "123 Main St, Tampa FL 33602", "Date of Issue: January 5, 2024",
+         "Policy Number: KM-123456 (Binder)", "Total Premium $1,234.00"]
+        + filler(count, 0),
+    ]
+
+
+def yachtinsure(count: int) -> list[list[str]]:
+    return [
+        ["www.yachtinsure.com", "Declarations page", "Insured: Bob Smith", "Date: 3/4/2024",
+         "Policy Number: YI-98765 issued"]
+        + filler(count, 0),
+        ["Total Amount Due: USD 1,500.00"] + filler(count, 1),
+    ]
+
+
+CARRIERS = {
+    "Concept": (ConceptBuilder, concept),
+    "Kemah": (KemahBuilder, kemah),
+    "Yachtinsure": (YachtinsureBuilder, yachtinsure),
+}
+
+
+def extract(builder: CarrierBuilder) -> None:
+    builder.get_user_doc_type()
+    builder.get_client_name()
+    builder.get_eff_date()
+    builder.get_policy_nums()
+    builder.get_premiums()
+
+
+def run(args: argparse.Namespace) -> dict:
+    report = {
+        "settings": {
+            "filler": args.filler,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+    }
+    for name, (builder_class, make_pages) in CARRIERS.items():
+        pages = make_pages(args.filler)
+        samples = []
+        for _ in range(args.repeat):
+            builder = builder_class("benchmark.pdf", pages)
+            with timed(samples):
+                extract(builder)
+        report[name] = {
+            "result": str(builder),
+            **summarize(samples),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-document field extraction.")
+    parser.add_argument("--filler", type=int, default=40, help="wording blocks added to each page")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
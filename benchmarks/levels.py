@@ -0,0 +1,116 @@
+"""Times extracting a page's text at each Level for each carrier,  plus what a parse actually extracts.
+
+    python -m benchmarks.levels
+    python -m benchmarks.levels --filler 80 --repeat 50 --output levels.json
+
+Each carrier's document is generated from the blocks in benchmarks.extraction,  written to the PDF
+in shuffled order so the stored order isn't the reading order. Every timing opens a fresh DocSession
+(no text cache) and excludes opening the document. Per level:
+
+    raw,  blocks,  sorted -- a page extracted straight at that level
+    blocks_then_sorted -- sorting a page that was already extracted as blocks
+    search_for -- fitz's Page.search_for for one phrase,  for comparison with raw
+
+"parse" runs the carrier's builder through the fields and reports the level each page ended at.
+"""
+import argparse
+import platform
+import random
+import tempfile
+from pathlib import Path
+
+import fitz
+
+from benchmarks.extraction import CARRIERS, extract
+from benchmarks.stats import summarize, timed, write_report
+from model.carriers.registry import get_registry
+from model.doc.session import DocSession, Level
+
+
+def make_doc(path: Path, pages: list[list[str]]) -> None:
+    doc = fitz.open()
+    for number, blocks in enumerate(pages):
+        page = doc.new_page(width=612, height=max(792, 60 + 24 * len(blocks)))
+        order = list(range(len(blocks)))
+        random.Random(number).shuffle(order)
+        for i in order:
+            y = 40 + 24 * i
+            page.insert_textbox(fitz.Rect(50, y, 560, y + 20), blocks[i], fontsize=7)
+    doc.save(path)
+
+
+def time_pages(path: Path, repeat: int, read) -> list[float]:
+    "Per-page timings of `read(session, index)`,  on a fresh session each time."
+    samples = []
+    for _ in range(repeat):
+        with DocSession(path) as session:
+            session.doc
+            for index in range(len(session)):
+                with timed(samples):
+                    read(session, index)
+    return samples
+
+
+def blocks_then_sorted(path: Path, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        with DocSession(path) as session:
+            for index in range(len(session)):
+                session.page(index, Level.BLOCKS)
+                with timed(samples):
+                    session.page(index, Level.SORTED)
+    return samples
+
+
+def parse(path: Path) -> dict:
+    with DocSession(path) as session:
+        market = get_registry().build(session.first_pages(3), path, session)
+        extract(market)
+        return {
+            "result": str(market),
+            "levels": {index: level.name for index, level in session.levels.items()},
+        }
+
+
+def run(args: argparse.Namespace) -> dict:
+    report = {
+        "settings": {
+            "filler": args.filler,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+        },
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (_builder_class, make_pages) in CARRIERS.items():
+            path = Path(tmp) / "{0}.pdf".format(name)
+            pages = make_pages(args.filler)
+            make_doc(path, pages)
+            with DocSession(path) as session:
+                assert [session.page(i) for i in range(len(pages))] == pages, name
+            timings = {
+                level.name.lower(): time_pages(
+                    path, args.repeat, lambda session, index, level=level: session.page(index, level)
+                )
+                for level in Level
+            }
+            timings["blocks_then_sorted"] = blocks_then_sorted(path, args.repeat)
+            timings["search_for"] = time_pages(
+                path, args.repeat, lambda session, index: session.doc[index].search_for(pages[0][0])
+            )
+            report[name] = {
+                "pages": len(pages),
+                **{level: summarize(samples) for level, samples in timings.items()},
+                "parse": parse(path),
+            }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark page text extraction at each level.")
+    parser.add_argument("--filler", type=int, default=40, help="wording blocks added to each page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
@@ -0,0 +1,99 @@
+"""Times finding a Kemah declarations page in a long policy: sorted blocks page by page (the old way)
+against the PageLocator in this process and on worker processes.
+
+    python -m benchmarks.locator --pages 80 --dec-page 62
+    python -m benchmarks.locator --pages 120 --workers 4 --repeat 5 --output locator.json
+
+The policy is generated: every page carries a few paragraphs of text blocks,  with the
+'5. Declarations Page' block on `--dec-page`. Nothing is cached between runs.
+"""
+import argparse
+import os
+import platform
+import tempfile
+from pathlib import Path
+
+import fitz
+
+from benchmarks.stats import summarize, timed, write_report
+from model.doc.locator import PageLocator
+from model.doc.session import DocSession
+
+NEEDLE = "5. Declarations Page"
+
+
+def make_policy(path: Path, pages: int, dec_page: int) -> None:
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        y = 60
+        if index == dec_page:
+            page.insert_text((72, y), NEEDLE)
+            y += 30
+        for paragraph in range(12):
+            for line in range(4):
+                page.insert_text(
+                    (72, y),
+                    "Section {0}.{1} coverage wording, line {2}: the insured vessel, its "
+                    "tender and equipment are covered as scheduled.".format(index, paragraph, line),
+                    fontsize=8,
+                )
+                y += 10
+            y += 8
+    doc.save(path)
+
+
+def find_by_blocks(session: DocSession, start: int, end: int) -> int | None:
+    for index in range(start, end + 1):
+        if NEEDLE in session.page(index):
+            return index
+    return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    timings = {"blocks": [], "serial": [], "parallel": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "policy.pdf"
+        make_policy(path, args.pages, args.dec_page)
+        serial = PageLocator(workers=0)
+        parallel = PageLocator(workers=args.workers, min_pages=1, chunk_size=args.chunk_size)
+        # Starts the worker processes,  so the timings don't include spawning them.
+        with DocSession(path) as session:
+            parallel.find(session, NEEDLE, 0, args.pages - 1)
+        try:
+            for _ in range(args.repeat):
+                for name, find in (
+                    ("blocks", lambda s: find_by_blocks(s, 15, len(s) - 1)),
+                    ("serial", lambda s: serial.find(s, NEEDLE, 15, len(s) - 1)),
+                    ("parallel", lambda s: parallel.find(s, NEEDLE, 15, len(s) - 1)),
+                ):
+                    with DocSession(path) as session, timed(timings[name]):
+                        found = find(session)
+                    assert found == args.dec_page, (name, found)
+        finally:
+            parallel.close()
+    return {
+        "settings": {
+            "pages": args.pages,
+            "dec_page": args.dec_page,
+            "workers": args.workers,
+            "chunk_size": args.chunk_size,
+            "repeat": args.repeat,
+            "cpus": os.cpu_count(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        **{name: summarize(samples) for name, samples in timings.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark locating the Kemah declarations page.")
+    parser.add_argument("--pages", type=int, default=80)
+    parser.add_argument("--dec-page", type=int, default=62, help="page index of the declarations page")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
@@ -0,0 +1,87 @@
+"""Compares the browser backend's page weight and call time with request blocking and the lean profile
+off and on,  against the local stand-in.
+
+    python -m benchmarks.page_weight --payloads 50
+    python -m benchmarks.page_weight --payloads 50 --latency 0.1 --output page_weight.json
+
+The stand-in page carries a stylesheet,  a web font,  a banner image and an analytics script,  so the
+report shows what blocking saves per estimator call: requests,  bytes received and milliseconds.
+"""
+import argparse
+import platform
+
+from benchmarks.scraper import make_payloads
+from benchmarks.stats import summarize, timed, write_report
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+from model.web.stand_in import StandInServer
+
+
+def measure(uri: str, args: argparse.Namespace, blocked: bool) -> dict:
+    pool = DriverPool(launcher=None, size=1, max_calls=0)
+    driver = Driver(
+        pool=pool,
+        eager=args.wait == "eager",
+        scripted=args.scripted,
+        block_requests=blocked,
+        lean_profile=blocked,
+        report_page_weight=True,
+    )
+    pool.launcher = driver.launch_browser
+    total, weights = [], []
+    try:
+        for payload in make_payloads(args.warmup + args.payloads, uri, seed=args.seed):
+            with timed(total):
+                driver.send_call(payload)
+                driver.get_response()
+            driver.close()
+            weights.append(driver.page_weight)
+    finally:
+        pool.close()
+    total, weights = total[args.warmup:], weights[args.warmup:]
+    return {
+        "call": summarize(total),
+        "requests_per_call": sum(w.get("requests", 0) for w in weights) / len(weights),
+        "bytes_per_call": sum(w.get("bytes", 0) for w in weights) / len(weights),
+        "blocked_per_call": sum(w.get("blocked", 0) for w in weights) / len(weights),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    with StandInServer(latency=args.latency, jitter=args.jitter) as server:
+        baseline = measure(server.uri, args, blocked=False)
+        lean = measure(server.uri, args, blocked=True)
+    return {
+        "settings": {
+            "payloads": args.payloads,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "warmup": args.warmup,
+            "wait": args.wait,
+            "scripted": args.scripted,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "unblocked": baseline,
+        "blocked": lean,
+        "saved_per_call": {
+            "requests": baseline["requests_per_call"] - lean["requests_per_call"],
+            "bytes": baseline["bytes_per_call"] - lean["bytes_per_call"],
+            "mean_ms": round(baseline["call"]["mean_ms"] - lean["call"]["mean_ms"], 3),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark request blocking on the browser backend.")
+    parser.add_argument("--payloads", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response time, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random response time, seconds")
+    parser.add_argument("--wait", choices=["normal", "eager"], default="normal")
+    parser.add_argument("--scripted", action="store_true", help="use the one-script fill and read")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
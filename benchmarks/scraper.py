@@ -0,0 +1,118 @@
+"""Times the estimator backends against the local stand-in,  phase by phase.
+
+    python -m benchmarks.scraper --backend browser --payloads 300 --latency 0.15 --jitter 0.1
+    python -m benchmarks.scraper --backend browser --wait eager --scripted
+    python -m benchmarks.scraper --backend http --output bench_http.json
+
+Nothing goes over the network: the stand-in serves the same form ids and result table as the
+live estimator,  with `--latency`/`--jitter` standing in for the round trip. The JSON report has
+p50/p95/p99 for browser launch (browser backend only),  send_call,  get_response and the two
+together,  so backends and wait strategies can be compared run to run.
+"""
+from datetime import date, timedelta
+import argparse
+import platform
+import random
+
+from benchmarks.stats import summarize, timed, write_report
+from model.automation import Payload
+from model.web.calculator import LocalDriver
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+from model.web.stand_in import StandInServer
+from model.web.transport import HttpDriver
+
+
+def make_payloads(count: int, uri: str, seed: int = 0) -> list[Payload]:
+    "Random but repeatable payloads spread over the transaction types and a few years of eff dates."
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        transaction_type = rng.choice(["1", "2", "3", "4", "5"])
+        premium = round(rng.uniform(250, 25000), 2)
+        if transaction_type in ("3", "4"):
+            premium = -premium
+        eff_date = date(2022, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+        payload = Payload(
+            policy_num=f"BENCH{i:05d}",
+            premium=premium,
+            eff_date=eff_date.strftime("%m/%d/%Y"),
+            transaction_type=transaction_type,
+        )
+        payload.uri = uri
+        payloads.append(payload)
+    return payloads
+
+
+def make_driver(args: argparse.Namespace) -> Driver | HttpDriver | LocalDriver:
+    if args.backend == "http":
+        return HttpDriver()
+    if args.backend == "local":
+        return LocalDriver()
+    # A private pool, so every run starts cold and measures its own launches.
+    pool = DriverPool(launcher=None, size=1, max_calls=0)
+    driver = Driver(pool=pool, eager=args.wait == "eager", scripted=args.scripted)
+    pool.launcher = driver.launch_browser
+    return driver
+
+
+def run(args: argparse.Namespace) -> dict:
+    launch, send_call, get_response, total = [], [], [], []
+    with StandInServer(latency=args.latency, jitter=args.jitter) as server:
+        payloads = make_payloads(args.payloads, server.uri, seed=args.seed)
+        driver = make_driver(args)
+        if isinstance(driver, Driver):
+            for _ in range(args.launches):
+                with timed(launch):
+                    session = driver.pool.checkout()
+                driver.pool.checkin(session, discard=True, count=False)
+            driver.pool.warm()
+        for _ in range(args.warmup):
+            driver.send_call(payloads[0])
+            driver.get_response()
+            driver.close()
+        for payload in payloads:
+            with timed(total):
+                with timed(send_call):
+                    driver.send_call(payload)
+                with timed(get_response):
+                    driver.get_response()
+            driver.close()
+        if isinstance(driver, Driver):
+            driver.pool.close()
+    report = {
+        "backend": args.backend,
+        "settings": {
+            "payloads": args.payloads,
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "send_call": summarize(send_call),
+        "get_response": summarize(get_response),
+        "total": summarize(total),
+    }
+    if args.backend == "browser":
+        report["settings"]["wait"] = args.wait
+        report["settings"]["scripted"] = args.scripted
+        report["launch"] = summarize(launch)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the estimator backends offline.")
+    parser.add_argument("--backend", choices=["browser", "http", "local"], default="browser")
+    parser.add_argument("--payloads", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in response time, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random response time, seconds")
+    parser.add_argument("--wait", choices=["normal", "eager"], default="normal")
+    parser.add_argument("--scripted", action="store_true", help="use the one-script fill and read")
+    parser.add_argument("--launches", type=int, default=3, help="cold browser launches to time")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed calls before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
@@ -0,0 +1,69 @@
+"""Times identifying a document's carrier from its first page: the registry's CarrierIdentifier against
+the if/elif chain of substring checks the parser used before signatures were declared as data.
+
+    python -m benchmarks.signatures
+    python -m benchmarks.signatures --filler 200 --repeat 2000 --output signatures.json
+
+The first pages are the ones in benchmarks.extraction,  each padded with `--filler` wording blocks
+placed before the carrier's blocks,  so every block is scanned. "unknown" is a page matching no carrier.
+"""
+import argparse
+import platform
+
+from benchmarks.extraction import CARRIERS, filler
+from benchmarks.stats import summarize, timed, write_report
+from model.carriers.registry import get_registry
+
+
+def if_elif(blocks: list[str]) -> str | None:
+    "The parser's old identify_mrkt."
+    for block in blocks:
+        if "Concept Special Risks" in block:
+            return "Concept"
+        elif "Company:" in block and "Sutton" in block:
+            return "Kemah"
+        elif "KMYSS" in block:
+            return "Kemah"
+        elif "yachtinsure" in block.lower():
+            return "Yachtinsure"
+    return None
+
+
+def identifier(blocks: list[str]) -> str | None:
+    match = get_registry().identify(blocks)
+    return match.carrier if match else None
+
+
+def run(args: argparse.Namespace) -> dict:
+    pages = {name: filler(args.filler, 0) + make_pages(0)[0] for name, (_, make_pages) in CARRIERS.items()}
+    pages["unknown"] = filler(args.filler, 0)
+    report = {
+        "settings": {
+            "filler": args.filler,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+    }
+    for name, blocks in pages.items():
+        timings = {"if_elif": [], "identifier": []}
+        for _ in range(args.repeat):
+            for method, samples in timings.items():
+                identify = if_elif if method == "if_elif" else identifier
+                with timed(samples):
+                    identify(blocks)
+        report[name] = {
+            "blocks": len(blocks),
+            "agree": if_elif(blocks) == identifier(blocks),
+            **{method: summarize(samples) for method, samples in timings.items()},
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark carrier identification.")
+    parser.add_argument("--filler", type=int, default=60, help="wording blocks before the carrier's blocks")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    write_report(run(args), args.output)
@@ -0,0 +1,47 @@
+"""Shared helpers for the benchmark scripts in this folder."""
+from contextlib import contextmanager
+import json
+import math
+import time
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    "Nearest-rank percentile of an already sorted list."
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: list[float]) -> dict[str, float | int]:
+    "Turns a list of timings (seconds) into milliseconds stats."
+    ordered = sorted(samples)
+    ms = 1000
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * ms, 3) if ordered else 0.0,
+        "min_ms": round(ordered[0] * ms, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * ms, 3),
+        "p95_ms": round(percentile(ordered, 95) * ms, 3),
+        "p99_ms": round(percentile(ordered, 99) * ms, 3),
+        "max_ms": round(ordered[-1] * ms, 3) if ordered else 0.0,
+    }
+
+
+@contextmanager
+def timed(samples: list[float]):
+    "Appends how long the with-block took to `samples`."
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+def write_report(report: dict, output: str = None) -> None:
+    "Prints the report as JSON,  and also saves it when an output path is given."
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
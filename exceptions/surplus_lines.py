@@ -11,6 +11,15 @@ class OutputDirNotSet(Exception):
         message = "There is no save location set currently.  Please select a location using the window and re-drag your file to continue."
         super().__init__(message)
 
+class EstimatorError(Exception):
+    """Exception raised when the FSLSO tax estimator can't be reached or its response can't be read."""
+
+    def __init__(self, *args: object) -> None:
+        if not args:
+            args = ("The FSLSO tax estimator did not return a usable response. Please try again shortly.",)
+        super().__init__(*args)
+
+
 class DocException(Exception):
     """Base exception for PDF-related errors when running the Surplus Lines automator.
 
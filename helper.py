@@ -3,6 +3,7 @@ import errno
 import os
 import sys
 import tempfile
+import threading
 
 from configupdater import ConfigUpdater
 
@@ -17,6 +18,7 @@ if TEST:
     # App resources
     ENV_PATH = app_dir / ".env" # not used
     LOG_FILE = app_dir / "logs" / "sys.log"
+    CACHE_DIR = resource_path / "cache"
     APP_ICON = resource_path / "app.ico"
     TRAY_ICON = resource_path / "sys_tray.ico"
     FSL_DOC_PATH = resource_path / "fsl_stamp.pdf"
@@ -26,6 +28,7 @@ else:
     CONFIG_PATH: Path = user_resources / "configurations.ini"
     # App resources
     LOG_FILE = user_resources / "sys.log"
+    CACHE_DIR = user_resources / "cache"
     app_dir: Path = Path("C:/Program Files/QuickDraw")
     app_resources: Path = app_dir / "_internal" / "resources"
     APP_ICON: Path = app_resources / "img" / "app.ico"
@@ -46,6 +49,70 @@ def open_config() -> ConfigUpdater:  # GOOD
     return open_read_update
 
 
+_config: ConfigUpdater = None
+# (modified time,  size) of the config file when _config was read from it.
+_config_stamp: tuple[int, int] = None
+_config_lock = threading.Lock()
+
+
+def _config_file_stamp() -> tuple[int, int] | None:
+    try:
+        stat = CONFIG_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _settings() -> ConfigUpdater | None:
+    """The parsed config,  read again only when the file changed since (the settings window saves it
+    with its own ConfigUpdater). None if there's no config file. Call with _config_lock held."""
+    global _config, _config_stamp
+    stamp = _config_file_stamp()
+    if stamp is None:
+        return None
+    if stamp != _config_stamp:
+        _config = open_config()
+        _config_stamp = stamp
+    return _config
+
+
+def get_setting(section: str, option: str, fallback: str = None) -> str | None:
+    """Reads a single option's value from the config,  returning the fallback if the config file,  section or option isn't there."""
+    with _config_lock:
+        config = _settings()
+        if config is None or not config.has_option(section, option):
+            return fallback
+        return config.get(section, option).value
+
+
+def set_setting(section: str, option: str, value: str) -> bool:
+    """Writes a single option's value to the config,  adding the section if needed. Returns False if there's no config file to write to."""
+    global _config_stamp
+    with _config_lock:
+        config = _settings()
+        if config is None:
+            return False
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section=section, option=option, value=value)
+        _write_config(config)
+        _config_stamp = _config_file_stamp()
+    return True
+
+
+def _write_config(config: ConfigUpdater) -> None:
+    "Writes the config to a temporary file beside it,  then swaps it in,  so nobody reads a half-written file."
+    config.validate_format()
+    fd, tmp_path = tempfile.mkstemp(dir=CONFIG_PATH.parent, prefix=CONFIG_PATH.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            config.write(f, validate=False)
+        os.replace(tmp_path, CONFIG_PATH)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
 #######################################################
 #######################################################
 ################   PATH VALIDATION   ##################
@@ -2,11 +2,14 @@ import os
 import subprocess
 import sys
 import logging.config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, repeat
 from pathlib import Path
 
 from exceptions import surplus_lines as exceptions
 from logs.surplus_lines import LOGGING_CONFIG
-from helper import validate_paths
+from helper import get_setting, validate_paths
 from model.automation import Automator
 from model.registrations import Producer
 
@@ -33,6 +36,30 @@ class SurplusLinesAutomator:
         else:
             return None
 
+    def prewarm(self) -> threading.Thread | None:
+        """Warms up the estimator backend on a background thread while the window is still hidden,  when
+        [web] prewarm is on. It gives up after prewarm_timeout seconds."""
+        if get_setting("web", "prewarm", "false").lower() != "true":
+            return None
+        timeout = float(get_setting("web", "prewarm_timeout", "60"))
+        thread = threading.Thread(
+            target=self._prewarm,
+            args=(timeout,),
+            daemon=True,
+            name="Estimator Pre-warm",
+        )
+        thread.start()
+        return thread
+
+    def _prewarm(self, timeout: float) -> None:
+        try:
+            self.app.prewarm_web(timeout)
+        except Exception:
+            log.warning(
+                msg="Pre-warming the estimator failed. The first drop will start it instead.",
+                exc_info=1,
+            )
+
     def start(self, doc_path: str, producer_template: str) -> bool:
         if not self.app.output_dir:
             log.info(
@@ -78,30 +105,62 @@ class SurplusLinesAutomator:
             else:
                 return False
 
+    def _stamp_payload(self, payload, producer: Producer, stamp_num: int) -> Path:
+        log.debug(
+            msg="Current payload: {0}".format(payload),
+        )
+        log.info(
+            msg="Performing the web call.",
+        )
+        form_data = self.app.perform_web_call(payload, producer)
+        log.info(
+            msg="Secured the response and formatted it.",
+        )
+        log.debug(
+            msg="The formatted response is: {0}.".format(form_data),
+        )
+        return self.app.fill_docs(form_data, stamp_num)
+
+    def _stamp_payloads(self, producer: Producer) -> list[Path]:
+        """Runs the web call and stamp fill for every payload on a bounded thread pool,  so an N-stamp
+        doc waits about as long as a single web call. Stamps come back in stamp_num order.
+
+        With [web] batch = true the payloads instead share one estimator page load, one after another."""
+        payloads = self.app.payloads
+        if len(payloads) > 1 and get_setting("web", "batch", "false").lower() == "true":
+            log.info(
+                msg="Sending all {0} payloads to the estimator as one batch.".format(
+                    len(payloads)
+                ),
+            )
+            all_form_data = self.app.perform_web_calls(payloads, producer)
+            return [
+                self.app.fill_docs(form_data, stamp_num)
+                for stamp_num, form_data in enumerate(all_form_data, start=1)
+            ]
+        max_workers = int(get_setting("web", "max_workers", "4"))
+        workers = max(1, min(max_workers, len(payloads)))
+        log.debug(
+            msg="Stamping {0} payload(s) on {1} worker(s).".format(len(payloads), workers),
+        )
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Stamp") as executor:
+            return list(
+                executor.map(
+                    self._stamp_payload,
+                    payloads,
+                    repeat(producer),
+                    count(start=1),
+                )
+            )
+
     def _automate(self, producer: Producer) -> bool:
         if not self.app.exited:
             
             self.app.payloads = None
             self.app.payloads = []
-            self.app.parse_doc()
-            stamp_num = 1
-            stamp_paths = []
-            for payload in self.app.payloads:
-                log.debug(
-                    msg="Current payload: {0}".format(payload),
-                )
-                log.info(
-                    msg="Performing the web call.",
-                )
-                form_data = self.app.perform_web_call(payload, producer)
-                log.info(
-                    msg="Secured the response and formatted it.",
-                )
-                log.debug(
-                    msg="The formatted response is: {0}.".format(form_data),
-                )
-                stamp_paths.append(self.app.fill_docs(form_data, stamp_num))
-                stamp_num += 1
+            try:
+                self.app.parse_doc()
+                stamp_paths = self._stamp_payloads(producer)
         # except exceptions.DocError:
         #     return False
         # except Exception as e:
@@ -109,10 +168,12 @@ class SurplusLinesAutomator:
         #     log.error(msg=str(e), stack_info=True)
         #     return False
         
-            log.info(
-                msg="Combining stamps into your document.",
-            )
-            new_file_path = self.app.combine_docs(stamp_paths)
+                log.info(
+                    msg="Combining stamps into your document.",
+                )
+                new_file_path = self.app.combine_docs(stamp_paths)
+            finally:
+                self.app.close_doc()
             log.info(
                 msg="Stamps combined. The stamped file location is: {0}.".format(
                     new_file_path
@@ -60,15 +60,105 @@ LOGGING_CONFIG = {
             "level": "DEBUG",
             "propagate": True,
         },
+        "model.doc.locator": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.doc.page_index": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.carriers.signatures": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.carriers.rules": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.carriers.dates": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.carriers.registry": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
         "model.doc.parser": {
             # "handlers": ["default"],
             "level": "DEBUG",
             "propagate": True,
         },
+        "model.doc.session": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.doc.text_cache": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
         "model.web.scraper": {
             # "handlers": ["default"],
             "level": "DEBUG",
             "propagate": True,
         },
+        "model.web.cache": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.blocking": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.calculator": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.driver_binary": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.engines": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.policy": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.deadline": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.pool": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.transport": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
+        "model.web.stand_in": {
+            # "handlers": ["default"],
+            "level": "DEBUG",
+            "propagate": True,
+        },
     },
 }
\ No newline at end of file
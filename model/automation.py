@@ -1,13 +1,21 @@
 from dataclasses import dataclass
 from pathlib import Path
 import logging
+import time
 
-from helper import open_config, validate_paths
+from helper import get_setting, open_config, validate_paths
 from exceptions import surplus_lines as exceptions
 from model.carriers.base import Carrier
 from model.doc.filler import DocFiller
 from model.doc.parser import DocParser
-from model.web.scraper import Driver, Response
+from model.doc.session import DocSession
+from model.doc.text_cache import get_text_cache
+from model.web.cache import get_cache
+from model.web.deadline import Deadline
+from model.web.policy import get_policy
+from model.web.calculator import LocalDriver, shadow_compare
+from model.web.scraper import ESTIMATOR_URI, Driver, Response
+from model.web.transport import HttpDriver
 
 
 log = logging.getLogger(__name__)
@@ -27,7 +35,7 @@ class Payload:
         self.coverage_code: int | str = "3006"
         self.tax_status: int | str = "0"
         self.policy_fee: int = 0
-        self.uri: str = "https://www.fslso.com/tax-estimator"
+        self.uri: str = get_setting("web", "estimator_uri", ESTIMATOR_URI)
 
 
 class Automator:
@@ -39,6 +47,8 @@ class Automator:
         self.carrier_obj: Carrier = None
         self.stamps: list[Path] = []
         self.doc_filler: DocFiller = None
+        # The user's PDF,  open from parse_doc() until close_doc().
+        self.doc_session: DocSession = None
         self.root = None
 
     @property
@@ -110,9 +120,11 @@ class Automator:
                 self.user_doc_path
             ),
         )
+        self.close_doc()
+        self.doc_session = DocSession(self.user_doc_path, cache=get_text_cache())
         try:
             dp = None
-            dp = DocParser(pdf_path=self.user_doc_path)
+            dp = DocParser(pdf_path=self.user_doc_path, session=self.doc_session)
         except exceptions.UnknownDocType as e:
             exceptions.spawn_message("Error", str(e), 0x10 | 0x0)
             # btn = OK
@@ -209,10 +221,69 @@ class Automator:
             )
 
     def perform_web_call(self, payload: Payload, producer) -> dict[str, float | str]:
+        return self.perform_web_calls([payload], producer)[0]
+
+    def perform_web_calls(
+        self, payloads: list[Payload], producer
+    ) -> list[dict[str, float | str]]:
+        """Gets a formatted response for each payload,  in order. Cached payloads skip the web call and
+        the rest go to the estimator together in one batch."""
+        cache = get_cache()
+        responses: list[Response] = [
+            cache.get(payload) if cache else None for payload in payloads
+        ]
+        misses = [payload for payload, r in zip(payloads, responses) if r is None]
+        log.info(
+            msg="Found {0} of {1} payload(s) in the estimator cache.".format(
+                len(payloads) - len(misses), len(payloads)
+            ),
+        )
+        if misses:
+            fetched, fell_back = get_policy().run(self._call_estimator_batch, misses)
+            fetched = iter(fetched)
+            shadow = (
+                get_setting("web", "shadow", "false").lower() == "true"
+                and get_setting("web", "backend", "browser") != "local"
+            )
+            for i, payload in enumerate(payloads):
+                if responses[i] is not None:
+                    continue
+                responses[i] = next(fetched)
+                if fell_back:
+                    # Stale cached or locally calculated: caching it would pass it off as a fresh
+                    # estimator answer,  and there's no estimator answer to shadow.
+                    continue
+                if shadow:
+                    shadow_compare(payload, responses[i])
+                if cache:
+                    cache.put(payload, responses[i])
+        if cache:
+            log.debug(
+                msg="Estimator cache stats: {0}".format(cache.stats()),
+            )
+        return [
+            self._format_response(response, payload, producer)
+            for response, payload in zip(responses, payloads)
+        ]
+
+    def _call_estimator_batch(
+        self, payloads: list[Payload], deadline: Deadline = None
+    ) -> list[Response]:
+        if len(payloads) == 1:
+            return [self._call_estimator(payloads[0], deadline)]
+        log.info(
+            msg="Initializing the web driver for a batch of {0} payloads.".format(
+                len(payloads)
+            ),
+        )
+        driver = self._make_driver(deadline)
+        return driver.send_batch(payloads)
+
+    def _call_estimator(self, payload: Payload, deadline: Deadline = None) -> Response:
         log.info(
             msg="Initializing the web driver.",
         )
-        driver = Driver()
+        driver = self._make_driver(deadline)
         log.info(
             msg="Sending the web call loaded with the payload from the PDF file.",
         )
@@ -220,10 +291,44 @@ class Automator:
         log.info(
             msg="Getting the response.",
         )
-        response = self._get_response(driver)
-        return self._format_response(response, payload, producer)
+        try:
+            response = self._get_response(driver)
+        except Exception:
+            driver.close(discard=True)
+            raise
+        driver.close()
+        return response
+
+    def prewarm_web(self, timeout: float) -> None:
+        "Gets the configured estimator backend ready before the first drop."
+        start = time.perf_counter()
+        self._make_driver().prewarm(timeout)
+        log.info(
+            msg="Estimator backend pre-warmed in {0:.2f}s.".format(
+                time.perf_counter() - start
+            ),
+        )
+
+    def _make_driver(self, deadline: Deadline = None) -> Driver | HttpDriver | LocalDriver:
+        "Picks the estimator backend named by the [web] backend option."
+        backend = get_setting("web", "backend", "browser")
+        log.debug(
+            msg="Using the '{0}' estimator backend.".format(backend),
+        )
+        if backend == "http":
+            return HttpDriver(deadline=deadline)
+        elif backend == "local":
+            return LocalDriver()
+        elif backend == "browser":
+            return Driver(deadline=deadline)
+        else:
+            raise ValueError(
+                "Unknown estimator backend '{0}' in the config. Use 'browser', 'http' or 'local'.".format(
+                    backend
+                )
+            )
 
-    def _get_response(self, driver: Driver) -> Response:
+    def _get_response(self, driver: Driver | HttpDriver | LocalDriver) -> Response:
         response: Response = driver.get_response()
         return response
 
@@ -288,11 +393,18 @@ class Automator:
             self.user_doc_path,
             stamps,
             self.carrier_obj.insert_page_index,
+            session=self.doc_session,
         )
         for stamp in stamps:
             stamp.unlink()
         return new_path
 
+    def close_doc(self) -> None:
+        "Closes the user's PDF once the job is done with it."
+        if self.doc_session is not None:
+            self.doc_session.close()
+            self.doc_session = None
+
     def restart_GUI(self):
         self.market = None
         self.spawn_window()
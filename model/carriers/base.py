@@ -1,11 +1,40 @@
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
+from typing import Callable, Sequence
+import functools
 import logging
 
+from model.doc.page_index import PageIndex
+from model.doc.session import DocSession, LazyPages, Level
+
 log = logging.getLogger(__name__)
 
 
+def needs(level: Level) -> Callable:
+    """Declares the least text extraction a builder step needs (see Level). While the step runs,  the
+    builder's `index` reads its pages at that level,  so pages only it looks at aren't extracted any
+    further. Steps without it read sorted blocks.
+
+    Only worth it for pages nothing else reads: the first page is always sorted by the carrier
+    identification,  and a page costs about the same to extract at every level. Sorting blocks already
+    extracted costs about 1% of that,  so BLOCKS alone saves next to nothing (see benchmarks/levels.py)."""
+
+    def decorate(step: Callable) -> Callable:
+        @functools.wraps(step)
+        def wrapper(self: "CarrierBuilder", *args, **kwargs):
+            outer, self.level = self.level, level
+            try:
+                return step(self, *args, **kwargs)
+            finally:
+                self.level = outer
+
+        wrapper.level = level
+        return wrapper
+
+    return decorate
+
+
 @dataclass
 class Carrier:
     """Finalized class for a carrier obj.  Used to provide formatted, validated data to the rest of the program.
@@ -37,10 +66,18 @@ class Carrier:
 
 
 class CarrierBuilder:
-    def __init__(self, pdf_path: Path, pages: list[list[str]]):
+    # Phrases the builder looks blocks up by,  indexed in the same pass as the blocks themselves.
+    anchors: tuple[str, ...] = ()
+
+    def __init__(self, pdf_path: Path, pages: Sequence[list[str]], session: DocSession = None):
         self.name: str = None
+        # The level the running step reads pages at. See `needs`.
+        self.level: Level = Level.SORTED
         self.pdf_path: Path = pdf_path
-        self.pages: list[list[str]] = pages
+        # The job's open document,  for builders that need pages beyond the ones they were given.
+        self.session: DocSession = session
+        # Usually the session's LazyPages,  so only the pages a builder looks at get extracted.
+        self.pages: Sequence[list[str]] = pages
         self.user_doc_type: str = None
         self.client_name: str = None
         self.eff_date: str = None
@@ -50,6 +87,27 @@ class CarrierBuilder:
         self.multiple_stamps_flag: bool = False
         self.insert_page_index: int = 1
 
+    @property
+    def pages(self) -> Sequence[list[str]]:
+        return self._pages
+
+    @pages.setter
+    def pages(self, pages: Sequence[list[str]]) -> None:
+        self._pages = pages
+        self._indexes: dict[Level, PageIndex] = {}
+
+    @property
+    def index(self) -> PageIndex:
+        "The PageIndex of `pages` at the running step's level,  built the first time a field is looked up."
+        # Pages given as lists are sorted blocks already,  whatever the step needs.
+        level = self.level if isinstance(self.pages, LazyPages) else Level.SORTED
+        if level not in self._indexes:
+            self._indexes[level] = PageIndex(self._indexed_pages(level), self.anchors)
+        return self._indexes[level]
+
+    def _indexed_pages(self, level: Level) -> Sequence[list[str]]:
+        return self.pages.at(level) if isinstance(self.pages, LazyPages) else self.pages
+
     def __str__(self) -> str:
         return f"{self.name}: doc_type={self.user_doc_type}, client={self.client_name}, effective={self.eff_date}, policy number(s)={self.policy_nums}, premium(s)={self.premiums}"
 
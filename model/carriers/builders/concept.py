@@ -2,18 +2,46 @@ from datetime import datetime
 from pathlib import Path
 import logging
 
-import datefinder
-
 from exceptions import surplus_lines as exceptions
-from model.carriers.base import CarrierBuilder
+from model.carriers.base import CarrierBuilder, needs
+from model.carriers.rules import MONEY, Extractor, Rule, date, money
+from model.doc.session import DocSession, Level
 
 log = logging.getLogger(__name__)
 
 
 ### CONCEPT IS FINISHED! CONGRATS!
 class ConceptBuilder(CarrierBuilder):
-    def __init__(self, pdf_path: Path, pages: list[list[str]]) -> None:
-        super().__init__(pdf_path, pages)
+    anchors = (
+        "Additional Premium",
+        "hereunder is cancelled",
+        "Return Premium",
+        "1. Definitions",
+        "with effect from",
+        "Insurance Provider",
+        "US$",
+    )
+    rules = Extractor((
+        Rule("client_name", "Applicant:", ("quote", "renewal"), exact=True, offset=1, page=0),
+        Rule("client_name", "Assured:", exact=True, offset=1, page=0),
+        # "From 00.01 1 March 2024 to ..."
+        Rule("eff_date", "Date:", ("quote",), exact=True, offset=1, page=0,
+             convert=date("day_month_year")),
+        Rule("eff_date", "Period of Cover:", ("binder", "policy"), exact=True, offset=1, page=0,
+             convert=date("day_month_year")),
+        Rule("eff_date", "with effect from", page=0, convert=date("day_month_year")),
+        # Premium plus the carrier's fee: "US$1,000 cancelling ... US$50 Certificate ..."
+        Rule("premiums", "Total Premium:", ("policy", "renewal", "binder", "quote"), exact=True,
+             offset=1, page=0, pattern=r"US\$\s*" + MONEY + r".*?cancelling.*?US\$\s*" + MONEY,
+             convert=money),
+        Rule("premiums", "US$", ("cancel", "rp", "ap"), page=0, which="last", pattern=r"^\s*(\S+)",
+             convert=money),
+        Rule("policy_nums", "Quote Number:", ("quote", "renewal"), exact=True, offset=1, page=0),
+        Rule("policy_nums", "Declaration Number:", exact=True, offset=1, page=0),
+    ))
+
+    def __init__(self, pdf_path: Path, pages: list[list[str]], session: DocSession = None) -> None:
+        super().__init__(pdf_path, pages, session)
         self.name = "Concept"
 
     def get_user_doc_type(self) -> str:
@@ -39,7 +67,7 @@ class ConceptBuilder(CarrierBuilder):
                 ),
             )
             try:
-                x.index(keyword)
+                self.index.index(keyword, page=0)
             except ValueError:
                 continue
             else:
@@ -49,22 +77,27 @@ class ConceptBuilder(CarrierBuilder):
                     ),
                 )
                 if doc_type == "endt":
-                    for block in x:
-                        for doc_type, keyword in endt_finder.items():
-                            log.debug(
-                                msg="Running checks to detect if user_doc is of type '{0}'.".format(
-                                    doc_type
-                                ),
-                            )
-                            if keyword in block:
-                                log.debug(
-                                    msg="Found match! The keyword was: {0}, and the detected block was: {1}".format(
-                                        keyword, block
-                                    ),
-                                )
-                                self.user_doc_type = doc_type
-                                self.insert_page_index = self.find_insert_index()
-                                return doc_type
+                    # The first block with any of the keywords wins,  in endt_finder's order within a block.
+                    found = []
+                    for doc_type, keyword in endt_finder.items():
+                        log.debug(
+                            msg="Running checks to detect if user_doc is of type '{0}'.".format(
+                                doc_type
+                            ),
+                        )
+                        pos = self.index.first(keyword, page=0)
+                        if pos is not None:
+                            found.append((pos, doc_type, keyword))
+                    if found:
+                        pos, doc_type, keyword = min(found, key=lambda match: match[0])
+                        log.debug(
+                            msg="Found match! The keyword was: {0}, and the detected block was: {1}".format(
+                                keyword, self.index.block(pos)
+                            ),
+                        )
+                        self.user_doc_type = doc_type
+                        self.insert_page_index = self.find_insert_index()
+                        return doc_type
                 else:
                     self.user_doc_type = doc_type
                     self.insert_page_index = self.find_insert_index()
@@ -78,48 +111,26 @@ class ConceptBuilder(CarrierBuilder):
         )
         raise exceptions.UnknownDocType(self)
 
+    # Only asks whether page 3 has the definitions on it,  so the page is never split into blocks.
+    @needs(Level.RAW)
     def find_insert_index(self) -> int:
         if self.user_doc_type == "ap" or self.user_doc_type == "rp" or self.user_doc_type == "cancel":
             return len(self.pages)
         else:
-            for i, block in enumerate(self.pages[2]):
-                if "1. Definitions" in block:
-                    return 2
+            if self.index.first("1. Definitions", page=2) is not None:
+                return 2
             return 3
 
     def get_client_name(self) -> bool:
         "This is complete 12/7"
-        if self.user_doc_type == "quote" or self.user_doc_type == "renewal":
-            txt = "Applicant:"
-        else:
-            txt = "Assured:"
-        i = self.pages[0].index(txt)
-        i += 1
-        self.client_name = self.pages[0][i].strip()
+        self.rules.apply(self, "client_name")
         return True
 
     def get_eff_date(self) -> datetime:
         "This is complete 12/7"
-        if self.user_doc_type == "quote":
-            i = self.pages[0].index("Date:")
-            i += 1
-        elif self.user_doc_type == "binder" or self.user_doc_type == "policy":
-            i = self.pages[0].index("Period of Cover:")
-            i += 1
-        else:
-            for i, block in enumerate(self.pages[0]):
-                if "with effect from" in block:
-                    break
-        x = self.pages[0][i]
-        x = x.replace("00.01", "")
-        dates = datefinder.find_dates(x)
-        y = []
-        for date in dates:
-            y.append(date)
-        date_obj = y[0]
+        date_obj = self.rules.apply(self, "eff_date")
         if not isinstance(date_obj, datetime):
             raise TypeError
-        self.eff_date = date_obj.strftime("%m/%d/%Y")
         return date_obj
 
     def get_premiums(self) -> bool:
@@ -127,85 +138,47 @@ class ConceptBuilder(CarrierBuilder):
         # This carrier_fee gets replaced later with a value parsed from the PDF.
         carrier_fee = 50
         if self.multiple_stamps_flag:
-            for i, block in enumerate(self.pages[1]):
-                if "Insurance Provider" in block:
-                    i += 1
-                    if (
-                        "Accelerant Specialty" in self.pages[1][i]
-                        and "Texas Insurance" in self.pages[1][i]
-                        and "Hadron" in self.pages[1][i]
-                        and "Palomar" in self.pages[1][i]
-                        and "Lloyd's Syndicates" in self.pages[1][i]
-                    ):
-                        if "except" in self.pages[1][i]:
-                            x: tuple[str,str,str] = self.pages[1][i].partition("except")
-                            premium1_str = x[0].rpartition("US$")[2].strip().replace(",", "")
-                            premium1 = float(premium1_str)
-                            premium1 += carrier_fee
-                            premium2 = (
-                                x[2]
-                                .rpartition("premium US$")[2]
-                                .strip()
-                                .replace(",", "")
-                            )
+            for pos in self.index.positions("Insurance Provider", page=1):
+                providers = self.index.after(pos)
+                if (
+                    "Accelerant Specialty" in providers
+                    and "Texas Insurance" in providers
+                    and "Hadron" in providers
+                    and "Palomar" in providers
+                    and "Lloyd's Syndicates" in providers
+                ):
+                    if "except" in providers:
+                        x: tuple[str,str,str] = providers.partition("except")
+                        premium1_str = x[0].rpartition("US$")[2].strip().replace(",", "")
+                        premium1 = float(premium1_str)
+                        premium1 += carrier_fee
+                        premium2 = (
+                            x[2]
+                            .rpartition("premium US$")[2]
+                            .strip()
+                            .replace(",", "")
+                        )
 
-                            for premium in [premium1, premium2]:
-                                self.premiums.append(
-                                    float(premium),
-                                )
-                        else:
-                            pass
+                        for premium in [premium1, premium2]:
+                            self.premiums.append(
+                                float(premium),
+                            )
                     else:
-                        raise exceptions.DocParseError(self)
+                        pass
+                else:
+                    raise exceptions.DocParseError(self)
         else:
-            if (
-                (self.user_doc_type == "policy")
-                or (self.user_doc_type == "renewal")
-                or (self.user_doc_type == "binder")
-                or (self.user_doc_type == "quote")
-            ):
-                i = self.pages[0].index("Total Premium:")
-                i += 1
-                _x = self.pages[0][i].partition("US$")[2].partition("cancelling")
-                x = _x[0]
-                premium = x.strip().replace(",", "")
-                carrier_fee = _x[2].partition("Certificate")[0].partition("US$")[2].strip().replace(",", "")
-                premium, carrier_fee = float(premium), float(carrier_fee)
-                premium += carrier_fee
-            elif (
-                self.user_doc_type == "cancel"
-                or self.user_doc_type == "rp"
-                or self.user_doc_type == "ap"
-            ):
-                for block in self.pages[0]:
-                    if "US$" in block:
-                        x = block.partition("US$")[2]
-                        premium = x.lstrip().partition(" ")[0].strip().replace(",", "")
-                        premium = float(premium)
-            else:
-                raise ValueError
-            self.premiums.append(premium)
+            self.rules.apply(self, "premiums")
         return True
 
     def get_policy_nums(self) -> bool:
         "This is correct 12/7"
-        if self.user_doc_type == "quote" or self.user_doc_type == "renewal":
-            txt = "Quote Number:"
-        else:
-            txt = "Declaration Number:"
-        i = self.pages[0].index(txt)
-        i += 1
+        self.rules.apply(self, "policy_nums")
         if self.multiple_stamps_flag:
-            policy1 = self.pages[0][i].strip()
-            self.policy_nums.append(policy1)
-            for i, block in enumerate(self.pages[1]):
-                if "Insurance Provider" in block:
-                    i += 1
-                    x = self.pages[1][i].partition("per UMR")[2]
-                    policy2 = x.partition(")")[0].partition("(")[0].strip()
-                    self.policy_nums.append(policy2)
-        else:
-            self.policy_nums.append(self.pages[0][i].strip())
+            for provider in self.index.positions("Insurance Provider", page=1):
+                x = self.index.after(provider).partition("per UMR")[2]
+                policy2 = x.partition(")")[0].partition("(")[0].strip()
+                self.policy_nums.append(policy2)
         return True
 
     # --------------------------------------------------------
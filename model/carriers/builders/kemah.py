@@ -1,21 +1,58 @@
 from pathlib import Path
+from typing import Sequence
 import logging
 
 from datetime import datetime
 from exceptions import surplus_lines as exceptions
 
 from model.carriers.base import CarrierBuilder
+from model.carriers.rules import MONEY, Extractor, Rule, date, money
+from model.doc.session import DocSession, Level
 
 log = logging.getLogger(__name__)
 
 class KemahBuilder(CarrierBuilder):
-    def __init__(self, pdf_path: Path, pages: list[str]) -> None:
-        super().__init__(pdf_path, pages)
+    anchors = (
+        "Declarations Page",
+        "Recreational Yacht Insurance Policy",
+        "Applicant:",
+        "Insured:",
+        "Applicant",
+        "Insured",
+        "Date of Issue:",
+        "60 days from",
+        "Effective Date:",
+        "Total",
+        "Policy Number:",
+        "Surcharge",
+        "Additional Premium",
+    )
+    rules = Extractor((
+        Rule("client_name", "Applicant:", ("quote",), exclude="Additional", required=False),
+        Rule("client_name", "Insured:", exclude="Additional", required=False),
+        Rule("eff_date", "Date of Issue:", ("policy", "binder"), which="last",
+             convert=date("month_day_year")),
+        Rule("eff_date", "60 days from", ("quote",), which="last", convert=date("month_day_year")),
+        # "Effective Date: 05 Jan 2024 at 12:01 AM"
+        Rule("eff_date", "Effective Date:", ("cancel", "rp", "ap"), which="last",
+             convert=date("day_month_year")),
+        Rule("premiums", "Total", which="all", pattern=r"\$\s*" + MONEY, convert=money),
+        Rule("policy_nums", "Policy Number:", which="all", pattern=r"^\s*(\S*)"),
+    ))
+
+    def __init__(self, pdf_path: Path, pages: Sequence[list[str]], session: DocSession = None) -> None:
+        # Everything Kemah needs is on one page: the first,  or the Dec Page the parser finds later.
+        super().__init__(pdf_path, pages[0], session)
         self.name = "Kemah"
         self.applicable_states = [
             "FL",
         ]
 
+    def _indexed_pages(self, level: Level) -> list[list[str]]:
+        """Kemah works from a single page's blocks,  already sorted by the carrier identification or the
+        parser's Dec Page search. Its steps all read blocks relative to each other anyway."""
+        return [self.pages]
+
     def get_user_doc_type(self) -> str:
         "This is complete 12/7"
         finder = {
@@ -34,17 +71,20 @@ class KemahBuilder(CarrierBuilder):
                 ),
             )
             if doc_type == "policy":
-                for block in self.pages:
-                    if keyword[0] in block or keyword[1] in block:
-                        log.debug(
-                            msg="Detected to be a '{0}'. The detected block was: {1}".format(
-                                doc_type, block
-                            ),
-                        )
-                        self.user_doc_type = doc_type
-                        return doc_type
+                found = [
+                    pos for pos in map(self.index.first, keyword) if pos is not None
+                ]
+                if found:
+                    log.debug(
+                        msg="Detected to be a '{0}'. The detected block was: {1}".format(
+                            doc_type, self.index.block(min(found))
+                        ),
+                    )
+                    self.user_doc_type = doc_type
+                    return doc_type
+                continue
             try:
-                self.pages.index(keyword)
+                self.index.index(keyword)
             except ValueError:
                 continue
             else:
@@ -70,82 +110,17 @@ class KemahBuilder(CarrierBuilder):
 
     def get_client_name(self) -> bool:
         "This is complete 12/7"
-        if self.user_doc_type == "quote":
-            txt = "Applicant:"
-        else:
-            txt = "Insured:"
-        for block in self.pages:
-            if txt in block:
-                if "Additional" not in block:
-                    log.debug(
-                        msg="Detected matching block: '{0}'.".format(block),
-                    )
-                    self.client_name = block.partition(txt)[2].strip()
-                    log.info(
-                        msg="Client's name: '{0}'.".format(self.client_name),
-                    )
-                    return True
+        if self.rules.apply(self, "client_name") is not None:
+            log.info(
+                msg="Client's name: '{0}'.".format(self.client_name),
+            )
+            return True
 
     def get_eff_date(self) -> datetime:
         "This is complete 12/7"
-        if self.user_doc_type == "policy" or self.user_doc_type == "binder":
-            txt = "Date of Issue:"
-            for block in self.pages:
-                if txt in block:
-                    _ = block.partition(txt)[2].strip()
-                    log.debug(
-                        msg="Detected matching block using '{0}'. target: '{1}', within block: '{2}'".format(
-                            txt, _, block
-                        ),
-                    )
-        elif self.user_doc_type == "quote":
-            txt = "60 days from"
-            for block in self.pages:
-                
-                if txt in block:
-                    _ = block.partition(txt)[2].strip()
-                    log.debug(
-                        msg="Detected matching block using '{0}'. target: '{1}', within block: '{2}'".format(
-                            txt, _, block
-                        ),
-                    )
-        elif (
-            self.user_doc_type == "cancel"
-            or self.user_doc_type == "rp"
-            or self.user_doc_type == "ap"
-        ):
-            txt = "Effective Date:"
-            for block in self.pages:
-                if txt in block:
-                    _ = block.partition(txt)[2]
-                    log.debug(
-                        msg="Detected matching block using '{0}'. target: '{1}', within block: '{2}'".format(
-                            txt, _, block
-                        ),
-                    )
-            unformatted_date = _.partition("at")[0].strip()
-            log.debug(
-                msg="Unformatted_date: {0}".format(unformatted_date),
-            )
-            date_obj = datetime.strptime(unformatted_date, "%d %b %Y")
-            if not isinstance(date_obj, datetime):
-                raise TypeError
-            self.eff_date = date_obj.strftime("%m/%d/%Y")
-            log.info(
-                msg="Got and formatted the effective date: {0}".format(self.eff_date),
-            )
-            return date_obj
-        else:
-            raise ValueError(
-                """
-                Parsing for the doc_type failed.  Recheck 
-                parsing procedure for user_doc_type.
-                """
-            )
-        date_obj = datetime.strptime(_, "%B %d, %Y")
+        date_obj = self.rules.apply(self, "eff_date")
         if not isinstance(date_obj, datetime):
             raise TypeError
-        self.eff_date = date_obj.strftime("%m/%d/%Y")
         log.info(
             msg="Got and formatted the effective date: {0}".format(self.eff_date),
         )
@@ -200,22 +175,7 @@ class KemahBuilder(CarrierBuilder):
                 )
                 self.premiums.append(rates["rp"])
         else:
-            for block in self.pages:
-                
-                txt = "Total"
-                if txt in block:
-                    log.debug(
-                        msg="Matched block using text: '{0}'. The matched block is: {1}".format(
-                            txt, block
-                        ),
-                    )
-                    x = block.partition("Total")[2].partition("$")[2]
-                    log.debug(
-                        msg="Before stripping whitespace and commas, the premium is: '{0}'".format(
-                            x
-                        ),
-                    )
-                    self.premiums.append(float(x.replace(",", "").strip()))
+            self.rules.apply(self, "premiums")
         return True
 
     def get_policy_nums(self) -> bool:
@@ -223,16 +183,7 @@ class KemahBuilder(CarrierBuilder):
         if self.user_doc_type == "quote":
             self.policy_nums.append("TBA")
         else:
-            txt = "Policy Number:"
-            for block in self.pages:
-                if txt in block:
-                    _ = block.partition(txt)[2].lstrip()
-                    log.debug(
-                        msg="Matched block using text: '{0}'. The matched block is: '{1}'. The target is: '{2}".format(
-                            txt, block, _
-                        ),
-                    )
-                    self.policy_nums.append(_.partition(" ")[0])
+            self.rules.apply(self, "policy_nums")
 
     def check_if_doc_needs_stamp(self) -> bool:
         "This is complete 12/7"
@@ -245,8 +196,9 @@ class KemahBuilder(CarrierBuilder):
                 txt = "Applicant"
             else:
                 txt = "Insured"
-            for i, block in enumerate(self.pages):
-                if txt in block and not "Additional" in block:
+            for pos in self.index.positions(txt):
+                block = self.index.block(pos)
+                if not "Additional" in block:
                     log.debug(
                         msg="Matched block using text: '{0}'. The matched block is: '{1}'.".format(
                             txt, block
@@ -255,17 +207,16 @@ class KemahBuilder(CarrierBuilder):
                     log.debug(
                         msg="Moving to the next subsequent block.",
                     )
-                    i += 1
-                    # for _i, u in enumerate(self.pages):
+                    address = self.index.after(pos)
                     for state in self.applicable_states:
                         log.info(
                             msg="Comparing client's address against applicable Surplus Lines state(s)...",
                         )
-                        if self.pages[i] == "":
+                        if address == "":
                             # Sometimes, this item is not captured from the PDF, so this catches
                             # those instances and assumes user is correct in stmaping it
                             return True
-                        elif state in self.pages[i]:
+                        elif state in address:
                             log.debug(
                                 msg="Matched block using text: '{0}'. The matched block is: '{1}'.".format(
                                     state, block
@@ -278,38 +229,37 @@ class KemahBuilder(CarrierBuilder):
             or self.user_doc_type == "ap"
             or self.user_doc_type == "rp"
         ):
-            
-            for block in self.pages:
-                txt = "Surcharge"
-                if txt in block:
-                    if "XX" in block:
-                        log.debug(
-                            msg="Matched block using text: '{0}'. The matched block is: '{1}'.".format(
-                                txt, block
-                            ),
-                        )
-                        return True
-                    else:
-                        return False
+            txt = "Surcharge"
+            pos = self.index.first(txt)
+            if pos is not None:
+                block = self.index.block(pos)
+                if "XX" in block:
+                    log.debug(
+                        msg="Matched block using text: '{0}'. The matched block is: '{1}'.".format(
+                            txt, block
+                        ),
+                    )
+                    return True
+                else:
+                    return False
 
     def _get_change_rates(self) -> dict[str, float]:
         "This is complete 12/7"
-        for i, block in enumerate(self.pages):
-            txt = "Additional Premium"
-            if txt in block:
-                log.debug(
-                    msg="Matched text with block! Text: '{0}', block: '{1}'.".format(
-                        txt, block
-                    ),
-                )
-                rates = {
-                    "ap": i,
-                    "rp": i + 1,
-                    "taxes": i + 2,
-                }
-                log.debug(
-                    msg="Indexes for all rates: {0}".format(rates),
-                )
+        txt = "Additional Premium"
+        for _, i in self.index.positions(txt):
+            log.debug(
+                msg="Matched text with block! Text: '{0}', block: '{1}'.".format(
+                    txt, self.pages[i]
+                ),
+            )
+            rates = {
+                "ap": i,
+                "rp": i + 1,
+                "taxes": i + 2,
+            }
+            log.debug(
+                msg="Indexes for all rates: {0}".format(rates),
+            )
         for key, value in rates.items():
             value = self.__parse_change_rate(self.pages[value])
             rates[key] = value
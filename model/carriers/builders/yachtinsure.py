@@ -2,18 +2,41 @@ from datetime import datetime
 from pathlib import Path
 import logging
 
-import datefinder
-
 from exceptions import surplus_lines as exceptions
 
 from model.carriers.base import CarrierBuilder
+from model.carriers.rules import MONEY, Extractor, Rule, date, money
+from model.doc.session import DocSession
 
 log = logging.getLogger(__name__)
 
 
 class YachtinsureBuilder(CarrierBuilder):
-    def __init__(self, pdf_path: Path, pages: list[list[str]]) -> None:
-        super().__init__(pdf_path, pages)
+    anchors = (
+        "Insured Name/ Company:",
+        "Insured:",
+        "Endorsement Effective:",
+        "Date:",
+        "Total Return",
+        "Total Amount Due:",
+        "Quote Number",
+        "Policy Number",
+    )
+    rules = Extractor((
+        Rule("client_name", "Insured Name/ Company:", ("cancel",), page=0, which="last"),
+        Rule("client_name", "Insured:", page=0, which="last"),
+        Rule("eff_date", "Endorsement Effective:", ("cancel",), page=0,
+             convert=date("numeric_mdy", "month_day_year")),
+        Rule("eff_date", "Date:", page=0, convert=date("numeric_mdy", "month_day_year")),
+        Rule("premiums", "Total Return", ("cancel",), which="all", pattern=r"USD\s*" + MONEY,
+             convert=money),
+        Rule("premiums", "Total Amount Due:", which="all", pattern=r"USD\s*" + MONEY, convert=money),
+        Rule("policy_nums", "Quote Number", ("quote",), page=0, which="all", pattern=r":\s*(\S*)"),
+        Rule("policy_nums", "Policy Number", page=0, which="all", pattern=r":\s*(\S*)"),
+    ))
+
+    def __init__(self, pdf_path: Path, pages: list[list[str]], session: DocSession = None) -> None:
+        super().__init__(pdf_path, pages, session)
         self.name = "Yachtinsure"
 
     def get_user_doc_type(self) -> str:
@@ -26,10 +49,9 @@ class YachtinsureBuilder(CarrierBuilder):
             "renewal": "Renewal",
             "rp": "Return Premium",
         }
-        x = self.pages[0]
         for doc_type, keyword in finder.items():
             try:
-                x.index(keyword)
+                self.index.index(keyword, page=0)
             except ValueError:
                 continue
             else:
@@ -42,57 +64,20 @@ class YachtinsureBuilder(CarrierBuilder):
 
     def get_client_name(self) -> bool:
         "this is correct 12/7"
-        if self.user_doc_type == "cancel":
-            for block in self.pages[0]:
-                if "Insured Name/ Company:":
-                    x = block.partition("Company:")[2]
-        else:
-            for block in self.pages[0]:
-                if "Insured:" in block:
-                    x = block.partition("Insured:")[2]
-        self.client_name = x.strip()
+        self.rules.apply(self, "client_name")
 
     def get_eff_date(self) -> datetime:
         "This is correct 12/7"
-        if self.user_doc_type == "cancel":
-            txt = "Endorsement Effective:"
-        else:
-            txt = "Date:"
-        for block in self.pages[0]:
-            if txt in block:
-                x = block.partition(txt)[2]
-                dates = datefinder.find_dates(x)
-                y = []
-                for date in dates:
-                    y.append(date)
-                date_obj = y[0]
-                if not isinstance(date_obj, datetime):
-                    raise TypeError
-                self.eff_date = date_obj.strftime("%m/%d/%Y")
-                return date_obj
+        date_obj = self.rules.apply(self, "eff_date")
+        if not isinstance(date_obj, datetime):
+            raise TypeError
+        return date_obj
 
     def get_premiums(self) -> bool:
         "This is correct 12/7"
-        if self.user_doc_type == "cancel":
-            txt = "Total Return"
-        else:
-            txt = "Total Amount Due:"
-        for page in self.pages:
-            for block in page:
-                if txt in block:
-                    x = block.partition(txt)[2].strip()
-                    x = x.partition("USD")[2].lstrip()
-                    if self.user_doc_type == "cancel":
-                        x = x.partition(" ")[0]
-                    self.premiums.append(float(x.replace(",", "").strip()))
+        # Sorted: a page can have more than one total,  and the premiums must keep reading order.
+        self.rules.apply(self, "premiums")
 
     def get_policy_nums(self) -> bool:
         "This is correct 12/7"
-        if self.user_doc_type == "quote":
-            txt = "Quote Number"
-        else:
-            txt = "Policy Number"
-        for block in self.pages[0]:
-            if txt in block:
-                x = block.partition(":")[2].lstrip().partition(" ")[0]
-                self.premiums.append(x.strip())
+        self.rules.apply(self, "policy_nums")
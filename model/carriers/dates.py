@@ -0,0 +1,86 @@
+"""Finds the date in a text block,  for the carriers' effective dates.
+
+Each date format the carriers print has a precompiled pattern. `find_date` tries the formats it's
+given in order and returns the first date (by position in the text) of the first format that
+matches,  then tries the remaining known formats in FORMATS order. Only text none of them match goes
+to datefinder,  which is imported the first time that happens. Results are cached on the text.
+"""
+from datetime import datetime
+from functools import lru_cache
+import logging
+import re
+
+
+log = logging.getLogger(__name__)
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+    )
+}
+_MONTH = (
+    r"(Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?"
+)
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+# Format name -> (pattern,  order of the day,  month and year groups in it).
+FORMATS: dict[str, tuple[re.Pattern, tuple[int, int, int]]] = {
+    # 1 March 2024,  05 Jan 2024
+    "day_month_year": (
+        re.compile(r"\b" + _DAY + r"\s+" + _MONTH + r",?\s+(\d{4})\b", re.IGNORECASE),
+        (1, 2, 3),
+    ),
+    # January 5, 2024
+    "month_day_year": (
+        re.compile(r"\b" + _MONTH + r"\s+" + _DAY + r",?\s+(\d{4})\b", re.IGNORECASE),
+        (2, 1, 3),
+    ),
+    # 3/4/2024,  03-04-24 (US order)
+    "numeric_mdy": (
+        re.compile(r"\b(\d{1,2})[/-](\d{1,2})[/-](\d{4}|\d{2})\b"),
+        (2, 1, 3),
+    ),
+    # 2024-03-04
+    "iso": (
+        re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b"),
+        (3, 2, 1),
+    ),
+}
+
+
+def _month(text: str) -> int:
+    return int(text) if text.isdigit() else _MONTHS[text[:3].lower()]
+
+
+def _match(fmt: str, text: str) -> datetime | None:
+    "The first valid date of the format in the text."
+    pattern, (day, month, year) = FORMATS[fmt]
+    for found in pattern.finditer(text):
+        y = int(found.group(year))
+        if y < 100:
+            y += 2000
+        try:
+            return datetime(y, _month(found.group(month)), int(found.group(day)))
+        except ValueError:
+            # Not a real date,  like 31 Feb or a 13th month.
+            continue
+    return None
+
+
+@lru_cache(maxsize=1024)
+def find_date(text: str, formats: tuple[str, ...] = ()) -> datetime | None:
+    "The date in the text,  trying `formats` first and then the other FORMATS. None when there's none."
+    for fmt in formats + tuple(name for name in FORMATS if name not in formats):
+        found = _match(fmt, text)
+        if found is not None:
+            return found
+    log.debug(
+        msg="No known date format in '{0}', falling back on datefinder.".format(text),
+    )
+    import datefinder
+
+    for found in datefinder.find_dates(text):
+        return found
+    return None
@@ -0,0 +1,133 @@
+"""The carriers the program can read,  each declared by its detection signatures and the import path
+of its CarrierBuilder.
+
+A builder's module is only imported once a document matches one of its carrier's signatures,  so
+nothing is paid for carriers a document doesn't use. The built-in carriers are declared below. More
+can be plugged in without touching the parser: list modules under `[parser] carrier_plugins` in the
+config,  each with a `CARRIERS` tuple of CarrierPlugins.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+import importlib
+import logging
+import threading
+
+from helper import get_setting
+from model.carriers.base import CarrierBuilder
+from model.carriers.signatures import CarrierIdentifier, Identification, Signature
+from model.doc.session import DocSession
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CarrierPlugin:
+    """A carrier the program can read.
+
+    Attributes:
+        name -- the carrier's name,  which each of its signatures must use
+        builder -- "module:Class" of its CarrierBuilder,  imported on first match
+        signatures -- what identifies its documents,  in order of precedence
+    """
+
+    name: str
+    builder: str
+    signatures: tuple[Signature, ...]
+
+
+CARRIERS: tuple[CarrierPlugin, ...] = (
+    CarrierPlugin(
+        "Concept",
+        "model.carriers.builders.concept:ConceptBuilder",
+        (Signature("Concept", ("Concept Special Risks",)),),
+    ),
+    CarrierPlugin(
+        "Kemah",
+        "model.carriers.builders.kemah:KemahBuilder",
+        (
+            Signature("Kemah", ("Company:", "Sutton")),
+            Signature("Kemah", ("KMYSS",)),
+        ),
+    ),
+    CarrierPlugin(
+        "Yachtinsure",
+        "model.carriers.builders.yachtinsure:YachtinsureBuilder",
+        (Signature("Yachtinsure", ("yachtinsure",), ignore_case=True),),
+    ),
+)
+
+
+class CarrierRegistry:
+    def __init__(self, plugins: Sequence[CarrierPlugin] = CARRIERS) -> None:
+        self.plugins: dict[str, CarrierPlugin] = {}
+        for plugin in plugins:
+            if plugin.name in self.plugins:
+                raise ValueError("Carrier {0} is registered twice.".format(plugin.name))
+            for signature in plugin.signatures:
+                if signature.carrier != plugin.name:
+                    raise ValueError(
+                        "Carrier {0} has a signature for {1}.".format(plugin.name, signature.carrier)
+                    )
+            self.plugins[plugin.name] = plugin
+        # Earlier plugins' signatures take precedence,  as the parser's old if/elif chain did.
+        self.identifier = CarrierIdentifier(
+            signature for plugin in self.plugins.values() for signature in plugin.signatures
+        )
+        self._builders: dict[str, type[CarrierBuilder]] = {}
+        self._lock = threading.Lock()
+
+    def builder_class(self, name: str) -> type[CarrierBuilder]:
+        "The carrier's CarrierBuilder class,  imported the first time it's needed."
+        with self._lock:
+            if name not in self._builders:
+                module, _, cls = self.plugins[name].builder.partition(":")
+                self._builders[name] = getattr(importlib.import_module(module), cls)
+                log.debug(
+                    msg="Imported {0} for {1}.".format(self.plugins[name].builder, name),
+                )
+            return self._builders[name]
+
+    def identify(self, first_page: list[str]) -> Identification | None:
+        return self.identifier.identify(first_page)
+
+    def build(
+        self, pages: Sequence[list[str]], pdf_path: Path, session: DocSession = None
+    ) -> CarrierBuilder | None:
+        "The CarrierBuilder for the carrier the first page matches. None when it matches none."
+        # Sorted blocks: when a page matches more than one carrier,  the block read first decides. Every
+        # builder reads the first page sorted anyway,  so a cheaper level would save nothing.
+        match = self.identify(pages[0])
+        if match is None:
+            return None
+        return self.builder_class(match.carrier)(pdf_path, pages, session)
+
+
+def plugins_from(modules: list[str]) -> list[CarrierPlugin]:
+    "The CARRIERS declared by each of the modules."
+    plugins = []
+    for name in modules:
+        module = importlib.import_module(name)
+        plugins.extend(module.CARRIERS)
+        log.debug(
+            msg="Loaded carrier(s) {0} from {1}.".format(
+                [plugin.name for plugin in module.CARRIERS], name
+            ),
+        )
+    return plugins
+
+
+_registry: CarrierRegistry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> CarrierRegistry:
+    "The built-in carriers plus any from the `[parser] carrier_plugins` modules,  built on first use."
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            modules = get_setting("parser", "carrier_plugins", "")
+            extra = plugins_from([name.strip() for name in modules.split(",") if name.strip()])
+            _registry = CarrierRegistry(CARRIERS + tuple(extra))
+        return _registry
@@ -0,0 +1,167 @@
+"""Declarative field extraction for the CarrierBuilders.
+
+A Rule says where one field's value is on a carrier's document and how to read it: the block holding
+(or being) an anchor phrase,  an offset from that block,  a regex and a conversion. A builder's rules
+are compiled once,  when its module is imported,  into an Extractor. The Extractor looks the blocks up
+in the builder's PageIndex and fills the same CarrierBuilder attributes the hand-written parsing did.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Iterable
+import logging
+import re
+
+from exceptions import surplus_lines as exceptions
+from model.carriers.base import CarrierBuilder
+from model.carriers.dates import find_date
+
+
+log = logging.getLogger(__name__)
+
+# A dollar amount as printed on the documents,  e.g. "1,234.50".
+MONEY = r"(-?[\d,]+(?:\.\d+)?)"
+
+# CarrierBuilder attributes that collect every value found rather than holding one.
+LIST_FIELDS = ("policy_nums", "premiums")
+
+
+def money(*amounts: str) -> float:
+    "The amounts,  with their thousands separators dropped,  added together."
+    return sum(float(amount.replace(",", "").strip()) for amount in amounts)
+
+
+def date(*formats: str) -> Callable[[str], datetime]:
+    "Reads the date in the text,  trying the carrier's date formats first (see model.carriers.dates)."
+    return lambda text: find_date(text, formats)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Where a field's value is and how to read it.
+
+    The text read is what follows the anchor in its own block,  or the whole block `offset` places
+    after it. `pattern` is searched in that text: its groups (or the whole match,  without groups)
+    are passed to `convert`.
+
+    Attributes:
+        field -- CarrierBuilder attribute to fill
+        anchor -- phrase locating the block
+        doc_types -- user_doc_types the rule is for,  all of them when empty
+        exact -- the anchor is the whole block,  not part of it
+        offset -- read the block this many places after the anchor's
+        pattern -- regex to search the text read for
+        convert -- turns the text (or the regex's groups) into the field's value
+        page -- only look on this page
+        which -- "first",  "last" or "all" of the anchor's blocks
+        exclude -- skip anchor blocks containing this
+        required -- raise DocParseError when a "first" or "last" rule finds nothing
+    """
+
+    field: str
+    anchor: str
+    doc_types: tuple[str, ...] = ()
+    exact: bool = False
+    offset: int = 0
+    pattern: str = None
+    convert: Callable[..., Any] = str.strip
+    page: int = None
+    which: str = "first"
+    exclude: str = None
+    required: bool = True
+
+
+class Extractor:
+    """A carrier's Rules,  checked and compiled once. A malformed Rule raises ValueError here;  a document
+    the rules can't read raises DocParseError when it's extracted."""
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self._rules: dict[str, list[tuple[Rule, re.Pattern]]] = {}
+        for rule in rules:
+            if rule.which not in ("first", "last", "all"):
+                raise ValueError("Rule for {0} has an unknown which: {1!r}".format(rule.field, rule.which))
+            regex = re.compile(rule.pattern) if rule.pattern else None
+            self._rules.setdefault(rule.field, []).append((rule, regex))
+
+    def rule_for(self, field: str, doc_type: str) -> tuple[Rule, re.Pattern] | None:
+        "The first of the field's rules that applies to the doc type."
+        for rule, regex in self._rules.get(field, ()):
+            if not rule.doc_types or doc_type in rule.doc_types:
+                return rule, regex
+        return None
+
+    def extract(self, builder: CarrierBuilder, field: str) -> Any:
+        """The field's value from the builder's pages: a list for "all" rules,  otherwise a single value
+        (None when nothing was found and the rule isn't required)."""
+        found = self.rule_for(field, builder.user_doc_type)
+        if found is None:
+            log.warning(
+                msg="{0} has no rule for {1} on a '{2}'.".format(builder.name, field, builder.user_doc_type),
+            )
+            raise exceptions.DocParseError(builder)
+        rule, regex = found
+        index = builder.index
+        if rule.exact:
+            positions = index.exact(rule.anchor, rule.page)
+        else:
+            positions = index.positions(rule.anchor, rule.page)
+        if rule.which == "last":
+            positions = positions[::-1]
+        values = []
+        for pos in positions:
+            block = index.block(pos)
+            if rule.exclude and rule.exclude in block:
+                continue
+            if rule.offset:
+                text = index.after(pos, rule.offset)
+            elif rule.exact:
+                text = block
+            else:
+                text = block.partition(rule.anchor)[2]
+            value = self._read(rule, regex, text)
+            log.debug(
+                msg="{0} {1}: anchor '{2}' at {3}, read '{4}' as {5!r}.".format(
+                    builder.name, field, rule.anchor, pos, text, value
+                ),
+            )
+            if rule.which != "all":
+                return self._single(builder, rule, value)
+            if value is not None:
+                values.append(value)
+        if rule.which == "all":
+            return values
+        return self._single(builder, rule, None)
+
+    def apply(self, builder: CarrierBuilder, field: str) -> Any:
+        """Extracts the field and stores it on the builder: list fields are extended,  dates are stored
+        as '%m/%d/%Y' like the rest of the program expects. Returns the extracted value."""
+        value = self.extract(builder, field)
+        if field in LIST_FIELDS:
+            if isinstance(value, list):
+                getattr(builder, field).extend(value)
+            elif value is not None:
+                getattr(builder, field).append(value)
+        elif isinstance(value, datetime):
+            setattr(builder, field, value.strftime("%m/%d/%Y"))
+        else:
+            setattr(builder, field, value)
+        return value
+
+    @staticmethod
+    def _read(rule: Rule, regex: re.Pattern, text: str) -> Any:
+        if regex is None:
+            return rule.convert(text)
+        match = regex.search(text)
+        if match is None:
+            return None
+        return rule.convert(*(match.groups() or (match.group(0),)))
+
+    @staticmethod
+    def _single(builder: CarrierBuilder, rule: Rule, value: Any) -> Any:
+        if value is None and rule.required:
+            log.warning(
+                msg="{0} couldn't read {1} using the anchor '{2}'.".format(
+                    builder.name, rule.field, rule.anchor
+                ),
+            )
+            raise exceptions.DocParseError(builder)
+        return value
@@ -0,0 +1,112 @@
+"""Which carrier issued a document,  told from the phrases on its first page.
+
+Each carrier's signatures are declared as data alongside its builder in model/carriers/registry.py.
+A signature matches when all of its phrases are in the same text block. Matching is plain substring
+tests,  first against the whole page and then,  for the signatures that passed,  block by block: with a
+few short phrases per carrier nothing written in Python beats them (see benchmarks/signatures.py).
+"""
+from dataclasses import dataclass, field
+from typing import Iterable
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Signature:
+    """Phrases that,  found together in one text block,  identify the carrier.
+
+    Attributes:
+        carrier -- name of the carrier,  as its CarrierBuilder names it
+        phrases -- every one of these must be in the block
+        ignore_case -- match the phrases in any case
+    """
+
+    carrier: str
+    phrases: tuple[str, ...]
+    ignore_case: bool = False
+
+
+@dataclass
+class Identification:
+    """The carrier a page was matched to.
+
+    Attributes:
+        carrier -- the carrier of the first block with a matching signature
+        block -- index of that block on the page
+        confidence -- share of all signature matches on the page that were this carrier's
+        matches -- number of signature matches per carrier
+    """
+
+    carrier: str
+    block: int
+    confidence: float
+    matches: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ambiguous(self) -> bool:
+        return len(self.matches) > 1
+
+
+class CarrierIdentifier:
+    def __init__(self, signatures: Iterable[Signature]) -> None:
+        self.signatures: tuple[Signature, ...] = tuple(signatures)
+        # Case-insensitive signatures are checked against lowercased text,  so their phrases are lowercased once here.
+        self._phrases: tuple[tuple[str, ...], ...] = tuple(
+            tuple(phrase.lower() for phrase in signature.phrases) if signature.ignore_case else signature.phrases
+            for signature in self.signatures
+        )
+        self._ignore_case: bool = any(signature.ignore_case for signature in self.signatures)
+
+    def identify(self, blocks: list[str]) -> Identification | None:
+        "Matches a page's text blocks against every signature. None when nothing matched."
+        # Whole-page substring checks first,  so only the signatures whose phrases are all somewhere on
+        # the page are checked block by block.
+        page = "\x00".join(blocks)
+        lowered = page.lower() if self._ignore_case else page
+        checks = [
+            (i, signature.ignore_case, self._phrases[i])
+            for i, signature in enumerate(self.signatures)
+            if all(phrase in (lowered if signature.ignore_case else page) for phrase in self._phrases[i])
+        ]
+        if not checks:
+            return None
+        ignore_case = any(case_insensitive for _, case_insensitive, _ in checks)
+        first: tuple[int, int] = None
+        matches: dict[str, int] = {}
+        for b, block in enumerate(blocks):
+            lowered = block.lower() if ignore_case else block
+            for i, case_insensitive, phrases in checks:
+                text = lowered if case_insensitive else block
+                for phrase in phrases:
+                    if phrase not in text:
+                        break
+                else:
+                    carrier = self.signatures[i].carrier
+                    matches[carrier] = matches.get(carrier, 0) + 1
+                    if first is None:
+                        first = (b, i)
+        # The phrases can be on the page without sharing a block.
+        if first is None:
+            return None
+        b, i = first
+        carrier = self.signatures[i].carrier
+        identification = Identification(
+            carrier=carrier,
+            block=b,
+            confidence=round(matches[carrier] / sum(matches.values()), 2),
+            matches=matches,
+        )
+        log.debug(
+            msg="Matched the page to {0} at block {1} with confidence {2}. Signature matches per carrier: {3}".format(
+                carrier, b, identification.confidence, matches
+            ),
+        )
+        if identification.ambiguous:
+            log.warning(
+                msg="The page matched more than one carrier: {0}. Going with {1}, the first match.".format(
+                    matches, carrier
+                ),
+            )
+        return identification
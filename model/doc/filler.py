@@ -1,12 +1,17 @@
 import fitz
 from pathlib import Path
 import logging
+import threading
 
 from helper import FSL_DOC_PATH, resource_path
+from model.doc.session import DocSession
 
 
 log = logging.getLogger(__name__)
 
+# MuPDF isn't thread safe,  so stamps for concurrent payloads are filled one at a time.
+_fitz_lock = threading.Lock()
+
 
 class DocFiller:
     def __init__(self, output_dir) -> None:
@@ -24,7 +29,7 @@ class DocFiller:
         Returns:
             list[Path]: Paths to the stamp files--to be combined later.
         """
-        with fitz.open(FSL_DOC_PATH) as doc:
+        with _fitz_lock, fitz.open(FSL_DOC_PATH) as doc:
             out = fitz.open()
             for page in doc:  # Iterate through each page
                 widgets = page.widgets()  # Get the form fields
@@ -54,8 +59,11 @@ class DocFiller:
         user_doc_path: Path,
         stamps: list[Path],
         insert_index: int,
+        session: DocSession = None,
     ) -> Path:
-        user_doc = fitz.open(user_doc_path)
+        """Inserts the stamps into the user's doc and saves it to the output folder. Uses the job's
+        already-open document when a session is given; the session stays responsible for closing it."""
+        user_doc = session.doc if session else fitz.open(user_doc_path)
         insert_index -= 1
         for stamp in stamps:
             insert_index += 1
@@ -101,9 +109,10 @@ class DocFiller:
                 exc_info=1,
             )
         user_doc.save(new_file_path)
-        user_doc.close()
+        if not session:
+            user_doc.close()
         log.debug(
-            msg="Saved and closed the stamped file.",
+            msg="Saved the stamped file.",
             exc_info=1,
         )
         return str(new_file_path)
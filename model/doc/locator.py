@@ -0,0 +1,147 @@
+"""Finds the page of a long document that holds a given text block,  such as a Kemah policy's
+declarations page,  without sorting every page's text into blocks first.
+
+Each page gets a cheap check on its raw,  unsorted text (Level.RAW). Only a page that passes is
+extracted into blocks (through the DocSession,  so they're kept) to confirm the block is really there. Long
+documents can be checked in chunks on a pool of worker processes: chunks are confirmed in page order
+and the rest are cancelled as soon as one matches.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+import logging
+import threading
+
+import fitz
+
+from helper import get_setting
+from model.doc.session import DocSession, Level, page_text
+
+
+log = logging.getLogger(__name__)
+
+
+def candidates(doc: fitz.Document, start: int, end: int, needle: str) -> list[int]:
+    "Indexes from start to end (inclusive) whose raw text contains the needle."
+    return [index for index in range(start, end + 1) if needle in page_text(doc[index])]
+
+
+def _scan_file(pdf_path: str, start: int, end: int, needle: str) -> list[int]:
+    "Runs in a worker process."
+    with fitz.open(pdf_path) as doc:
+        return candidates(doc, start, end, needle)
+
+
+class PageLocator:
+    """Finds the first page,  in scan order,  with a block that's exactly `needle`.
+
+    Documents with at least `min_pages` pages to scan are split into `chunk_size` page chunks and
+    handed to `workers` processes. With `workers` = 0 everything runs in this process.
+    """
+
+    def __init__(self, workers: int = 0, min_pages: int = 40, chunk_size: int = 8) -> None:
+        self.workers = workers
+        self.min_pages = min_pages
+        self.chunk_size = chunk_size
+        self._executor: ProcessPoolExecutor = None
+        self._lock = threading.Lock()
+
+    def find(self, session: DocSession, needle: str, start: int, end: int) -> int | None:
+        end = min(end, len(session) - 1)
+        if start > end:
+            return None
+        if self.workers and end - start + 1 >= self.min_pages:
+            return self._find_parallel(session, needle, start, end)
+        return self._find_serial(session, needle, start, end)
+
+    def _find_serial(self, session: DocSession, needle: str, start: int, end: int) -> int | None:
+        for index in range(start, end + 1):
+            blocks = session.cached_page(index)
+            if blocks is not None:
+                if needle in blocks:
+                    return index
+                continue
+            if needle in session.page(index, Level.RAW)[0] and self._confirm(session, needle, index):
+                return index
+        return None
+
+    def _find_parallel(self, session: DocSession, needle: str, start: int, end: int) -> int | None:
+        executor = self._get_executor()
+        chunks: list[Future] = [
+            executor.submit(
+                _scan_file,
+                str(session.pdf_path),
+                first,
+                min(first + self.chunk_size - 1, end),
+                needle,
+            )
+            for first in range(start, end + 1, self.chunk_size)
+        ]
+        log.debug(
+            msg="Scanning pages {0} to {1} for '{2}' in {3} chunk(s) on {4} process(es).".format(
+                start, end, needle, len(chunks), self.workers
+            ),
+        )
+        try:
+            for chunk in chunks:
+                for index in chunk.result():
+                    if self._confirm(session, needle, index):
+                        return index
+            return None
+        finally:
+            for chunk in chunks:
+                chunk.cancel()
+
+    def _confirm(self, session: DocSession, needle: str, index: int) -> bool:
+        # Whether a block is exactly the needle doesn't depend on block order.
+        found = needle in session.page(index, Level.BLOCKS)
+        log.debug(
+            msg="Page index {0} has '{1}' in its raw text, {2} as a block.".format(
+                index, needle, "confirmed" if found else "but not"
+            ),
+        )
+        return found
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_locator: PageLocator = None
+_locator_lock = threading.Lock()
+
+
+def get_locator() -> PageLocator:
+    "Returns the process-wide locator,  built from the [parser] config section on first use."
+    global _locator
+    with _locator_lock:
+        if _locator is None:
+            _locator = PageLocator(
+                workers=int(get_setting("parser", "locate_workers", "0")),
+                min_pages=int(get_setting("parser", "locate_min_pages", "40")),
+                chunk_size=int(get_setting("parser", "locate_chunk_size", "8")),
+            )
+        return _locator
+
+
+def set_locator(locator: PageLocator) -> None:
+    """Replaces the process-wide locator,  such as with a serial one in a process that's already one of
+    several workers."""
+    global _locator
+    with _locator_lock:
+        if _locator is not None:
+            _locator.close()
+        _locator = locator
+
+
+def shutdown_locator() -> None:
+    "Stops the locator's worker processes,  if it started any."
+    with _locator_lock:
+        if _locator is not None:
+            _locator.close()
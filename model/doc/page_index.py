@@ -0,0 +1,103 @@
+from typing import Iterable, Sequence
+import logging
+
+
+log = logging.getLogger(__name__)
+
+# (page, block) within the indexed pages.
+Position = tuple[int, int]
+
+
+class _PageEntry:
+    "One page's blocks by exact text and by the anchors they contain."
+
+    def __init__(self, blocks: list[str], anchors: Iterable[str]) -> None:
+        self.blocks = blocks
+        self.exact: dict[str, list[int]] = {}
+        self.containing: dict[str, list[int]] = {anchor: [] for anchor in anchors}
+        for b, block in enumerate(blocks):
+            self.exact.setdefault(block, []).append(b)
+            for anchor, found in self.containing.items():
+                if anchor in block:
+                    found.append(b)
+
+    def containing_anchor(self, anchor: str) -> list[int]:
+        if anchor not in self.containing:
+            log.debug(
+                msg="Indexing undeclared anchor '{0}'.".format(anchor),
+            )
+            self.containing[anchor] = [b for b, block in enumerate(self.blocks) if anchor in block]
+        return self.containing[anchor]
+
+
+class PageIndex:
+    """Where each text block and anchor phrase sits in a document's pages,  so the CarrierBuilders can
+    look fields up instead of walking every block for every field.
+
+    Each page is indexed in one pass the first time a lookup needs it: its blocks by their exact text
+    (for `list.index` style lookups) and by the `anchors` they contain. Lookups limited to a page
+    never touch the other pages,  so with lazily extracted pages the rest aren't even extracted.
+    An anchor that wasn't declared up front is indexed the first time it's asked for.
+    Positions always come back in document order.
+    """
+
+    def __init__(self, pages: Sequence[list[str]], anchors: Iterable[str] = ()) -> None:
+        self.pages = pages
+        self.anchors: tuple[str, ...] = tuple(anchors)
+        self._entries: dict[int, _PageEntry] = {}
+
+    def _entry(self, page: int) -> _PageEntry:
+        if page not in self._entries:
+            self._entries[page] = _PageEntry(self.pages[page], self.anchors)
+        return self._entries[page]
+
+    def _pages(self, page: int = None) -> Iterable[int]:
+        if page is None:
+            return range(len(self.pages))
+        self._check_page(page)
+        return (page,)
+
+    def positions(self, anchor: str, page: int = None) -> list[Position]:
+        "Every block containing the anchor,  optionally only on one page."
+        return [
+            (p, b) for p in self._pages(page) for b in self._entry(p).containing_anchor(anchor)
+        ]
+
+    def blocks_with(self, anchor: str, page: int = None) -> list[str]:
+        return [self.block(pos) for pos in self.positions(anchor, page)]
+
+    def first(self, anchor: str, page: int = None) -> Position | None:
+        for p in self._pages(page):
+            found = self._entry(p).containing_anchor(anchor)
+            if found:
+                return (p, found[0])
+        return None
+
+    def exact(self, text: str, page: int = None) -> list[Position]:
+        "Every block that is exactly `text`,  optionally only on one page."
+        return [(p, b) for p in self._pages(page) for b in self._entry(p).exact.get(text, ())]
+
+    def index(self, text: str, page: int = None) -> Position:
+        "The first block that is exactly `text`. Raises ValueError like list.index when there's none."
+        for p in self._pages(page):
+            found = self._entry(p).exact.get(text)
+            if found:
+                return (p, found[0])
+        raise ValueError("{0!r} is not a block{1}".format(
+            text, "" if page is None else " on page {0}".format(page)
+        ))
+
+    def block(self, pos: Position) -> str:
+        return self._entry(pos[0]).blocks[pos[1]]
+
+    def after(self, pos: Position, offset: int = 1) -> str:
+        "The block `offset` places after `pos` on the same page. Raises IndexError past the page's end."
+        page, b = pos
+        blocks = self._entry(page).blocks
+        if b + offset >= len(blocks):
+            raise IndexError("No block {0} after {1}".format(offset, pos))
+        return blocks[b + offset]
+
+    def _check_page(self, page: int) -> None:
+        if not 0 <= page < len(self.pages):
+            raise IndexError("No page {0}, the document has {1}".format(page, len(self.pages)))
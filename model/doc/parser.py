@@ -2,26 +2,21 @@ from pathlib import Path
 from datetime import date
 import logging
 
-import fitz
-
 from exceptions import surplus_lines as exceptions
 from model.carriers.base import CarrierBuilder
-from model.carriers.builders.concept import ConceptBuilder
-from model.carriers.builders.kemah import KemahBuilder
-from model.carriers.builders.yachtinsure import (
-    YachtinsureBuilder,
-)
+from model.carriers.registry import get_registry
+from model.doc.locator import get_locator
+from model.doc.session import DocSession, LazyPages, page_contents
 
 
 log = logging.getLogger(__name__)
 
 
 class DocParser:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, session: DocSession):
+        self.session = session
         pages = self.get_first_three_pages(pdf_path)
-        log.debug(
-            msg="Saved first three pages of the user's doc",
-        )
+        self.pages = pages
         self.market = self.identify_mrkt(pages, pdf_path)
         log.debug(
             msg="Identified the market as: {0}, and assigned the pages to the CarrierBuilder class.".format(self.market.name),
@@ -31,7 +26,7 @@ class DocParser:
             msg="Identified the doc_type as: {0}".format(doc_type),
         )
 
-        if isinstance(self.market, KemahBuilder) and doc_type == "policy":
+        if self.market.name == "Kemah" and doc_type == "policy":
             for block in pages[0]:
                 if (
                     "Recreational Yacht Insurance Policy" in block
@@ -40,10 +35,10 @@ class DocParser:
                     log.debug(
                         msg="Dec Page not detected on first page... Locating Dec Page within the rest of the Kemah doc...",
                     )
-                    doc = fitz.open(pdf_path)
+                    doc = self.session
                     start_indx = 15
                     log.debug(
-                        msg="Opened user's doc, starting our search for the Dec Page at page index {0}".format(
+                        msg="Starting our search for the Dec Page at page index {0}".format(
                             start_indx
                         ),
                     )
@@ -81,25 +76,24 @@ class DocParser:
                 exc_info=1,
             )
 
-    def identify_mrkt(self, pages: list[list[str]], pdf_path: Path) -> CarrierBuilder:
-        for block in pages[0]:
-            if "Concept Special Risks" in block:
-                return ConceptBuilder(pdf_path, pages)
-            elif "Company:" in block and "Sutton" in block:
-                return KemahBuilder(pdf_path, pages[0])
-            elif "KMYSS" in block:
-                return KemahBuilder(pdf_path, pages[0])
-            elif "yachtinsure" in block.lower():
-                return YachtinsureBuilder(pdf_path, pages)
+    def identify_mrkt(self, pages: LazyPages, pdf_path: Path) -> CarrierBuilder:
+        market = get_registry().build(pages, pdf_path, self.session)
+        if market is not None:
+            return market
         log.debug(
-            msg="Couldn't identify the market from user's doc. The PDF path was {0}. The pages were: {1}".format(
-                pdf_path, pages
+            msg="Couldn't identify the market from user's doc. The PDF path was {0}. The first page was: {1}".format(
+                pdf_path, pages[0]
             ),
             exc_info=1,
         )
         raise exceptions.DocParseError(pdf_path)
 
-    def build_market_class(self, pdf_path: Path) -> tuple[CarrierBuilder, str]:
+    def build_market_class(
+        self, pdf_path: Path, override_not_applicable: bool = None
+    ) -> tuple[CarrierBuilder, str]:
+        """Reads every field into the CarrierBuilder. When the doc doesn't look like it needs a stamp,  the
+        user is asked whether to carry on,  unless `override_not_applicable` already answers that (for
+        running without anyone to ask,  as batch.py does)."""
         log.info(
             msg="Checking to ensure a stamp is required for this document.",
         )
@@ -113,8 +107,10 @@ class DocParser:
                 )
                 raise exceptions.SurplusLinesNotApplicable(self.market)
         except exceptions.SurplusLinesNotApplicable as e:
-           
-            result = exceptions.spawn_message("Error", str(e), 0x10 | 0x05)
+            if override_not_applicable is None:
+                result = exceptions.spawn_message("Error", str(e), 0x10 | 0x05)
+            else:
+                result = 4 if override_not_applicable else 2
             # btn = Retry Cancel
             # Allow user to override error and continue, or cancel.
             log.warning(
@@ -176,60 +172,44 @@ class DocParser:
         log.debug(
             msg="CarrierBuilder object: {0}".format(self.market),
         )
+        log.debug(
+            msg="Parsed using {0} of the first {1} page(s), {2} page(s) of the doc extracted in all, at levels: {3}".format(
+                self.pages.extracted,
+                len(self.pages),
+                self.session.pages_extracted,
+                {index: level.name for index, level in self.session.levels.items()},
+            ),
+        )
         return self.market, trans_type
 
-    def get_first_three_pages(self, pdf_path) -> list[list[str]]:
-        doc = fitz.open(pdf_path)
-        pages = []
-        pages.append(self.get_page_contents(doc[0]))
-        if len(doc) >= 2:
-            pages.append(self.get_page_contents(doc[1]))
-            if len(doc) >= 3:
-                pages.append(self.get_page_contents(doc[2]))
+    def get_first_three_pages(self, pdf_path) -> LazyPages:
+        "Up to the first 3 pages of user's doc. Each one is only extracted once a builder looks at it."
+        pages = self.session.first_pages(3)
         log.debug(
-            msg="Finished saving up to the first 3 pages of user's doc. Total number of pages saved: {0}".format(
+            msg="Up to the first 3 pages of user's doc are available to the builder. Total number of pages: {0}".format(
                 len(pages)
             ),
-            exc_info=1,
         )
         return pages
 
-    def locate_policy_page(self, doc, start_indx: int, end_indx: int) -> bool:
-        _index = start_indx
-        while _index <= end_indx:
-            page = self.get_page_contents(doc[_index])
-            try:
-                page.index("5. Declarations Page")
-            except ValueError:
-                _index += 1
-            else:
-                self.market.insert_page_index = _index + 1
-                # self.market.pages.append(doc[_index])
-                self.market.pages = page
-                log.debug(
-                    msg="Identified the dec page and assigned the insert_page_index as {0}.  Added Dec Page to the market's pages attr.".format(
-                        self.market.insert_page_index
-                    ),
-                    exc_info=1,
-                )
-                return True
-        return False
+    def locate_policy_page(self, doc: DocSession, start_indx: int, end_indx: int) -> bool:
+        _index = get_locator().find(doc, "5. Declarations Page", start_indx, end_indx)
+        if _index is None:
+            return False
+        self.market.insert_page_index = _index + 1
+        # self.market.pages.append(doc[_index])
+        self.market.pages = doc.page(_index)
+        log.debug(
+            msg="Identified the dec page and assigned the insert_page_index as {0}.  Added Dec Page to the market's pages attr.".format(
+                self.market.insert_page_index
+            ),
+            exc_info=1,
+        )
+        return True
 
     @staticmethod
     def get_page_contents(pg) -> list[str]:
-        blocks = pg.get_text("blocks", sort=True)
-        page = []
-        for block in blocks:
-            interim = block[4].replace("’", "'")
-            formatted = interim.strip().replace("\n", " ")
-            page.append(formatted)
-        # log.debug(
-        #     msg="Finished saving the formatted blocks within the page. Formatted page results: {0}".format(
-        #         page
-        #     ),
-        #     exc_info=1,
-        # )
-        return page
+        return page_contents(pg)
 
     @staticmethod
     def _add_one_year(date_obj):
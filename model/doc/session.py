@@ -0,0 +1,236 @@
+from enum import IntEnum
+from pathlib import Path
+from typing import Sequence
+import copy
+import logging
+import threading
+
+import fitz
+
+from model.doc.text_cache import TextCache, content_hash
+
+
+log = logging.getLogger(__name__)
+
+
+class Level(IntEnum):
+    """How much of a page's layout its extracted text keeps,  cheapest first. A page extracted at one
+    level serves any request for a lower one,  so a step only says the least it needs.
+
+    RAW -- the page's whole text as a single block,  whitespace collapsed. Only good for asking whether
+        a phrase is on the page: a phrase can run across two blocks
+    BLOCKS -- the text blocks in the order the PDF stores them. Good for lookups by a block's text that
+        don't care which block comes first
+    SORTED -- the text blocks in reading order,  for reading one block relative to another
+    """
+
+    RAW = 1
+    BLOCKS = 2
+    SORTED = 3
+
+
+def normalize(text: str) -> str:
+    "Collapses whitespace and straightens apostrophes,  so raw text compares like the sorted blocks."
+    return " ".join(text.replace("’", "'").split())
+
+
+def page_text(pg: fitz.Page) -> str:
+    """A page's raw,  unsorted text. No flags: ligatures,  whitespace and clipping are left unprocessed,
+    which only matters to a phrase check by letting a few extra pages through."""
+    return normalize(pg.get_text("text", flags=0, sort=False))
+
+
+def page_blocks(pg: fitz.Page) -> list[tuple]:
+    "A page's text block tuples (with their coordinates) in the order the PDF stores them."
+    return pg.get_text("blocks", sort=False)
+
+
+def sort_blocks(blocks: list[tuple]) -> list[tuple]:
+    "Reading order,  exactly as fitz's `sort=True` orders them: by each block's bottom,  then its left."
+    return sorted(blocks, key=lambda block: (block[3], block[0]))
+
+
+def flatten(blocks: list[tuple]) -> list[str]:
+    "The blocks' text,  each flattened onto one line with straight apostrophes."
+    page = []
+    for block in blocks:
+        interim = block[4].replace("’", "'")
+        formatted = interim.strip().replace("\n", " ")
+        page.append(formatted)
+    return page
+
+
+def page_contents(pg: fitz.Page) -> list[str]:
+    "A page's text blocks in reading order,  each flattened onto one line with straight apostrophes."
+    return flatten(sort_blocks(page_blocks(pg)))
+
+
+class DocSession:
+    """The user's PDF for one job: read from disk once and opened once,  then shared by the parser,
+    the CarrierBuilder and the filler. Pages are only extracted when first asked for, then kept.
+
+    With a TextCache,  pages already extracted from a file with the same content come from the cache,
+    and the PDF itself isn't opened until something needs the document (such as combining the stamps).
+
+    Pages are extracted at the Level asked for. Building fitz's text page is nearly all of the cost at
+    every level,  so a page is never extracted twice where it can be helped: unsorted blocks keep their
+    coordinates and are sorted in place when a step needs reading order. Only a RAW page asked for
+    blocks later is extracted again.
+
+    Close it (or use it as a context manager) when the job is done.
+    """
+
+    def __init__(self, pdf_path: Path, cache: TextCache = None) -> None:
+        self.pdf_path: Path = Path(pdf_path)
+        # fitz reads from this buffer for as long as the document is open,  so it's kept here.
+        self.data: bytes = self.pdf_path.read_bytes()
+        self.cache: TextCache = cache
+        self.digest: str = content_hash(self.data) if cache else None
+        self._doc: fitz.Document = None
+        self._page_count: int = None
+        # Sorted blocks,  then the cheaper levels of pages nothing has needed sorted yet.
+        self._pages: dict[int, list[str]] = {}
+        self._blocks: dict[int, tuple[list[tuple], list[str]]] = {}
+        self._text: dict[int, str] = {}
+        self._lock = threading.RLock()
+        log.debug(
+            msg="Read {0} ({1:,} bytes) for this job.".format(self.pdf_path, len(self.data)),
+        )
+
+    @property
+    def doc(self) -> fitz.Document:
+        with self._lock:
+            if self._doc is None:
+                self._doc = fitz.open(stream=self.data, filetype="pdf")
+                log.debug(
+                    msg="Opened {0}, {1} pages.".format(self.pdf_path, len(self._doc)),
+                )
+            return self._doc
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._page_count is None:
+                if self.cache:
+                    self._page_count = self.cache.page_count(self.digest)
+                if self._page_count is None:
+                    self._page_count = len(self.doc)
+                    if self.cache:
+                        self.cache.put_page_count(self.digest, self._page_count)
+            return self._page_count
+
+    def page(self, index: int, level: Level = Level.SORTED) -> list[str]:
+        """The text blocks of the page at `index`,  extracted (or read from the text cache) on first use.
+        At least as much as `level` asks for: a page already extracted at a higher level is served as is."""
+        with self._lock:
+            blocks = self.cached_page(index)
+            if blocks is not None:
+                return [normalize(" ".join(blocks))] if level == Level.RAW else blocks
+            if level == Level.RAW:
+                if index in self._blocks:
+                    return [normalize(" ".join(self._blocks[index][1]))]
+                if index not in self._text:
+                    self._text[index] = page_text(self.doc[index])
+                return [self._text[index]]
+            if index not in self._blocks:
+                raw = page_blocks(self.doc[index])
+                self._blocks[index] = (raw, flatten(raw))
+            if level == Level.BLOCKS:
+                return self._blocks[index][1]
+            blocks = flatten(sort_blocks(self._blocks.pop(index)[0]))
+            if self.cache:
+                self.cache.put(self.digest, index, blocks)
+            self._pages[index] = blocks
+            self._text.pop(index, None)
+            return blocks
+
+    def cached_page(self, index: int) -> list[str] | None:
+        "The page's text blocks if they're already in memory or the text cache,  without extracting them."
+        with self._lock:
+            if index not in self._pages and self.cache:
+                blocks = self.cache.get(self.digest, index)
+                if blocks is not None:
+                    self._pages[index] = blocks
+            return self._pages.get(index)
+
+    def first_pages(self, count: int = 3) -> "LazyPages":
+        "Up to the first `count` pages,  each only extracted when something indexes into it."
+        return LazyPages(self, count)
+
+    @property
+    def levels(self) -> dict[int, Level]:
+        "The level each page extracted so far is held at,  by page index."
+        with self._lock:
+            levels = {index: Level.RAW for index in self._text}
+            levels.update((index, Level.BLOCKS) for index in self._blocks)
+            levels.update((index, Level.SORTED) for index in self._pages)
+            return dict(sorted(levels.items()))
+
+    @property
+    def pages_extracted(self) -> int:
+        return len(self.levels)
+
+    def close(self) -> None:
+        with self._lock:
+            log.debug(
+                msg="Closing {0}, {1} page(s) were read.".format(
+                    self.pdf_path, self.pages_extracted
+                ),
+            )
+            if self._doc is not None and not self._doc.is_closed:
+                self._doc.close()
+            self._doc = None
+            self.data = b""
+            self._pages.clear()
+            self._blocks.clear()
+            self._text.clear()
+
+    def __enter__(self) -> "DocSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LazyPages(Sequence):
+    """The first `count` pages of a DocSession as a sequence of text block lists. A page is extracted
+    (or read from the text cache) at `level` the first time it's indexed and kept by the session after
+    that."""
+
+    def __init__(self, session: DocSession, count: int = None, level: Level = Level.SORTED) -> None:
+        self.session = session
+        self.count = count
+        self.level = level
+        self._touched: set[int] = set()
+
+    def at(self, level: Level) -> "LazyPages":
+        "The same pages read at another level. Pages asked for through either count as extracted."
+        if level == self.level:
+            return self
+        pages = copy.copy(self)
+        pages.level = level
+        return pages
+
+    def __len__(self) -> int:
+        if self.count is None:
+            return len(self.session)
+        return min(self.count, len(self.session))
+
+    def __getitem__(self, index: int | slice) -> list[str] | list[list[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        self._touched.add(index)
+        return self.session.page(index, self.level)
+
+    @property
+    def extracted(self) -> int:
+        "How many of the pages have been asked for."
+        return len(self._touched)
+
+    def __repr__(self) -> str:
+        return "<LazyPages {0} of {1} page(s) extracted from {2}, read at {3}>".format(
+            self.extracted, len(self), self.session.pdf_path.name, self.level.name
+        )
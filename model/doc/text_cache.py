@@ -0,0 +1,161 @@
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from helper import CACHE_DIR, get_setting
+
+
+log = logging.getLogger(__name__)
+
+# Bump whenever the way page text is extracted or normalized changes,  so old entries aren't served.
+EXTRACTION_VERSION = "1"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class TextCache:
+    """Disk-backed cache of each PDF page's normalized text blocks,  keyed on the file's content hash and
+    the page index. Dropping the same PDF again (after a template fix or a retry) then skips PyMuPDF's
+    text extraction for every page seen before,  whatever the file is called.
+
+    The page count of each document is kept too. Pages are evicted least-recently-used once their
+    blocks add up to more than `max_mb`. Entries from another EXTRACTION_VERSION are purged on open.
+    """
+
+    def __init__(self, path: Path, max_mb: float = 50, version: str = EXTRACTION_VERSION) -> None:
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.version = version
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    doc_hash TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    blocks TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    version TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (doc_hash, page)
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)"
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    doc_hash TEXT PRIMARY KEY,
+                    page_count INTEGER NOT NULL
+                )"""
+            )
+            conn.execute("DELETE FROM pages WHERE version != ?", (self.version,))
+
+    def get(self, doc_hash: str, page: int) -> list[str] | None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT blocks FROM pages WHERE doc_hash = ? AND page = ?",
+                (doc_hash, page),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE pages SET last_used = ? WHERE doc_hash = ? AND page = ?",
+                (now, doc_hash, page),
+            )
+            self.hits += 1
+        log.debug(
+            msg="Text cache hit for page {0} of {1}.".format(page, doc_hash[:12]),
+        )
+        return json.loads(row[0])
+
+    def put(self, doc_hash: str, page: int, blocks: list[str]) -> None:
+        data = json.dumps(blocks)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_hash, page, data, len(data), self.version, time.time()),
+            )
+            # Drop the least recently used pages beyond the size budget.
+            conn.execute(
+                """DELETE FROM pages WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(size) OVER (ORDER BY last_used DESC) AS running
+                        FROM pages
+                    ) WHERE running > ?
+                )""",
+                (self.max_bytes,),
+            )
+            conn.execute(
+                "DELETE FROM documents WHERE doc_hash NOT IN (SELECT DISTINCT doc_hash FROM pages)"
+            )
+
+    def page_count(self, doc_hash: str) -> int | None:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT page_count FROM documents WHERE doc_hash = ?",
+                (doc_hash,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_page_count(self, doc_hash: str, page_count: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?)",
+                (doc_hash, page_count),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+            conn.execute("DELETE FROM documents")
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock, self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_cache: TextCache = None
+_cache_lock = threading.Lock()
+
+
+def get_text_cache() -> TextCache | None:
+    "Returns the process-wide text cache built from the [cache] config section,  or None when it's turned off."
+    global _cache
+    if get_setting("cache", "text_cache", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TextCache(
+                path=CACHE_DIR / "text.sqlite3",
+                max_mb=float(get_setting("cache", "text_cache_mb", "50")),
+            )
+        return _cache
@@ -0,0 +1,127 @@
+"""Keeps the headless estimator session lean: requests we never use are blocked through the DevTools
+protocol,  and the browser is launched without extensions or first-run work,  with a disk cache that
+outlives any one session. How each browser engine is set up for this lives in model/web/engines.py.
+
+`Network.setBlockedURLs` only takes URL patterns,  and blocking by resource type through the `Fetch`
+domain needs an event listener selenium's `execute_cdp_cmd` can't give us. So resource types are
+blocked by the file extensions they're served under,  plus the browser's own image setting for images.
+"""
+from collections import Counter
+from pathlib import Path
+import json
+import logging
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+log = logging.getLogger(__name__)
+
+# Launch arguments for Chromium-based browsers (Edge, Chromium).
+LEAN_ARGUMENTS: tuple[str, ...] = (
+    "--disable-extensions",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--mute-audio",
+)
+
+# Analytics,  tag managers and ad/tracking scripts. None of them are needed to fill the form.
+DEFAULT_PATTERNS: tuple[str, ...] = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*/analytics.js*",
+    "*/gtag/js*",
+)
+
+RESOURCE_TYPE_PATTERNS: dict[str, tuple[str, ...]] = {
+    "image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*"),
+    "font": ("*.woff*", "*.ttf*", "*.otf*", "*.eot*"),
+    "media": ("*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*"),
+    "stylesheet": ("*.css*",),
+}
+
+
+def split_setting(value: str) -> list[str]:
+    "Turns a comma separated config value into its non-empty,  stripped parts."
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def block_patterns(patterns: list[str], resource_types: list[str]) -> list[str]:
+    "Every URL pattern to block: the given patterns plus those standing in for each resource type."
+    blocked = list(patterns)
+    for resource_type in resource_types:
+        if resource_type not in RESOURCE_TYPE_PATTERNS:
+            log.warning(
+                msg="Can't block unknown resource type '{0}', expected one of {1}.".format(
+                    resource_type, list(RESOURCE_TYPE_PATTERNS)
+                ),
+            )
+            continue
+        blocked.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    # Keep the order,  drop repeats.
+    return list(dict.fromkeys(blocked))
+
+
+def slot_cache_dir(cache_dir: Path, engine: str, slot: int, pool: str = "") -> Path:
+    """The disk cache directory kept for one pool slot,  so a relaunched browser starts with the
+    estimator's scripts and styles already cached. One per slot: two browsers can't share a cache,
+    one per engine: they don't share a cache format,  and one per `pool`: pools for different launch
+    options number their slots independently."""
+    slot_dir = cache_dir / "browser" / engine / pool / f"slot{slot}"
+    slot_dir.mkdir(parents=True, exist_ok=True)
+    return slot_dir
+
+
+def apply_blocking(driver: WebDriver, patterns: list[str]) -> None:
+    "Blocks every request whose URL matches one of the patterns,  for the life of the session."
+    if not patterns:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    log.debug(
+        msg="Blocking {0} URL pattern(s) in the new session: {1}".format(
+            len(patterns), patterns
+        ),
+    )
+
+
+def page_weight(driver: WebDriver) -> dict[str, int | dict[str, int]]:
+    """Drains the session's DevTools network events and totals them: requests made,  bytes received,
+    and requests blocked (overall and by resource type). Covers everything since the last drain."""
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        log.debug(
+            msg="No performance log on this session, can't report page weight.",
+            exc_info=1,
+        )
+        return {}
+    resource_types: dict[str, str] = {}
+    report = {
+        "requests": 0,
+        "bytes": 0,
+        "blocked": 0,
+        "blocked_by_type": Counter(),
+    }
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            report["requests"] += 1
+            resource_types[params["requestId"]] = params.get("type", "Other")
+        elif method == "Network.loadingFinished":
+            report["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            report["blocked"] += 1
+            resource_type = params.get("type") or resource_types.get(params["requestId"], "Other")
+            report["blocked_by_type"][resource_type] += 1
+    report["blocked_by_type"] = dict(report["blocked_by_type"])
+    return report
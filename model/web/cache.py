@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from helper import CACHE_DIR, get_setting
+from model.web.scraper import Payload, Response
+
+
+log = logging.getLogger(__name__)
+
+
+class EstimatorCache:
+    """Disk-backed cache of estimator Responses,  keyed on every Payload field the estimator looks at.
+
+    Entries are evicted least-recently-used once there are more than `max_entries`,  expire after
+    `ttl_days`,  and are ignored (then purged) once the `fee_schedule` they were stored under no longer
+    matches the configured one. Bump the fee_schedule in the config whenever FSLSO changes its rates.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 5000,
+        ttl_days: float = 30,
+        fee_schedule: str = "",
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        self.fee_schedule = fee_schedule
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    fee_schedule TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE fee_schedule != ?",
+                (self.fee_schedule,),
+            )
+
+    @staticmethod
+    def make_key(payload: Payload) -> str:
+        return json.dumps(
+            [
+                str(payload.eff_date),
+                str(payload.transaction_type),
+                str(payload.coverage_code),
+                str(payload.tax_status),
+                "{:.2f}".format(float(payload.premium)),
+                "{:.2f}".format(float(payload.policy_fee)),
+            ]
+        )
+
+    def get(self, payload: Payload, allow_stale: bool = False) -> Response | None:
+        """Looks up the payload's Response. Expired entries are kept around (until LRU eviction) so that
+        `allow_stale` can still serve them when the estimator is down."""
+        key = self.make_key(payload)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, fee_schedule, created FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                log.debug(
+                    msg="Estimator cache miss for {0}.".format(key),
+                )
+                return None
+            response, fee_schedule, created = row
+            if fee_schedule != self.fee_schedule:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                log.debug(
+                    msg="Estimator cache entry for {0} is from an old fee schedule, dropping it.".format(
+                        key
+                    ),
+                )
+                return None
+            if now - created > self.ttl and not allow_stale:
+                self.misses += 1
+                log.debug(
+                    msg="Estimator cache entry for {0} has expired.".format(key),
+                )
+                return None
+            conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+        log.debug(
+            msg="Estimator cache hit for {0}.".format(key),
+        )
+        return Response(**json.loads(response))
+
+    def put(self, payload: Payload, response: Response) -> None:
+        key = self.make_key(payload)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(asdict(response)), self.fee_schedule, now, now),
+            )
+            conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock, self._connect() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_cache: EstimatorCache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> EstimatorCache | None:
+    "Returns the process-wide cache built from the [cache] config section,  or None when caching is turned off."
+    global _cache
+    if get_setting("cache", "enabled", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EstimatorCache(
+                path=CACHE_DIR / "estimator.sqlite3",
+                max_entries=int(get_setting("cache", "max_entries", "5000")),
+                ttl_days=float(get_setting("cache", "ttl_days", "30")),
+                fee_schedule=get_setting("cache", "fee_schedule", ""),
+            )
+        return _cache
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+import logging
+
+from model.web.scraper import Payload, Response
+
+
+log = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class RateTable:
+    """Florida surplus lines rates in force from a given effective date.
+
+    Attributes:
+        effective -- first policy effective date these rates apply to
+        tax_rate -- surplus lines tax, as a fraction of premium + policy fee
+        service_fee_rate -- FSLSO service (stamping) fee, as a fraction of premium + policy fee
+    """
+
+    effective: date
+    tax_rate: Decimal
+    service_fee_rate: Decimal
+
+
+# Newest last. Add a new table (and bump the [cache] fee_schedule) whenever FSLSO changes its rates,
+# then run with [web] shadow = true for a while to confirm the numbers match the estimator.
+RATE_TABLES: tuple[RateTable, ...] = (
+    RateTable(date(2018, 1, 1), Decimal("0.0494"), Decimal("0.00075")),
+    RateTable(date(2023, 1, 1), Decimal("0.0494"), Decimal("0.0006")),
+)
+
+
+def rates_for(eff_date: date) -> RateTable:
+    for table in reversed(RATE_TABLES):
+        if table.effective <= eff_date:
+            return table
+    raise ValueError(
+        "No surplus lines rate table covers an effective date of {0}.".format(eff_date)
+    )
+
+
+def money(amount: Decimal) -> str:
+    "Formats an amount the way the estimator's result table does,  negatives in parentheses."
+    amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+    if amount < 0:
+        return "(${0:,.2f})".format(-amount)
+    return "${0:,.2f}".format(amount)
+
+
+def parse_money(text: str) -> Decimal:
+    "Reverses money(),  so values from the estimator and the calculator can be compared as numbers."
+    x = text.replace("$", "").replace(",", "").strip()
+    if "(" in x:
+        return -abs(Decimal(x.replace("(", "").replace(")", "")))
+    return Decimal(x)
+
+
+def shadow_compare(payload: Payload, response: Response) -> bool:
+    "Checks an estimator Response against the local calculation and logs every value that disagrees."
+    try:
+        local = calculate(payload)
+    except ValueError:
+        log.warning(
+            msg="Shadow calculation failed for {0}.".format(payload),
+            exc_info=1,
+        )
+        return False
+    mismatches = {}
+    for key, value in response.get_dict().items():
+        local_value = local.get_dict()[key]
+        if parse_money(value) != parse_money(local_value):
+            mismatches[key] = (value, local_value)
+    if mismatches:
+        log.warning(
+            msg="Shadow mismatch for {0}. (estimator, local) values: {1}".format(
+                payload, mismatches
+            ),
+        )
+        return False
+    log.info(
+        msg="Shadow calculation matched the estimator.",
+    )
+    return True
+
+
+def assess(taxable: Decimal, table: RateTable) -> dict[str, Decimal]:
+    "Rounds each fee to the cent on its own,  like the estimator,  before adding them up."
+    tax = (taxable * table.tax_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+    service = (taxable * table.service_fee_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+    subtotal_fees = tax + service
+    return {
+        "tax": tax,
+        "service": service,
+        "subtotal_fees": subtotal_fees,
+        "total": taxable + subtotal_fees,
+    }
+
+
+def calculate(payload: Payload) -> Response:
+    "Works out the same four values the estimator returns for this payload."
+    eff_date = datetime.strptime(payload.eff_date, "%m/%d/%Y").date()
+    table = rates_for(eff_date)
+    taxable = Decimal(str(payload.premium)) + Decimal(str(payload.policy_fee))
+    r = Response(**{key: money(value) for key, value in assess(taxable, table).items()})
+    log.debug(
+        msg="Calculated {0} locally using the rates effective {1}.".format(
+            str(r), table.effective
+        ),
+    )
+    return r
+
+
+class LocalDriver:
+    "Calculates the Response locally instead of asking the estimator. Same interface as the other drivers."
+
+    def __init__(self) -> None:
+        self.response: Response = None
+
+    def prewarm(self, timeout: float) -> None:
+        "Nothing to warm up."
+
+    def send_call(self, payload: Payload) -> None:
+        self.response = calculate(payload)
+
+    def get_response(self) -> Response:
+        return self.response
+
+    def send_batch(self, payloads: list[Payload]) -> list[Response]:
+        return [calculate(payload) for payload in payloads]
+
+    def close(self, discard: bool = False) -> None:
+        self.response = None
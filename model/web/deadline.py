@@ -0,0 +1,66 @@
+from typing import Callable
+import logging
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+class Deadline:
+    """How long one estimator call has left. The call caps its waits at what's left,  and registers
+    callbacks to let go of what it holds (such as its pooled browser) when the WebCallPolicy gives up
+    on it and expires the deadline.
+    """
+
+    def __init__(self, seconds: float, start: bool = True) -> None:
+        self.seconds = seconds
+        self.expires_at: float = None
+        self.started = threading.Event()
+        self.expired: bool = False
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        "Starts the clock. The WebCallPolicy does this once a worker thread picks the call up."
+        self.expires_at = time.monotonic() + self.seconds
+        self.started.set()
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return self.seconds
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cap(self, timeout: float) -> float:
+        "The timeout,  cut short to what's left of the deadline."
+        return min(timeout, self.remaining())
+
+    def on_expire(self, callback: Callable[[], None]) -> None:
+        "Runs the callback when the deadline is expired,  or right away if it already has been."
+        with self._lock:
+            if not self.expired:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def expire(self) -> None:
+        with self._lock:
+            if self.expired:
+                return
+            self.expired = True
+            callbacks, self._callbacks = self._callbacks, []
+        log.debug(
+            msg="Deadline of {0:g}s expired, releasing what the call held ({1} callback(s)).".format(
+                self.seconds, len(callbacks)
+            ),
+        )
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                log.warning(
+                    msg="Couldn't release something an expired call held.",
+                    exc_info=1,
+                )
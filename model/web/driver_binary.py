@@ -0,0 +1,96 @@
+"""Finds the webdriver binary (msedgedriver, chromedriver, geckodriver) once and remembers it in the
+config,  so launching a browser never waits on Selenium Manager's driver discovery (which may try to
+reach the network).
+
+The remembered driver is reused while it belongs to the configured engine and,  for drivers that
+track their browser's version,  while its major version matches the installed browser. When the
+browser updates past it,  discovery runs once more and the new path and version are written back.
+"""
+from pathlib import Path
+import logging
+import threading
+
+from selenium.webdriver.common.options import BaseOptions
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+from selenium.webdriver.common.service import Service
+
+from helper import get_setting, set_setting
+from model.web.engines import Engine, version_of
+
+
+log = logging.getLogger(__name__)
+
+_driver_paths: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def major(version: str) -> str:
+    return version.split(".")[0] if version else ""
+
+
+def resolve_driver(engine: Engine, options: BaseOptions) -> str:
+    """Returns the webdriver path to launch the engine with. The config's `driver_path` is used while
+    `driver_engine` and the major `driver_version` still match; otherwise Selenium Manager finds one
+    and the config is updated. Only the first call per engine in a process does any of this."""
+    with _lock:
+        if engine.name in _driver_paths:
+            return _driver_paths[engine.name]
+        path = get_setting("web", "driver_path", "")
+        version = get_setting("web", "driver_version", "")
+        usable = (
+            bool(path)
+            and Path(path).is_file()
+            and get_setting("web", "driver_engine", "edge") == engine.name
+        )
+        browser = engine.browser_version() if engine.driver_tracks_browser else None
+        if usable and (browser is None or major(version) == major(browser)):
+            log.info(
+                msg="Using the remembered {0} {1} at {2} for {3} {4}.".format(
+                    engine.driver_name,
+                    version or "(unknown version)",
+                    path,
+                    engine.name,
+                    browser or "(any version)",
+                ),
+            )
+            _driver_paths[engine.name] = path
+            return path
+        log.info(
+            msg="Looking up {0} for {1} {2}, the remembered driver is {3} {4}.".format(
+                engine.driver_name,
+                engine.name,
+                browser or "(unknown version)",
+                path or "(none)",
+                version or "(unknown version)",
+            ),
+        )
+        try:
+            found = SeleniumManager().driver_location(options)
+        except Exception:
+            if not usable:
+                raise
+            log.warning(
+                msg="{0} lookup failed, falling back to the remembered {1}.".format(
+                    engine.driver_name, path
+                ),
+                exc_info=1,
+            )
+            _driver_paths[engine.name] = path
+            return path
+        found_version = version_of(found) or ""
+        if (
+            set_setting("web", "driver_path", found)
+            and set_setting("web", "driver_version", found_version)
+            and set_setting("web", "driver_engine", engine.name)
+        ):
+            log.info(
+                msg="Remembered {0} {1} at {2}.".format(engine.driver_name, found_version, found),
+            )
+        _driver_paths[engine.name] = found
+        return found
+
+
+def driver_service(engine: Engine, options: BaseOptions) -> Service:
+    """A Service for the resolved webdriver. Selenium skips its own discovery when the Service
+    already has a path. A Service runs one driver process,  so each launch gets its own."""
+    return engine.service(resolve_driver(engine, options))
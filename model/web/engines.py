@@ -0,0 +1,286 @@
+"""The browser engines the estimator's Driver can run on. Everything that differs between Edge,
+Chromium and Firefox lives here: the selenium classes,  the headless and lean-profile settings,
+request blocking and the page weight log. The form filling and result reading in model/web/scraper.py
+are the same for all of them.
+
+Pick one with the [web] engine option. Firefox has no DevTools protocol in selenium,  so URL pattern
+blocking and the page weight report are Chromium-only; images and fonts can still be turned off
+through Firefox's own preferences.
+"""
+from pathlib import Path
+import abc
+import logging
+import re
+import shutil
+import subprocess
+
+from selenium import webdriver
+from selenium.webdriver.common.options import ArgOptions
+from selenium.webdriver.common.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from helper import get_setting
+from model.web import blocking
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+
+log = logging.getLogger(__name__)
+
+VERSION = re.compile(r"\d+(?:\.\d+)+")
+
+
+def version_of(executable: str) -> str | None:
+    "The version an executable reports with `--version`."
+    try:
+        output = subprocess.run(
+            [executable, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        log.debug(
+            msg="Couldn't get a version out of {0}.".format(executable),
+            exc_info=1,
+        )
+        return None
+    found = VERSION.search(output)
+    return found.group(0) if found else None
+
+
+class Engine(abc.ABC):
+    """One browser engine. Subclasses fill in the class attributes,  implement the abstract methods
+    and override what else differs.
+
+    Attributes:
+        name -- what the [web] engine option calls it
+        driver_name -- its webdriver binary
+        driver_tracks_browser -- the driver's major version has to match the browser's
+        devtools -- supports the DevTools protocol, so blocking and the page weight report work
+        registry_keys -- (hive, key, value) holding the installed version on Windows
+        executables -- names or paths to ask for the version elsewhere
+    """
+
+    name: str = None
+    driver_name: str = None
+    driver_tracks_browser: bool = True
+    devtools: bool = False
+    registry_keys: tuple[tuple[str, str, str], ...] = ()
+    executables: tuple[str, ...] = ()
+
+    def new_options(self) -> ArgOptions:
+        "Headless options,  pointed at [web] browser_binary when it's set."
+        options = self._options()
+        binary = get_setting("web", "browser_binary", "")
+        if binary:
+            options.binary_location = binary
+        return options
+
+    @abc.abstractmethod
+    def lean_profile(self, options: ArgOptions, resource_types: list[str]) -> None:
+        "Launches without extensions or first-run work,  and turns off the resource types being blocked."
+
+    @abc.abstractmethod
+    def use_cache_dir(self, options: ArgOptions, cache_dir: Path) -> None:
+        "Points the browser's disk cache at the directory."
+
+    def record_page_weight(self, options: ArgOptions) -> bool:
+        "Asks for the network log page_weight() reads. False if the engine can't keep one."
+        return False
+
+    def block(self, driver: WebDriver, patterns: list[str]) -> None:
+        "Blocks the URL patterns in a new session,  where the engine can."
+
+    @abc.abstractmethod
+    def service(self, executable_path: str) -> Service:
+        "The selenium Service that runs the engine's driver binary."
+
+    @abc.abstractmethod
+    def launch(self, options: ArgOptions, service: Service) -> WebDriver:
+        "Starts the browser."
+
+    def browser_version(self) -> str | None:
+        "The installed browser's version,  from the registry on Windows or `--version` elsewhere."
+        if winreg is not None:
+            for hive, key, name in self.registry_keys:
+                try:
+                    with winreg.OpenKey(getattr(winreg, hive), key) as k:
+                        version = winreg.QueryValueEx(k, name)[0]
+                except OSError:
+                    continue
+                if VERSION.fullmatch(str(version)):
+                    return version
+        for executable in self.executables:
+            found = shutil.which(executable)
+            if found:
+                return version_of(found)
+        return None
+
+    @abc.abstractmethod
+    def _options(self) -> ArgOptions:
+        "The engine's headless options."
+
+
+class ChromiumEngine(Engine):
+    "Shared by Edge and Chromium: launch arguments,  DevTools blocking and the performance log."
+
+    devtools = True
+    options_class: type[ArgOptions] = None
+    # Capability that turns on the performance log.
+    logging_prefs: str = None
+
+    def lean_profile(self, options: ArgOptions, resource_types: list[str]) -> None:
+        "Adds the lean launch arguments,  and turns images off in the renderer when they're blocked anyway."
+        for argument in blocking.LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        if "image" in resource_types:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
+    def use_cache_dir(self, options: ArgOptions, cache_dir: Path) -> None:
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+
+    def record_page_weight(self, options: ArgOptions) -> bool:
+        options.set_capability(self.logging_prefs, {"performance": "ALL"})
+        return True
+
+    def block(self, driver: WebDriver, patterns: list[str]) -> None:
+        blocking.apply_blocking(driver, patterns)
+
+    def _options(self) -> ArgOptions:
+        options = self.options_class()
+        options.add_argument("--headless")
+        return options
+
+
+class EdgeEngine(ChromiumEngine):
+    name = "edge"
+    driver_name = "msedgedriver"
+    logging_prefs = "ms:loggingPrefs"
+    options_class = webdriver.EdgeOptions
+    # Per user,  then per machine (32 and 64 bit views).
+    registry_keys = (
+        ("HKEY_CURRENT_USER", r"Software\Microsoft\Edge\BLBeacon", "version"),
+        (
+            "HKEY_LOCAL_MACHINE",
+            r"SOFTWARE\WOW6432Node\Microsoft\EdgeUpdate\Clients\{56EB18F8-B008-4CBD-B6D2-8C97FE7E9062}",
+            "pv",
+        ),
+        (
+            "HKEY_LOCAL_MACHINE",
+            r"SOFTWARE\Microsoft\EdgeUpdate\Clients\{56EB18F8-B008-4CBD-B6D2-8C97FE7E9062}",
+            "pv",
+        ),
+    )
+    executables = (
+        "microsoft-edge",
+        "microsoft-edge-stable",
+        "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+    )
+
+    def service(self, executable_path: str) -> Service:
+        return webdriver.EdgeService(executable_path=executable_path)
+
+    def launch(self, options: ArgOptions, service: Service) -> WebDriver:
+        return webdriver.Edge(options=options, service=service)
+
+
+class ChromiumBrowserEngine(ChromiumEngine):
+    "Chromium or Chrome,  through chromedriver."
+
+    name = "chromium"
+    driver_name = "chromedriver"
+    logging_prefs = "goog:loggingPrefs"
+    options_class = webdriver.ChromeOptions
+    registry_keys = (
+        ("HKEY_CURRENT_USER", r"Software\Google\Chrome\BLBeacon", "version"),
+        ("HKEY_CURRENT_USER", r"Software\Chromium\BLBeacon", "version"),
+    )
+    executables = (
+        "chromium",
+        "chromium-browser",
+        "google-chrome",
+        "google-chrome-stable",
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    )
+
+    def service(self, executable_path: str) -> Service:
+        return webdriver.ChromeService(executable_path=executable_path)
+
+    def launch(self, options: ArgOptions, service: Service) -> WebDriver:
+        return webdriver.Chrome(options=options, service=service)
+
+
+class FirefoxEngine(Engine):
+    name = "firefox"
+    driver_name = "geckodriver"
+    # geckodriver versions independently of Firefox; one driver covers many Firefox releases.
+    driver_tracks_browser = False
+    registry_keys = (
+        ("HKEY_LOCAL_MACHINE", r"SOFTWARE\Mozilla\Mozilla Firefox", "CurrentVersion"),
+    )
+    executables = (
+        "firefox",
+        "/Applications/Firefox.app/Contents/MacOS/firefox",
+    )
+
+    def lean_profile(self, options: ArgOptions, resource_types: list[str]) -> None:
+        "Turns off updates,  telemetry and first-run pages,  plus images and web fonts when they're blocked."
+        for name, value in (
+            ("app.update.enabled", False),
+            ("browser.shell.checkDefaultBrowser", False),
+            ("browser.startup.homepage_override.mstone", "ignore"),
+            ("datareporting.policy.dataSubmissionEnabled", False),
+            ("toolkit.telemetry.enabled", False),
+            ("extensions.update.enabled", False),
+            ("media.autoplay.default", 5),
+        ):
+            options.set_preference(name, value)
+        if "image" in resource_types:
+            options.set_preference("permissions.default.image", 2)
+        if "font" in resource_types:
+            options.set_preference("gfx.downloadable_fonts.enabled", False)
+
+    def use_cache_dir(self, options: ArgOptions, cache_dir: Path) -> None:
+        options.set_preference("browser.cache.disk.parent_directory", str(cache_dir))
+
+    def block(self, driver: WebDriver, patterns: list[str]) -> None:
+        if patterns:
+            log.debug(
+                msg="Firefox can't block URL patterns, only the image and font preferences apply.",
+            )
+
+    def service(self, executable_path: str) -> Service:
+        return webdriver.FirefoxService(executable_path=executable_path)
+
+    def launch(self, options: ArgOptions, service: Service) -> WebDriver:
+        return webdriver.Firefox(options=options, service=service)
+
+    def _options(self) -> ArgOptions:
+        options = webdriver.FirefoxOptions()
+        options.add_argument("-headless")
+        return options
+
+
+ENGINES: dict[str, Engine] = {
+    engine.name: engine
+    for engine in (EdgeEngine(), ChromiumBrowserEngine(), FirefoxEngine())
+}
+
+
+def get_engine(name: str = None) -> Engine:
+    "The named engine,  or the one the [web] engine option picks (Edge by default)."
+    if name is None:
+        name = get_setting("web", "engine", "edge")
+    try:
+        return ENGINES[name.lower()]
+    except KeyError:
+        raise ValueError(
+            "Unknown browser engine '{0}', expected one of {1}.".format(name, list(ENGINES))
+        ) from None
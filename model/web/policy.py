@@ -0,0 +1,267 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable
+import logging
+import random
+import threading
+import time
+
+from exceptions.surplus_lines import EstimatorError
+from helper import get_setting
+from model.web.cache import get_cache
+from model.web.calculator import calculate
+from model.web.deadline import Deadline
+from model.web.scraper import Payload, Response
+
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending calls to the estimator after `failure_threshold` failures in a row.
+
+    Once open,  calls fail fast until `reset_timeout` seconds have passed. Then a single trial call is let
+    through (half open): if it works the breaker closes again,  if not it re-opens for another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 120) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state: str = CLOSED
+        self.failures: int = 0
+        self.opened_at: float = None
+        self._trial_running: bool = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                log.info(
+                    msg="Circuit breaker half open, letting a trial call through.",
+                )
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                log.info(
+                    msg="Estimator call succeeded, closing the circuit breaker.",
+                )
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    log.warning(
+                        msg="Opening the circuit breaker after {0} failure(s) in a row.".format(
+                            self.failures
+                        ),
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class WebCallPolicy:
+    """Wraps the estimator stage with a per-call deadline,  bounded retries with jittered exponential
+    backoff,  and a circuit breaker. When the estimator can't be used,  it falls back to the configured
+    `fallback` ('cache' allows stale cached results,  'local' uses the offline calculator) or raises an
+    EstimatorError.
+
+    Each attempt's call is handed its Deadline. When an attempt runs out of time the deadline is
+    expired,  so the call gives back its browser session right away instead of holding it (and a
+    worker thread) until whatever it's stuck on returns.
+    """
+
+    def __init__(
+        self,
+        deadline: float = 45,
+        retries: int = 2,
+        backoff: float = 1,
+        backoff_max: float = 8,
+        breaker: CircuitBreaker = None,
+        fallback: str = "none",
+    ) -> None:
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.fallback = fallback
+        self.counters: dict[str, int] = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "short_circuits": 0,
+            "fallbacks": 0,
+        }
+        self.last_error: str = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=8,
+            thread_name_prefix="Estimator Call",
+        )
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        call: Callable[[list[Payload], Deadline], list[Response]],
+        payloads: list[Payload],
+    ) -> tuple[list[Response], bool]:
+        """Returns the responses,  and whether they came from the fallback rather than the estimator.
+        Fallback responses are stale or locally calculated,  so they mustn't be cached as fresh."""
+        error: Exception = None
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self._count("short_circuits")
+                log.warning(
+                    msg="Circuit breaker is open, not calling the estimator.",
+                )
+                error = error or EstimatorError(
+                    "The tax estimator has failed repeatedly and is being skipped for now."
+                )
+                break
+            if attempt:
+                self._count("retries")
+                delay = random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+                log.info(
+                    msg="Retrying the estimator call in {0:.2f}s (retry {1} of {2}).".format(
+                        delay, attempt, self.retries
+                    ),
+                )
+                time.sleep(delay)
+            self._count("calls")
+            try:
+                responses = self._call_with_deadline(call, payloads)
+            except Exception as e:
+                error = e
+                self._count("failures")
+                with self._lock:
+                    self.last_error = "{0}: {1}".format(type(e).__name__, e)
+                self.breaker.record_failure()
+                log.warning(
+                    msg="Estimator call failed on attempt {0}.".format(attempt + 1),
+                    exc_info=1,
+                )
+                continue
+            self._count("successes")
+            self.breaker.record_success()
+            log.debug(
+                msg="Web call policy state: {0}".format(self.state()),
+            )
+            return responses, False
+        return self._fall_back(payloads, error), True
+
+    def state(self) -> dict[str, int | float | str]:
+        "Snapshot of the breaker and the call counters,  for monitoring."
+        with self._lock:
+            snapshot = dict(self.counters)
+            snapshot["last_error"] = self.last_error
+        snapshot["breaker"] = self.breaker.state
+        snapshot["consecutive_failures"] = self.breaker.failures
+        return snapshot
+
+    def _call_with_deadline(
+        self,
+        call: Callable[[list[Payload], Deadline], list[Response]],
+        payloads: list[Payload],
+    ) -> list[Response]:
+        # A batch gets one deadline per payload in it. Its clock starts when a worker thread picks
+        # the call up,  so time spent queued behind other calls isn't taken out of it.
+        deadline = Deadline(self.deadline * len(payloads), start=False)
+
+        def attempt() -> list[Response]:
+            deadline.start()
+            return call(payloads, deadline)
+
+        future = self._executor.submit(attempt)
+        # Waiting for a free worker gets a budget of its own,  as long as the deadline.
+        if not deadline.started.wait(timeout=deadline.seconds) and future.cancel():
+            self._count("timeouts")
+            raise EstimatorError(
+                "No worker was free to call the tax estimator within {0:g} seconds.".format(
+                    deadline.seconds
+                )
+            )
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeout as e:
+            self._count("timeouts")
+            future.cancel()
+            deadline.expire()
+            raise EstimatorError(
+                "The tax estimator didn't answer within {0:g} seconds.".format(deadline.seconds)
+            ) from e
+
+    def _fall_back(self, payloads: list[Payload], error: Exception) -> list[Response]:
+        log.debug(
+            msg="Web call policy state: {0}".format(self.state()),
+        )
+        if self.fallback == "local":
+            log.warning(
+                msg="Falling back to the local calculator for {0} payload(s).".format(
+                    len(payloads)
+                ),
+            )
+            self._count("fallbacks")
+            return [calculate(payload) for payload in payloads]
+        if self.fallback == "cache":
+            cache = get_cache()
+            if cache:
+                responses = [cache.get(payload, allow_stale=True) for payload in payloads]
+                if all(responses):
+                    log.warning(
+                        msg="Falling back to stale cached results for {0} payload(s).".format(
+                            len(payloads)
+                        ),
+                    )
+                    self._count("fallbacks")
+                    return responses
+        if isinstance(error, EstimatorError):
+            raise error
+        raise EstimatorError(
+            "The tax estimator failed after {0} attempt(s): {1}".format(
+                self.retries + 1, error
+            )
+        ) from error
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+
+_policy: WebCallPolicy = None
+_policy_lock = threading.Lock()
+
+
+def get_policy() -> WebCallPolicy:
+    "Returns the process-wide policy,  built from the [web] config section on first use."
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = WebCallPolicy(
+                deadline=float(get_setting("web", "deadline", "45")),
+                retries=int(get_setting("web", "retries", "2")),
+                backoff=float(get_setting("web", "backoff", "1")),
+                backoff_max=float(get_setting("web", "backoff_max", "8")),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(get_setting("web", "breaker_failures", "3")),
+                    reset_timeout=float(get_setting("web", "breaker_reset", "120")),
+                ),
+                fallback=get_setting("web", "fallback", "none"),
+            )
+        return _policy
@@ -0,0 +1,283 @@
+from dataclasses import dataclass, field
+from typing import Callable, Hashable
+import logging
+import threading
+import time
+
+import psutil
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+from helper import get_setting
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Session:
+    """A live browser session owned by the DriverPool.
+
+    Attributes:
+        driver -- the webdriver controlling the browser
+        calls -- number of estimator calls made with this browser
+        created -- monotonic timestamp of when the browser was launched
+        slot -- which of the pool's `size` slots the browser holds; used for per-slot state such as its disk cache
+        ready_uri -- set while the browser sits on a blank estimator form at this address
+    """
+
+    driver: WebDriver
+    calls: int = 0
+    created: float = field(default_factory=time.monotonic)
+    slot: int = 0
+    ready_uri: str = None
+
+    def is_healthy(self) -> bool:
+        "Cheap round trip to the driver to make sure the browser is still responsive."
+        try:
+            self.driver.execute_script("return 1;")
+        except WebDriverException:
+            log.debug(
+                msg="Session failed its health check.",
+                exc_info=1,
+            )
+            return False
+        return True
+
+    def memory_mb(self) -> float:
+        "Resident memory of the browser driver and every process it spawned (the browser itself, renderers, etc.)."
+        try:
+            proc = psutil.Process(self.driver.service.process.pid)
+            procs = [proc] + proc.children(recursive=True)
+            rss = 0
+            for p in procs:
+                try:
+                    rss += p.memory_info().rss
+                except psutil.Error:
+                    continue
+        except (AttributeError, psutil.Error):
+            return 0.0
+        return rss / (1024 * 1024)
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:
+            # A killed driver fails the quit with a connection error rather than a WebDriverException.
+            log.debug(
+                msg="Browser was already gone when quitting the session.",
+                exc_info=1,
+            )
+
+    def kill(self) -> None:
+        """Kills the driver and every process it spawned without asking the driver,  for a session stuck
+        in a call: a quit() would queue behind that call."""
+        try:
+            proc = psutil.Process(self.driver.service.process.pid)
+            procs = proc.children(recursive=True) + [proc]
+        except (AttributeError, psutil.Error):
+            return
+        for p in procs:
+            try:
+                p.kill()
+            except psutil.Error:
+                continue
+
+
+class DriverPool:
+    """Keeps a fixed number of browser sessions warm so the estimator doesn't pay a browser cold start on every stamp.
+
+    Sessions are launched lazily up to `size`. Before a session is handed out it is health checked,  and once it
+    has served `max_calls` calls or grown past `max_memory_mb` it is quit and replaced on its next checkout.
+    A checkout waits at most `checkout_timeout` seconds for a session unless it's given its own timeout.
+    """
+
+    def __init__(
+        self,
+        launcher: Callable[[int], WebDriver],
+        size: int = 1,
+        max_calls: int = 50,
+        max_memory_mb: float = 0,
+        checkout_timeout: float = 60,
+    ) -> None:
+        self.launcher = launcher
+        self.size = size
+        self.max_calls = max_calls
+        self.max_memory_mb = max_memory_mb
+        self.checkout_timeout = checkout_timeout
+        self._idle: list[Session] = []
+        self._free_slots: set[int] = set(range(size))
+        self._live: int = 0
+        self._closed: bool = False
+        self._lock = threading.Condition()
+
+    def checkout(self, timeout: float = None) -> Session:
+        "Hands out a healthy session. Raises TimeoutError if none frees up within `timeout` seconds."
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The driver pool has been closed.")
+            while not self._idle and self._live >= self.size:
+                log.debug(
+                    msg="All {0} sessions are checked out, waiting for one to be returned.".format(
+                        self.size
+                    ),
+                )
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._lock.wait(timeout=remaining):
+                    raise TimeoutError(
+                        "Timed out waiting for a free browser session after {0:g}s.".format(timeout)
+                    )
+                if self._closed:
+                    raise RuntimeError("The driver pool has been closed.")
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                session = None
+                self._live += 1
+        if session is not None:
+            if session.is_healthy():
+                log.debug(
+                    msg="Reusing a warm session that has made {0} call(s).".format(
+                        session.calls
+                    ),
+                )
+                return session
+            log.info(
+                msg="Discarding an unhealthy session and launching a new one.",
+            )
+            self._retire(session, replacing=True)
+        try:
+            return self._launch()
+        except Exception:
+            with self._lock:
+                self._live -= 1
+                self._lock.notify()
+            raise
+
+    def checkin(self, session: Session, discard: bool = False, count: bool = True) -> None:
+        if count:
+            session.calls += 1
+        discard = discard or self._needs_recycle(session)
+        with self._lock:
+            keep = not discard and not self._closed
+            if keep:
+                self._idle.append(session)
+                self._lock.notify()
+        if not keep:
+            self._retire(session)
+
+    def warm(self) -> None:
+        "Launches sessions until the pool is full, so later checkouts never pay the launch."
+        launched = []
+        while True:
+            with self._lock:
+                if self._closed or self._live >= self.size:
+                    break
+                self._live += 1
+            try:
+                launched.append(self._launch())
+            except Exception:
+                with self._lock:
+                    self._live -= 1
+                raise
+        with self._lock:
+            self._idle.extend(launched)
+            self._lock.notify_all()
+
+    def close(self) -> None:
+        "Quits every idle browser.  Sessions still checked out are quit when they are returned."
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        log.info(
+            msg="Closing the driver pool, quitting {0} idle session(s).".format(
+                len(idle)
+            ),
+        )
+        for session in idle:
+            self._retire(session)
+
+    def _launch(self) -> Session:
+        with self._lock:
+            slot = min(self._free_slots)
+            self._free_slots.discard(slot)
+        start = time.perf_counter()
+        try:
+            session = Session(driver=self.launcher(slot), slot=slot)
+        except Exception:
+            with self._lock:
+                self._free_slots.add(slot)
+            raise
+        log.info(
+            msg="Launched a new browser session in {0:.2f}s.".format(
+                time.perf_counter() - start
+            ),
+        )
+        return session
+
+    def _retire(self, session: Session, replacing: bool = False) -> None:
+        """Quits the browser,  then frees its slot. Unless the caller is about to launch its replacement,
+        the session also stops counting towards the pool's size."""
+        session.quit()
+        with self._lock:
+            self._free_slots.add(session.slot)
+            if not replacing:
+                self._live -= 1
+                self._lock.notify()
+
+    def _needs_recycle(self, session: Session) -> bool:
+        if self.max_calls and session.calls >= self.max_calls:
+            log.info(
+                msg="Recycling session after {0} calls.".format(session.calls),
+            )
+            return True
+        if self.max_memory_mb:
+            memory = session.memory_mb()
+            if memory > self.max_memory_mb:
+                log.info(
+                    msg="Recycling session using {0:.0f}MB, over the {1}MB ceiling.".format(
+                        memory, self.max_memory_mb
+                    ),
+                )
+                return True
+        return False
+
+
+_pools: dict[Hashable, DriverPool] = {}
+_pool_lock = threading.Lock()
+
+
+def get_pool(launcher: Callable[[int], WebDriver], key: Hashable = None) -> DriverPool:
+    """Returns the process-wide pool for browsers launched with the options `key` stands for,  creating
+    it from the [web] config section on first use. Drivers launching browsers differently (another
+    engine,  wait strategy or profile) get pools of their own,  never a pool of the first one's browsers."""
+    with _pool_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = DriverPool(
+                launcher=launcher,
+                size=int(get_setting("web", "pool_size", "1")),
+                max_calls=int(get_setting("web", "max_calls_per_session", "50")),
+                max_memory_mb=float(get_setting("web", "max_memory_mb", "0")),
+                checkout_timeout=float(get_setting("web", "checkout_timeout", "60")),
+            )
+            if len(_pools) > 1:
+                log.info(
+                    msg="Started another driver pool for different launch options, {0} pools now.".format(
+                        len(_pools)
+                    ),
+                )
+        return pool
+
+
+def shutdown_pool() -> None:
+    "Quits every pooled browser. Called when the program exits."
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,24 +1,56 @@
 from dataclasses import dataclass
 from typing import Protocol
+import copy
+import hashlib
 import logging
+import threading
+import time
 
-from selenium import webdriver
-from selenium.common.exceptions import ElementClickInterceptedException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    JavascriptException,
+    TimeoutException,
+)
 from selenium.webdriver.common.by import By
-from selenium.webdriver.edge.options import Options
 from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from helper import CACHE_DIR, get_setting
+from model.web import blocking
+from model.web.deadline import Deadline
+from model.web.driver_binary import driver_service
+from model.web.engines import Engine, get_engine
+from model.web.pool import DriverPool, Session, get_pool
 
 log = logging.getLogger(__name__)
 
+ESTIMATOR_URI = "https://www.fslso.com/tax-estimator"
+RESULT_TABLE = "//table[@class='tax-invoice tax-assessments'][1]/tbody[1]"
+# (row, column) of each value within the result table, 1-indexed like the xpaths.
+result_cells = {
+    "tax": (2, 2),
+    "service": (4, 2),
+    "subtotal_fees": (6, 2),
+    "total": (7, 2),
+}
 xpaths = {
-    "tax": "//table[@class='tax-invoice tax-assessments'][1]/tbody[1]/tr[2]/td[2]",
-    "service": "//table[@class='tax-invoice tax-assessments'][1]/tbody[1]/tr[4]/td[2]",
-    "subtotal_fees": "//table[@class='tax-invoice tax-assessments'][1]/tbody[1]/tr[6]/td[2]",
-    "total": "//table[@class='tax-invoice tax-assessments'][1]/tbody[1]/tr[7]/td[2]",
+    key: f"{RESULT_TABLE}/tr[{row}]/td[{col}]" for key, (row, col) in result_cells.items()
 }
 
+FORM_FIELDS = (
+    "PolicyEffectiveDate",
+    "TransactionEffectiveDate",
+    "CoverageCode",
+    "TransactionType",
+    "TaxStatus",
+    "Premium",
+    "PolicyFee",
+)
+# Estimator form fields that are select lists rather than text inputs.
+SELECT_FIELDS = ("CoverageCode", "TransactionType", "TaxStatus")
+
 for k, v in xpaths.items():
     log.debug(
         msg="The {0} xpath is currently: {1}".format(k, v),
@@ -35,6 +67,19 @@ class Payload(Protocol):
     eff_date: str
 
 
+def payload_fields(payload: Payload) -> dict[str, str]:
+    "Maps each estimator form field id to the Payload value that goes in it."
+    return {
+        "PolicyEffectiveDate": str(payload.eff_date),
+        "TransactionEffectiveDate": str(payload.eff_date),
+        "CoverageCode": str(payload.coverage_code),
+        "TransactionType": str(payload.transaction_type),
+        "TaxStatus": str(payload.tax_status),
+        "Premium": str(payload.premium),
+        "PolicyFee": str(payload.policy_fee),
+    }
+
+
 @dataclass
 class Response:
     tax: str = None
@@ -51,98 +96,327 @@ class Response:
         }
 
 
-class Driver:
-    def __init__(self) -> None:
-        self.options = Options()
-        self.options.add_argument("--headless")
-        self.options.page_load_strategy = "normal"
-        self.driver: webdriver.Edge = None
-        # self.service = Service(executable_path=browser_driver)
+# Fills every form field and submits,  in one call. arguments[0] maps field ids to values and
+# arguments[1] is only_changed. Returns {changed: n},  or {error: reason} before touching the page
+# if anything it needs is missing.
+FILL_AND_SUBMIT_JS = """
+const values = arguments[0];
+const onlyChanged = arguments[1];
+const btn = document.getElementById("btnSubmit");
+if (!btn || !btn.form) {
+    return {error: "missing btnSubmit"};
+}
+for (const [id, value] of Object.entries(values)) {
+    const el = document.getElementById(id);
+    if (!el) {
+        return {error: "missing field " + id};
+    }
+    if (el.tagName === "SELECT" && !Array.from(el.options).some((o) => o.value === value)) {
+        return {error: "no option " + value + " for " + id};
+    }
+}
+let changed = 0;
+for (const [id, value] of Object.entries(values)) {
+    const el = document.getElementById(id);
+    if (onlyChanged && el.value === value) {
+        continue;
+    }
+    el.value = value;
+    for (const type of ["input", "change", "blur"]) {
+        el.dispatchEvent(new Event(type, {bubbles: true}));
+    }
+    changed += 1;
+}
+if (btn.form.requestSubmit) {
+    btn.form.requestSubmit(btn);
+} else {
+    btn.form.submit();
+}
+return {changed: changed};
+"""
 
+# Reads every result cell in one call. arguments[0] is the xpaths dict. Returns null until all the
+# cells exist and have text, so it doubles as a wait condition.
+READ_RESULTS_JS = """
+const out = {};
+for (const [key, path] of Object.entries(arguments[0])) {
+    const cell = document.evaluate(
+        path, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    const text = cell ? cell.innerText.trim() : "";
+    if (!text) {
+        return null;
+    }
+    out[key] = text;
+}
+return out;
+"""
 
-    def send_call(self, payload: Payload) -> None:
-        log.info(
-            msg="Assigning Edge webdriver to scraper",
-        )
-        log.debug(
-            msg="Webdriver's options: {0}".format(self.options),
-        )
-        self.driver = webdriver.Edge(
-            options=self.options,
+
+class results_rendered:
+    """Wait condition: every result cell the xpaths point at exists and has text.
+    Returns the cell texts keyed like the xpaths once they do."""
+
+    def __call__(self, driver) -> dict[str, str] | bool:
+        values = {}
+        for key, path in xpaths.items():
+            cells = driver.find_elements(by=By.XPATH, value=path)
+            if not cells or not cells[0].text.strip():
+                return False
+            values[key] = cells[0].text
+        return values
+
+
+class Driver:
+    def __init__(
+        self,
+        pool: DriverPool = None,
+        eager: bool = None,
+        scripted: bool = None,
+        block_requests: bool = None,
+        lean_profile: bool = None,
+        report_page_weight: bool = None,
+        engine: Engine | str = None,
+        deadline: Deadline = None,
+    ) -> None:
+        # Edge,  Chromium or Firefox. Only launching differs between them,  see model/web/engines.py.
+        if not isinstance(engine, Engine):
+            engine = get_engine(engine)
+        self.engine: Engine = engine
+        # 'eager' stops waiting once the DOM is parsed, then waits only on the form controls
+        # and the result table instead of every image, font and script on the page.
+        if eager is None:
+            eager = get_setting("web", "wait_strategy", "normal") == "eager"
+        self.eager: bool = eager
+        self.element_timeout = float(get_setting("web", "element_timeout", "10"))
+        self.results_timeout = float(get_setting("web", "results_timeout", "15"))
+        self.page_load_timeout = float(get_setting("web", "page_load_timeout", "30"))
+        # Fill and read the form with one script each instead of a round trip per element.
+        if scripted is None:
+            scripted = get_setting("web", "scripted", "false").lower() == "true"
+        self.scripted: bool = scripted
+        # Requests for things the form doesn't need (analytics, images, fonts) are blocked,  and the
+        # browser starts without extensions or first-run work,  reusing a disk cache per pool slot.
+        if block_requests is None:
+            block_requests = get_setting("web", "block_requests", "false").lower() == "true"
+        if lean_profile is None:
+            lean_profile = get_setting("web", "lean_profile", "false").lower() == "true"
+        if report_page_weight is None:
+            report_page_weight = get_setting("web", "report_page_weight", "false").lower() == "true"
+        self.lean_profile: bool = lean_profile
+        self.report_page_weight: bool = report_page_weight
+        self.block_patterns: list[str] = []
+        resource_types = blocking.split_setting(
+            get_setting("web", "block_resource_types", "image, font, media")
         )
-        self.driver.get(
-            payload.uri,
+        if block_requests:
+            self.block_patterns = blocking.block_patterns(
+                list(blocking.DEFAULT_PATTERNS)
+                + blocking.split_setting(get_setting("web", "block_patterns", "")),
+                resource_types,
+            )
+        self.options = self.engine.new_options()
+        self.options.page_load_strategy = "eager" if self.eager else "normal"
+        if self.lean_profile:
+            self.engine.lean_profile(
+                self.options, resource_types if block_requests else []
+            )
+        if self.report_page_weight and not self.engine.record_page_weight(self.options):
+            log.warning(
+                msg="The {0} engine can't report page weight, turning the report off.".format(
+                    self.engine.name
+                ),
+            )
+            self.report_page_weight = False
+        self.pool: DriverPool = pool or get_pool(launcher=self.launch_browser, key=self.launch_key)
+        # Set by the WebCallPolicy: every wait is cut short to what's left of it,  and when it expires
+        # the session is abandoned.
+        self.deadline: Deadline = deadline
+        self.session: Session = None
+        self.driver: WebDriver = None
+        self._page_load_capped: bool = False
+        self._session_lock = threading.Lock()
+        # What the last report_page_weight report found.
+        self.page_weight: dict[str, int | dict[str, int]] = {}
+
+    @property
+    def launch_key(self) -> tuple:
+        "Everything launch_browser builds a browser from. Drivers with the same key share a pool."
+        return (
+            self.engine.name,
+            self.eager,
+            self.lean_profile,
+            self.report_page_weight,
+            self.page_load_timeout,
+            tuple(self.block_patterns),
+            tuple(self.options.arguments),
+            getattr(self.options, "binary_location", None),
         )
+
+    def launch_browser(self, slot: int = 0) -> WebDriver:
         log.info(
-            msg="Launching web UI",
-        )
-        log.debug(
-            msg="Website URI: {0}".format(payload.uri),
-        )
-        # Key inputs
-        self.driver.find_element(value="PolicyEffectiveDate").send_keys(
-            payload.eff_date,
-        )
-        log.debug(
-            msg="Found policy Eff Date field, inserted: {0}".format(payload.eff_date),
-        )
-        self.driver.find_element(value="TransactionEffectiveDate").send_keys(
-            payload.eff_date,
+            msg="Launching a new {0} webdriver for slot {1} of the pool".format(
+                self.engine.name, slot
+            ),
         )
+        options = self.options
+        if self.lean_profile:
+            # The disk cache is per slot,  so each launch needs its own copy of the options.
+            options = copy.deepcopy(self.options)
+            self.engine.use_cache_dir(
+                options,
+                blocking.slot_cache_dir(
+                    CACHE_DIR,
+                    self.engine.name,
+                    slot,
+                    hashlib.sha1(repr(self.launch_key).encode()).hexdigest()[:8],
+                ),
+            )
         log.debug(
-            msg="Found trans Eff Date field, inserted: {0}".format(payload.eff_date),
+            msg="Webdriver's options: {0}".format(options.arguments),
         )
-        # SelectLists
-        coverage = self.driver.find_element(value="CoverageCode")
-        coverage_select = Select(coverage)
-        coverage_select.select_by_value(
-            value=payload.coverage_code,
-        )
-        log.debug(
-            msg="Found coverage code field, inserted: {0}".format(
-                payload.coverage_code
-            ),
+        driver = self.engine.launch(
+            options=options,
+            service=driver_service(self.engine, options),
         )
+        try:
+            driver.set_page_load_timeout(self.page_load_timeout)
+            self.engine.block(driver, self.block_patterns)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
 
-        transaction = self.driver.find_element(value="TransactionType")
-        transaction_select = Select(transaction)
-        transaction_select.select_by_value(
-            value=payload.transaction_type,
+    def send_call(self, payload: Payload) -> None:
+        log.info(
+            msg="Checking out a {0} webdriver from the pool".format(self.engine.name),
         )
-        log.debug(
-            msg="Found trans type field, inserted: {0}".format(
-                payload.transaction_type
+        self._checkout()
+        try:
+            self._fill_form(payload)
+            if self.eager:
+                self._wait_for_new_results(None)
+        except Exception:
+            self.close(discard=True)
+            raise
+
+    def prewarm(self, timeout: float) -> None:
+        """Launches a pooled browser and leaves it sitting on the estimator form,  so the first call
+        doesn't pay for the driver lookup, the browser launch or the first page load."""
+        deadline = time.monotonic() + timeout
+        self.session = self.pool.checkout(timeout=timeout)
+        self.driver = self.session.driver
+        uri = get_setting("web", "estimator_uri", ESTIMATOR_URI)
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log.info(
+                    msg="Pre-warm ran out of time after launching the browser, skipping the form load.",
+                )
+            else:
+                self.driver.set_page_load_timeout(remaining)
+                self.driver.get(uri)
+                if self.eager:
+                    self._wait_for_form()
+                self.session.ready_uri = uri
+                log.info(
+                    msg="Pre-warmed a browser session on {0}.".format(uri),
+                )
+            self.driver.set_page_load_timeout(self.page_load_timeout)
+            if self.report_page_weight:
+                self.log_page_weight()
+        except Exception:
+            self.close(discard=True)
+            raise
+        session, self.session, self.driver = self.session, None, None
+        # Pre-warming isn't a real call,  so it doesn't count towards recycling.
+        self.pool.checkin(session, count=False)
+
+    def close(self, discard: bool = False) -> None:
+        "Returns the browser session to the pool. Discarded sessions are quit instead of reused."
+        with self._session_lock:
+            session, self.session = self.session, None
+        if session is None:
+            return
+        if not discard:
+            try:
+                if self._page_load_capped:
+                    self.driver.set_page_load_timeout(self.page_load_timeout)
+                if self.report_page_weight:
+                    self.log_page_weight()
+            except Exception:
+                self.pool.checkin(session, discard=True)
+                self.driver = None
+                raise
+        self.pool.checkin(session, discard=discard)
+        self.driver = None
+
+    def abandon(self) -> None:
+        """Called when the call's deadline expires: kills the browser the call is stuck on and frees its
+        slot in the pool,  so the retry doesn't wait behind it. The stuck call then fails on its own."""
+        with self._session_lock:
+            session, self.session = self.session, None
+        if session is None:
+            return
+        log.warning(
+            msg="Estimator call ran past its deadline, abandoning its {0} session.".format(
+                self.engine.name
             ),
         )
+        session.kill()
+        self.pool.checkin(session, discard=True)
 
-        tax_status = self.driver.find_element(value="TaxStatus")
-        tax_status_select = Select(tax_status)
-        tax_status_select.select_by_value(
-            payload.tax_status,
-        )
-        log.debug(
-            msg="Found Tax Status field, inserted: {0}".format(payload.tax_status),
-        )
-        # Key inputs
-        self.driver.find_element(value="Premium").send_keys(
-            payload.premium,
-        )
-        log.debug(
-            msg="Found premium field, inserted: {0}".format(payload.premium),
-        )
-        self.driver.find_element(value="PolicyFee").send_keys(
-            payload.policy_fee,
+    def _checkout(self) -> None:
+        "Checks out a session,  waiting no longer than the deadline allows,  and caps the page load to it."
+        timeout = self.deadline.remaining() if self.deadline else None
+        session = self.pool.checkout(timeout=timeout)
+        with self._session_lock:
+            self.session = session
+            self.driver = session.driver
+        if self.deadline is None:
+            return
+        self.deadline.on_expire(self.abandon)
+        self._page_load_capped = self.deadline.remaining() < self.page_load_timeout
+        if self._page_load_capped:
+            self.driver.set_page_load_timeout(self.deadline.remaining())
+
+    def _timeout(self, timeout: float) -> float:
+        return self.deadline.cap(timeout) if self.deadline else timeout
+
+    def log_page_weight(self) -> dict[str, int | dict[str, int]]:
+        "Logs what the session's page loads since the last report cost,  and how much was blocked."
+        report = self.page_weight = blocking.page_weight(self.driver)
+        if report:
+            log.info(
+                msg="Page weight: {0} request(s), {1:,} byte(s) received, {2} request(s) blocked {3}.".format(
+                    report["requests"],
+                    report["bytes"],
+                    report["blocked"],
+                    report["blocked_by_type"],
+                ),
+            )
+        return report
+
+    def _fill_form(self, payload: Payload) -> None:
+        if self.session.ready_uri == payload.uri:
+            log.info(
+                msg="Session is already on a blank estimator form, skipping the page load.",
+            )
+        else:
+            self.driver.get(
+                payload.uri,
+            )
+        self.session.ready_uri = None
+        log.info(
+            msg="Launching web UI",
         )
         log.debug(
-            msg="Found policy fee field, inserted: {0}".format(payload.policy_fee),
-        )
-        log.info(
-            msg="Inserted data into fields, scrolling to submit btn.",
+            msg="Website URI: {0}".format(payload.uri),
         )
-        # btn
-        element = self.wait_for_element(self.driver, By.ID, "btnSubmit",)
-        self.scroll_and_click(self.driver, element)
-    
+        if self.eager:
+            self._wait_for_form()
+        self._fill(payload)
+
 
         ##############################
         # Refactored below code into separate functions
@@ -180,19 +454,178 @@ class Driver:
         #             element.click()
         #         except ElementClickInterceptedException:
 
-        log.debug(msg="Scrolled into view of submit btn and clicked it.")
+    def send_batch(self, payloads: list[Payload]) -> list[Response]:
+        """Runs every payload through one estimator page load. Between submissions only the fields
+        whose value differs from what's already on the page are retyped. The session goes back to
+        the pool once the batch is done."""
+        log.info(
+            msg="Checking out a {0} webdriver from the pool for a batch of {1} payload(s)".format(
+                self.engine.name,
+                len(payloads),
+            ),
+        )
+        self._checkout()
+        responses = []
+        try:
+            if self.session.ready_uri != payloads[0].uri:
+                self.driver.get(
+                    payloads[0].uri,
+                )
+            self.session.ready_uri = None
+            if self.eager:
+                self._wait_for_form()
+            for payload in payloads:
+                previous = self._result_table()
+                changed = self._fill(payload, only_changed=True)
+                log.debug(
+                    msg="Refilled {0} changed field(s) for payload: {1}".format(
+                        changed, payload
+                    ),
+                )
+                self._wait_for_new_results(previous)
+                responses.append(self.get_response())
+        except Exception:
+            self.close(discard=True)
+            raise
+        self.close()
+        return responses
+
+    def _fill(self, payload: Payload, only_changed: bool = False) -> int:
+        "Fills and submits the form,  in one script when scripted mode is on. Returns the number of fields touched."
+        if self.scripted:
+            changed = self._fill_scripted(payload, only_changed)
+            if changed is not None:
+                return changed
+        changed = self._set_fields(payload, only_changed)
+        self._submit()
+        return changed
+
+    def _fill_scripted(self, payload: Payload, only_changed: bool = False) -> int | None:
+        """Sets every field, fires its change events and submits,  all in one round trip to the driver.
+        Returns None when the page doesn't look the way the script expects,  so the caller can fall back."""
+        try:
+            result = self.driver.execute_script(
+                FILL_AND_SUBMIT_JS,
+                payload_fields(payload),
+                only_changed,
+            )
+        except JavascriptException:
+            log.warning(
+                msg="Scripted form fill failed, falling back to filling field by field.",
+                exc_info=1,
+            )
+            return None
+        if result.get("error"):
+            log.warning(
+                msg="Scripted form fill couldn't run ({0}), falling back to filling field by field.".format(
+                    result["error"]
+                ),
+            )
+            return None
+        log.debug(
+            msg="Filled {0} field(s) and submitted the form with one script.".format(
+                result["changed"]
+            ),
+        )
+        return result["changed"]
+
+    def _set_fields(self, payload: Payload, only_changed: bool = False) -> int:
+        "Types each Payload value into its field. Returns how many fields were actually touched."
+        changed = 0
+        for field_id, value in payload_fields(payload).items():
+            element = self.driver.find_element(value=field_id)
+            if field_id in SELECT_FIELDS:
+                select = Select(element)
+                if (
+                    only_changed
+                    and select.first_selected_option.get_attribute("value") == value
+                ):
+                    continue
+                select.select_by_value(value)
+            else:
+                if only_changed:
+                    if element.get_attribute("value") == value:
+                        continue
+                    element.clear()
+                element.send_keys(value)
+            changed += 1
+            log.debug(
+                msg="Found {0} field, inserted: {1}".format(field_id, value),
+            )
+        return changed
+
+    def _submit(self) -> None:
+        if self.eager:
+            self._submit_form()
+            return
+        log.info(
+            msg="Inserted data into fields, scrolling to submit btn.",
+        )
+        # btn
+        element = self.wait_for_element(
+            self.driver, By.ID, "btnSubmit", timeout=self._timeout(self.element_timeout)
+        )
+        if self.scroll_and_click(self.driver, element):
+            log.debug(msg="Scrolled into view of submit btn and clicked it.")
+
+    def _submit_form(self) -> None:
+        "Submits the estimator form straight from the submit button,  no scrolling or clicking needed."
+        log.info(
+            msg="Inserted data into fields, submitting the form.",
+        )
+        element = self.driver.find_element(value="btnSubmit")
+        # requestSubmit runs the same validation and submit handlers a click would.
+        self.driver.execute_script(
+            """const btn = arguments[0];
+            if (btn.form.requestSubmit) { btn.form.requestSubmit(btn); } else { btn.form.submit(); }""",
+            element,
+        )
+        log.debug(msg="Submitted the form from the submit btn, without scrolling.")
+
+    def _wait_for_form(self) -> None:
+        "Waits until every form control and the submit button are in the DOM."
+        selector = ", ".join("#{0}".format(field_id) for field_id in FORM_FIELDS + ("btnSubmit",))
+        WebDriverWait(self.driver, self._timeout(self.element_timeout)).until(
+            lambda driver: len(driver.find_elements(By.CSS_SELECTOR, selector))
+            == len(FORM_FIELDS) + 1
+        )
+        log.debug(
+            msg="Form controls are present.",
+        )
+
+    def _result_table(self):
+        tables = self.driver.find_elements(
+            by=By.XPATH,
+            value=RESULT_TABLE,
+        )
+        return tables[0] if tables else None
+
+    def _wait_for_new_results(self, previous) -> None:
+        """Waits for the page to swap out the last result table (if any) for a new one. In eager mode it
+        also waits for the new table's cells to be filled in."""
+        wait = WebDriverWait(self.driver, self._timeout(self.results_timeout))
+        if previous is not None:
+            wait.until(expected_conditions.staleness_of(previous))
+        if self.eager:
+            wait.until(results_rendered())
+        else:
+            wait.until(
+                expected_conditions.presence_of_element_located((By.XPATH, RESULT_TABLE))
+            )
 
     def wait_for_element(self, driver, by, value, timeout=10):
         return WebDriverWait(driver, timeout).until(
             expected_conditions.element_to_be_clickable((by, value))
         )
 
-    def scroll_and_click(self, driver, element):
+    def scroll_and_click(self, driver, element) -> bool:
         if not self.try_scroll_shim(driver, element):
             if not self.try_scroll_js(driver, element):
                 if not self.try_scroll_js(driver, element, position="top"):
                     if not self.try_scroll_js(driver, element, position="bottom"):
                         log.error("All attempts to scroll and click the button failed.")
+                        return False
+        return True
 
     def try_scroll_shim(self, driver, element, actions=None):
         try:
@@ -230,6 +663,10 @@ class Driver:
 
     # Tax
     def get_response(self) -> Response:
+        if self.scripted:
+            r = self._get_response_scripted()
+            if r is not None:
+                return r
         r = Response()
         for key, path in xpaths.items():
             value = self.driver.find_element(
@@ -244,3 +681,21 @@ class Driver:
             msg="Returning Response: {0}".format(str(r)),
         )
         return r
+
+    def _get_response_scripted(self) -> Response | None:
+        "Polls one script that returns all four result cells at once. None if they never show up."
+        try:
+            values = WebDriverWait(self.driver, self._timeout(self.results_timeout)).until(
+                lambda driver: driver.execute_script(READ_RESULTS_JS, xpaths)
+            )
+        except (TimeoutException, JavascriptException):
+            log.warning(
+                msg="Scripted result read failed, falling back to reading cell by cell.",
+                exc_info=1,
+            )
+            return None
+        r = Response(**values)
+        log.debug(
+            msg="Returning Response: {0}".format(str(r)),
+        )
+        return r
@@ -0,0 +1,240 @@
+"""A small local stand-in for the FSLSO tax estimator.
+
+It serves the same form ids (PolicyEffectiveDate, CoverageCode, btnSubmit, ...) and the same
+'tax-invoice tax-assessments' result table as the live site,  so the scraper backends can be
+exercised and benchmarked without touching the network. Run it on its own with:
+
+    python -m model.web.stand_in --port 8765
+
+then point the [web] estimator_uri option at http://127.0.0.1:8765/tax-estimator.
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import html
+import logging
+import random
+import secrets
+import threading
+import time
+
+from model.web.calculator import RATE_TABLES, assess, money, rates_for
+
+
+log = logging.getLogger(__name__)
+
+PATH = "/tax-estimator"
+
+FORM = """<!DOCTYPE html>
+<html>
+<head>
+<title>Tax Estimator</title>
+<link rel="stylesheet" href="/static/site.css">
+<script src="/static/analytics.js"></script>
+</head>
+<body>
+<img src="/static/banner.png" alt="">
+<form id="taxEstimator" method="post" action="{path}">
+  <input type="hidden" name="__RequestVerificationToken" value="{token}">
+  <input type="text" id="PolicyEffectiveDate" name="PolicyEffectiveDate" value="{PolicyEffectiveDate}">
+  <input type="text" id="TransactionEffectiveDate" name="TransactionEffectiveDate" value="{TransactionEffectiveDate}">
+  <select id="CoverageCode" name="CoverageCode">{CoverageCode}</select>
+  <select id="TransactionType" name="TransactionType">{TransactionType}</select>
+  <select id="TaxStatus" name="TaxStatus">{TaxStatus}</select>
+  <input type="text" id="Premium" name="Premium" value="{Premium}">
+  <input type="text" id="PolicyFee" name="PolicyFee" value="{PolicyFee}">
+  <button type="submit" id="btnSubmit">Calculate</button>
+</form>
+{results}
+</body>
+</html>
+"""
+
+RESULTS = """<table class="tax-invoice tax-assessments">
+  <tbody>
+    <tr><th>Assessment</th><th>Amount</th></tr>
+    <tr><td>Surplus Lines Tax</td><td>{tax}</td></tr>
+    <tr><td>Tax Rate</td><td>{tax_rate}</td></tr>
+    <tr><td>Service Fee</td><td>{service}</td></tr>
+    <tr><td>Service Fee Rate</td><td>{service_rate}</td></tr>
+    <tr><td>Total Taxes &amp; Fees</td><td>{subtotal_fees}</td></tr>
+    <tr><td>Total Cost</td><td>{total}</td></tr>
+  </tbody>
+</table>
+"""
+
+# Page furniture the form doesn't need,  padded to roughly the live site's sizes,  so blocking it
+# shows up in the page weight.
+ASSETS = {
+    "/static/site.css": (
+        "text/css",
+        "@font-face { font-family: Site; src: url(/static/site.woff2); }\n"
+        "body { font-family: Site, sans-serif; }\n" + "/*" + " " * 40_000 + "*/\n",
+    ),
+    "/static/analytics.js": ("text/javascript", "//" + " " * 90_000 + "\n"),
+    "/static/banner.png": ("image/png", "\0" * 250_000),
+    "/static/site.woff2": ("font/woff2", "\0" * 60_000),
+}
+
+OPTIONS = {
+    "CoverageCode": ["3006"],
+    "TransactionType": ["1", "2", "3", "4", "5"],
+    "TaxStatus": ["0"],
+}
+
+
+def estimate(premium: Decimal, policy_fee: Decimal, eff_date: str) -> dict[str, str]:
+    "Fills the result table from the local rate tables,  so the stand-in agrees with the 'local' backend."
+    try:
+        table = rates_for(datetime.strptime(eff_date, "%m/%d/%Y").date())
+    except ValueError:
+        table = RATE_TABLES[-1]
+    results = {
+        key: money(value) for key, value in assess(premium + policy_fee, table).items()
+    }
+    results["tax_rate"] = "{0}%".format(table.tax_rate * 100)
+    results["service_rate"] = "{0}%".format(table.service_fee_rate * 100)
+    return results
+
+
+class EstimatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ASSETS:
+            self._send_asset(*ASSETS[path])
+            return
+        if path != PATH:
+            self.send_error(404)
+            return
+        self._delay()
+        self._send_page(fields={})
+
+    def do_POST(self):
+        if urlparse(self.path).path != PATH:
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        fields = {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+        self._delay()
+        try:
+            premium = Decimal(fields.get("Premium", "").replace(",", "") or "0")
+            policy_fee = Decimal(fields.get("PolicyFee", "").replace(",", "") or "0")
+        except InvalidOperation:
+            self._send_page(fields=fields)
+            return
+        results = estimate(premium, policy_fee, fields.get("PolicyEffectiveDate", ""))
+        self._send_page(fields=fields, results=RESULTS.format(**results))
+
+    def _delay(self):
+        "Simulates the live site's response time: `latency` seconds plus up to `jitter` more."
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def log_message(self, format, *args):
+        log.debug(msg=format % args)
+
+    def _send_asset(self, content_type: str, body: str):
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_page(self, fields: dict[str, str], results: str = ""):
+        values = {
+            "path": PATH,
+            "token": secrets.token_hex(16),
+            "results": results,
+        }
+        for name in ("PolicyEffectiveDate", "TransactionEffectiveDate", "Premium", "PolicyFee"):
+            values[name] = html.escape(fields.get(name, ""), quote=True)
+        for name, options in OPTIONS.items():
+            chosen = fields.get(name, options[0])
+            values[name] = "".join(
+                '<option value="{0}"{1}>{0}</option>'.format(
+                    option, " selected" if option == chosen else ""
+                )
+                for option in options
+            )
+        body = FORM.format(**values).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "__RequestVerificationToken={0}; path=/".format(values["token"]))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandInServer:
+    """Runs the stand-in estimator on a background thread. Use as a context manager.
+
+    `latency` and `jitter` (seconds) delay every response,  to stand in for the live site's round trip."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ) -> None:
+        self.server = ThreadingHTTPServer((host, port), EstimatorHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.jitter = jitter
+        self._thread: threading.Thread = None
+
+    @property
+    def uri(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{PATH}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever,
+            daemon=True,
+            name="Estimator Stand-in",
+        )
+        self._thread.start()
+        log.info(
+            msg="Stand-in estimator listening on {0}".format(self.uri),
+        )
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the FSLSO tax estimator.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more random seconds")
+    args = parser.parse_args()
+    server = StandInServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+    )
+    print(f"Serving the stand-in estimator at {server.uri}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,229 @@
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from urllib.parse import urljoin
+import logging
+import threading
+
+import urllib3
+
+from exceptions.surplus_lines import EstimatorError
+from helper import get_setting
+from model.web.deadline import Deadline
+from model.web.scraper import (
+    ESTIMATOR_URI,
+    Payload,
+    Response,
+    payload_fields,
+    result_cells,
+)
+
+
+log = logging.getLogger(__name__)
+
+class EstimatorFormParser(HTMLParser):
+    """Finds the estimator's form on the page and collects its action and the hidden fields (anti-forgery token, etc.)
+    that have to be posted back along with the Payload."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.action: str = None
+        self.hidden: dict[str, str] = {}
+        self._in_form: bool = False
+        self._form_action: str = None
+        self._form_hidden: dict[str, str] = {}
+        self._form_fields: set[str] = set()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self._in_form = True
+            self._form_action = attrs.get("action") or ""
+            self._form_hidden = {}
+            self._form_fields = set()
+        elif self._in_form and tag in ("input", "select", "textarea"):
+            name = attrs.get("name") or attrs.get("id")
+            if name is None:
+                return
+            self._form_fields.add(name)
+            if tag == "input" and attrs.get("type", "").lower() == "hidden":
+                self._form_hidden[name] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form" and self._in_form:
+            self._in_form = False
+            if self.action is None and "Premium" in self._form_fields:
+                self.action = self._form_action
+                self.hidden = self._form_hidden
+
+
+class ResultTableParser(HTMLParser):
+    """Collects the td text of the first 'tax-invoice tax-assessments' table, row by row,  so that
+    rows[row - 1][col - 1] is the same cell the xpaths point at."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: list[list[str]] = []
+        self._depth: int = 0
+        self._done: bool = False
+        self._cell: list[str] = None
+        self._skip: bool = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif dict(attrs).get("class") == "tax-invoice tax-assessments":
+                self._depth = 1
+        elif self._depth == 1 and tag in ("thead", "tfoot"):
+            # The xpaths only look at the first tbody.
+            self._skip = True
+        elif self._depth == 1 and tag == "tr" and not self._skip:
+            self.rows.append([])
+        elif self._depth == 1 and tag == "td" and not self._skip:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == "table":
+            self._depth -= 1
+            self._done = not self._depth
+        elif self._depth == 1 and tag in ("thead", "tfoot"):
+            self._skip = False
+        elif self._depth == 1 and tag == "tbody" and self.rows:
+            self._done = True
+            self._depth = 0
+        elif self._depth == 1 and tag == "td" and self._cell is not None:
+            self.rows[-1].append(" ".join("".join(self._cell).split()))
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+_http: urllib3.PoolManager = None
+_http_lock = threading.Lock()
+
+
+def get_http() -> urllib3.PoolManager:
+    "One keep-alive connection pool shared by every HttpDriver in the process."
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = urllib3.PoolManager(
+                num_pools=2,
+                maxsize=4,
+                block=False,
+                retries=urllib3.Retry(total=2, backoff_factor=0.2),
+                timeout=urllib3.Timeout(connect=5, read=20),
+            )
+        return _http
+
+
+class HttpDriver:
+    """Posts the Payload straight to the estimator and parses the result table,  without a browser.
+
+    Has the same send_call/get_response/close interface as the browser Driver so the two are interchangeable.
+    """
+
+    def __init__(self, http: urllib3.PoolManager = None, deadline: Deadline = None) -> None:
+        self.http = http or get_http()
+        # Set by the WebCallPolicy: no request outlives it.
+        self.deadline: Deadline = deadline
+        self.page: str = None
+
+    def send_call(self, payload: Payload) -> None:
+        log.info(
+            msg="Requesting the estimator form over HTTP",
+        )
+        log.debug(
+            msg="Website URI: {0}".format(payload.uri),
+        )
+        form_page = self._request("GET", payload.uri)
+        form = EstimatorFormParser()
+        form.feed(form_page.data.decode(errors="replace"))
+        if form.action is None:
+            raise EstimatorError("Could not find the tax estimator form on the page.")
+        fields = dict(form.hidden)
+        fields.update(payload_fields(payload))
+        log.debug(
+            msg="Posting the estimator form with fields: {0}".format(fields),
+        )
+        headers = {}
+        cookies = self._cookies(form_page)
+        if cookies:
+            headers["Cookie"] = cookies
+        result_page = self._request(
+            "POST",
+            urljoin(payload.uri, form.action),
+            fields=fields,
+            headers=headers,
+            encode_multipart=False,
+        )
+        self.page = result_page.data.decode(errors="replace")
+
+    def get_response(self) -> Response:
+        table = ResultTableParser()
+        table.feed(self.page)
+        r = Response()
+        for key, (row, col) in result_cells.items():
+            try:
+                value = table.rows[row - 1][col - 1]
+            except IndexError as e:
+                raise EstimatorError(
+                    "The estimator's result table is missing the {0} value.".format(key)
+                ) from e
+            log.debug(
+                msg="Found {0}, and its value is: {1}".format(key, value),
+            )
+            setattr(r, key, value)
+        log.debug(
+            msg="Returning Response: {0}".format(str(r)),
+        )
+        return r
+
+    def prewarm(self, timeout: float) -> None:
+        "Opens the keep-alive connection (DNS, TCP and TLS) ahead of the first real call."
+        uri = get_setting("web", "estimator_uri", ESTIMATOR_URI)
+        self._request("GET", uri, timeout=urllib3.Timeout(total=timeout))
+        log.info(
+            msg="Pre-warmed the HTTP connection to {0}.".format(uri),
+        )
+
+    def send_batch(self, payloads: list[Payload]) -> list[Response]:
+        "Each payload is its own GET/POST pair,  but they all ride the same kept-alive connection."
+        responses = []
+        for payload in payloads:
+            self.send_call(payload)
+            responses.append(self.get_response())
+        self.close()
+        return responses
+
+    def close(self, discard: bool = False) -> None:
+        "Connections go back to the shared pool on their own; nothing to hand back."
+        self.page = None
+
+    def _request(self, method: str, url: str, **kwargs) -> urllib3.BaseHTTPResponse:
+        if self.deadline and "timeout" not in kwargs:
+            kwargs["timeout"] = urllib3.Timeout(total=self.deadline.remaining())
+        try:
+            r = self.http.request(method, url, **kwargs)
+        except urllib3.exceptions.HTTPError as e:
+            raise EstimatorError(
+                "The tax estimator could not be reached: {0}".format(e)
+            ) from e
+        if r.status >= 400:
+            raise EstimatorError(
+                "The tax estimator returned HTTP {0} for {1}.".format(r.status, url)
+            )
+        return r
+
+    @staticmethod
+    def _cookies(r: urllib3.BaseHTTPResponse) -> str:
+        jar = SimpleCookie()
+        for header in r.headers.getlist("Set-Cookie"):
+            jar.load(header)
+        return "; ".join(f"{k}={m.value}" for k, m in jar.items())
@@ -0,0 +1,46 @@
+import pytest
+
+import helper
+from model.web.engines import ENGINES
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+from model.web.stand_in import StandInServer
+
+
+@pytest.fixture(scope="session")
+def stand_in():
+    "The local stand-in estimator the backend tests post to."
+    with StandInServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def browser(tmp_path_factory):
+    """A one-session DriverPool on the first engine that launches here,  and the engine's name.
+    Skips the test when no browser can be launched. The driver lookup is remembered in a scratch config."""
+    config = tmp_path_factory.mktemp("browser") / "configurations.ini"
+    config.write_text("[web]\n")
+    failures = {}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(helper, "CONFIG_PATH", config)
+        mp.setattr(helper, "_config", None)
+        mp.setattr(helper, "_config_stamp", None)
+        for name in ENGINES:
+            template = Driver(
+                pool=DriverPool(lambda slot: None),
+                engine=name,
+                eager=True,
+                block_requests=False,
+                lean_profile=False,
+                report_page_weight=False,
+            )
+            pool = DriverPool(template.launch_browser, size=1)
+            try:
+                pool.warm()
+            except Exception as e:
+                failures[name] = type(e).__name__
+                continue
+            yield pool, name
+            pool.close()
+            return
+    pytest.skip("No browser could be launched: {0}".format(failures))
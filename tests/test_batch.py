@@ -0,0 +1,48 @@
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import batch
+
+
+def parse_or_crash(pdf_path: Path, override_not_applicable: bool = False) -> dict:
+    "Stands in for parse_file in the workers: crash.pdf kills its process,  raise.pdf escapes."
+    if pdf_path.name == "crash.pdf":
+        os._exit(1)
+    if pdf_path.name == "raise.pdf":
+        raise RuntimeError("escaped parse_file")
+    return {"file": str(pdf_path), "ok": True, "seconds": 0.0}
+
+
+@pytest.fixture
+def records(monkeypatch):
+    # The workers are forked,  so they see the stand-in too.
+    monkeypatch.setattr(batch, "parse_file", parse_or_crash)
+
+    def run(names: list[str]) -> tuple[dict, dict[str, dict]]:
+        out = io.StringIO()
+        summary = batch.run([Path(name) for name in names], out, workers=2)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        return summary, {Path(line["file"]).name: line for line in lines}
+
+    return run
+
+
+def test_a_crashing_file_is_recorded_and_the_rest_still_parse(records):
+    names = ["a.pdf", "b.pdf", "crash.pdf", "c.pdf", "d.pdf", "e.pdf"]
+    summary, by_name = records(names)
+    assert sorted(by_name) == sorted(names)
+    assert by_name["crash.pdf"]["ok"] is False
+    assert by_name["crash.pdf"]["error"]["type"] == "BrokenProcessPool"
+    assert all(by_name[name]["ok"] for name in names if name != "crash.pdf")
+    assert (summary["parsed"], summary["failed"]) == (5, 1)
+
+
+def test_an_error_escaping_the_worker_fails_only_its_file(records):
+    summary, by_name = records(["a.pdf", "raise.pdf", "b.pdf"])
+    assert by_name["raise.pdf"]["error"] == {"type": "RuntimeError", "message": "escaped parse_file"}
+    assert by_name["a.pdf"]["ok"] and by_name["b.pdf"]["ok"]
+    assert (summary["parsed"], summary["failed"]) == (2, 1)
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+
+import pytest
+
+from model.web import cache as cache_module
+from model.web.cache import EstimatorCache
+from model.web.scraper import Response
+
+DAY = 86400
+
+
+@dataclass
+class Payload:
+    premium: float
+    eff_date: str = "03/01/2024"
+    transaction_type: str = "1"
+    coverage_code: str = "3006"
+    tax_status: str = "0"
+    policy_fee: float = 0
+    uri: str = "https://example.test/tax-estimator"
+
+
+class Clock:
+    "Stands in for the time module inside model.web.cache,  so entries age on demand."
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def tick(self, seconds: float = 1) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "estimator.sqlite3"
+
+
+def response(premium: float) -> Response:
+    return Response(tax="${0:.2f}".format(premium * 0.05), service="$1.00", subtotal_fees="$2.00", total="$3.00")
+
+
+def test_miss_then_hit(path, clock):
+    cache = EstimatorCache(path)
+    assert cache.get(Payload(1000)) is None
+    cache.put(Payload(1000), response(1000))
+    assert cache.get(Payload(1000)) == response(1000)
+    assert cache.get(Payload(1000.001)) == response(1000)
+    assert cache.get(Payload(2000)) is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 1}
+
+
+def test_entries_outlive_the_cache_object(path, clock):
+    EstimatorCache(path).put(Payload(1000), response(1000))
+    assert EstimatorCache(path).get(Payload(1000)) == response(1000)
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries(path, clock):
+    cache = EstimatorCache(path, max_entries=2)
+    cache.put(Payload(1), response(1))
+    clock.tick()
+    cache.put(Payload(2), response(2))
+    clock.tick()
+    # Using the older entry makes the other one the least recently used.
+    assert cache.get(Payload(1)) is not None
+    clock.tick()
+    cache.put(Payload(3), response(3))
+    assert cache.stats()["entries"] == 2
+    assert cache.get(Payload(2)) is None
+    assert cache.get(Payload(1)) == response(1)
+    assert cache.get(Payload(3)) == response(3)
+
+
+def test_entries_expire_after_ttl(path, clock):
+    cache = EstimatorCache(path, ttl_days=30)
+    cache.put(Payload(1000), response(1000))
+    clock.tick(29 * DAY)
+    assert cache.get(Payload(1000)) == response(1000)
+    clock.tick(2 * DAY)
+    assert cache.get(Payload(1000)) is None
+
+
+def test_expired_entries_can_still_be_read_stale(path, clock):
+    cache = EstimatorCache(path, ttl_days=30)
+    cache.put(Payload(1000), response(1000))
+    clock.tick(90 * DAY)
+    assert cache.get(Payload(1000)) is None
+    assert cache.get(Payload(1000), allow_stale=True) == response(1000)
+
+
+def test_entries_from_another_fee_schedule_are_purged(path, clock):
+    EstimatorCache(path, fee_schedule="2023-01-01").put(Payload(1000), response(1000))
+    cache = EstimatorCache(path, fee_schedule="2024-01-01")
+    assert cache.stats()["entries"] == 0
+    assert cache.get(Payload(1000), allow_stale=True) is None
+
+
+def test_clear(path, clock):
+    cache = EstimatorCache(path)
+    cache.put(Payload(1000), response(1000))
+    cache.clear()
+    assert cache.get(Payload(1000)) is None
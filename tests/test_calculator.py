@@ -0,0 +1,63 @@
+from dataclasses import dataclass, replace
+from datetime import date
+import logging
+
+import pytest
+
+from model.web.calculator import calculate, parse_money, rates_for, shadow_compare
+from model.web.scraper import Response
+
+
+@dataclass(frozen=True)
+class Payload:
+    eff_date: str = "06/01/2024"
+    premium: str = "1075.00"
+    policy_fee: str = "0.00"
+    coverage_code: str = "3006"
+    transaction_type: str = "1"
+    tax_status: str = "0"
+    uri: str = "https://estimator.invalid/"
+
+
+def test_each_fee_rounds_half_up_to_the_cent():
+    # 1075 * 4.94% = 53.105 and 1075 * 0.06% = 0.645: half-even would give 53.10 and 0.64.
+    # Summed before rounding the fees would come to 53.75.
+    assert calculate(Payload()) == Response(
+        tax="$53.11", service="$0.65", subtotal_fees="$53.76", total="$1,128.76"
+    )
+
+
+def test_return_premiums_come_out_negative():
+    r = calculate(Payload(premium="-1075.00"))
+    assert r == Response(
+        tax="($53.11)", service="($0.65)", subtotal_fees="($53.76)", total="($1,128.76)"
+    )
+    assert parse_money(r.total) == -parse_money(calculate(Payload()).total)
+
+
+@pytest.mark.parametrize(
+    "eff_date, day, effective, service",
+    [
+        ("12/31/2022", date(2022, 12, 31), date(2018, 1, 1), "$0.75"),
+        ("01/01/2023", date(2023, 1, 1), date(2023, 1, 1), "$0.60"),
+    ],
+)
+def test_rate_table_follows_the_effective_date(eff_date, day, effective, service):
+    assert rates_for(day).effective == effective
+    assert calculate(Payload(eff_date=eff_date, premium="1000.00")).service == service
+
+
+def test_no_rate_table_before_the_first():
+    with pytest.raises(ValueError):
+        rates_for(date(2017, 12, 31))
+
+
+def test_shadow_compare_logs_a_mismatch(caplog):
+    payload = Payload()
+    good = calculate(payload)
+    with caplog.at_level(logging.INFO, logger="model.web.calculator"):
+        assert shadow_compare(payload, good)
+        assert shadow_compare(payload, replace(good, service="$0.64")) is False
+    mismatch = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(mismatch) == 1
+    assert "'service_fee': ('$0.64', '$0.65')" in mismatch[0].getMessage()
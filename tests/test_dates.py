@@ -0,0 +1,69 @@
+from datetime import date
+
+import datefinder
+import pytest
+
+from model.carriers.dates import FORMATS, find_date
+
+
+def first_datefinder(text: str):
+    "The date the builders read before find_date: datefinder's first."
+    for found in datefinder.find_dates(text):
+        return found
+    return None
+
+
+# (format,  block) as the carriers print them,  where datefinder reads the date right.
+SAME_AS_DATEFINDER = [
+    ("day_month_year", "12 November 2023"),
+    ("day_month_year", "It is hereby noted and agreed that with effect from 2 April 2024 the cover hereunder is cancelled."),
+    ("day_month_year", "05 Jan 2024 at 12:01 AM Standard Time at the address of the Named Insured"),
+    ("day_month_year", "with effect from 15 Jan 2024, Additional Premium US$ 350.00"),
+    ("month_day_year", "January 5, 2024"),
+    ("month_day_year", "Quote valid 60 days from December 12, 2023"),
+    ("numeric_mdy", "3/4/2024"),
+    ("numeric_mdy", "Endorsement Effective: 06/01/2024 12:01 AM"),
+    ("numeric_mdy", "Policy Period: 04/15/2024 to 04/15/2025"),
+    ("numeric_mdy", "03-04-24"),
+    ("iso", "2024-03-04"),
+    ("iso", "Effective 2024-06-01 per endorsement"),
+]
+
+
+def test_every_format_is_covered():
+    assert {fmt for fmt, _ in SAME_AS_DATEFINDER} == set(FORMATS)
+
+
+@pytest.mark.parametrize("fmt, text", SAME_AS_DATEFINDER)
+def test_finds_the_same_date_as_datefinder(fmt, text):
+    # datefinder also reads times of day; the builders only keep the date.
+    assert find_date(text, (fmt,)).date() == first_datefinder(text).date()
+    # The carrier's formats only decide which is tried first.
+    assert find_date(text).date() == first_datefinder(text).date()
+
+
+@pytest.mark.parametrize(
+    "fmt, text, expected",
+    [
+        # datefinder reads "00.01 1 March 2024" as 1 March 2000 at 20:24.
+        ("day_month_year", "From 00.01 1 March 2024 to 00.01 1 March 2025 Local Standard Time", date(2024, 3, 1)),
+        # ...and picks the agent number over the date.
+        ("numeric_mdy", "Date: 11/30/2023 Agent: 0042 Page 1 of 3", date(2023, 11, 30)),
+        ("month_day_year", "Date of Issue: Sept 3, 2024", date(2024, 9, 3)),
+    ],
+)
+def test_reads_blocks_datefinder_gets_wrong(fmt, text, expected):
+    assert find_date(text, (fmt,)).date() == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "No date here", "Total Amount Due: USD 1,500.00", "Policy Number: YI-98765"],
+)
+def test_no_date_is_none(text):
+    assert find_date(text) is None
+    assert first_datefinder(text) is None
+
+
+def test_skips_impossible_dates():
+    assert find_date("31/02/2024 or 03/01/2024", ("numeric_mdy",)).date() == date(2024, 3, 1)
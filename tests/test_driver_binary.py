@@ -0,0 +1,96 @@
+import pytest
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+import helper
+from model.web import driver_binary
+from model.web.driver_binary import resolve_driver
+from model.web.engines import ENGINES
+
+
+@pytest.fixture
+def drivers(tmp_path):
+    "Two msedgedriver builds and a chromedriver on disk."
+    paths = {}
+    for name in ("msedgedriver-123", "msedgedriver-124", "chromedriver-124"):
+        paths[name] = tmp_path / name
+        paths[name].write_text("")
+    return paths
+
+
+@pytest.fixture
+def remembered(tmp_path, monkeypatch, drivers):
+    "A config that remembers msedgedriver 123 for edge,  and a fresh process."
+    path = tmp_path / "configurations.ini"
+    path.write_text(
+        "[web]\ndriver_path = {0}\ndriver_version = 123.0.2420.65\ndriver_engine = edge\n".format(
+            drivers["msedgedriver-123"]
+        )
+    )
+    monkeypatch.setattr(helper, "CONFIG_PATH", path)
+    monkeypatch.setattr(helper, "_config", None)
+    monkeypatch.setattr(helper, "_config_stamp", None)
+    monkeypatch.setattr(driver_binary, "_driver_paths", {})
+    monkeypatch.setattr(
+        driver_binary, "version_of", lambda executable: executable.rsplit("-", 1)[1] + ".0.1.0"
+    )
+    return path
+
+
+@pytest.fixture
+def lookups(monkeypatch, drivers) -> list[str]:
+    "Stands in for Selenium Manager,  finding the 124 build of whichever driver it's asked for."
+    found = []
+
+    def driver_location(self, options):
+        chrome = options.capabilities["browserName"] == "chrome"
+        name = "chromedriver-124" if chrome else "msedgedriver-124"
+        found.append(name)
+        return str(drivers[name])
+
+    monkeypatch.setattr(SeleniumManager, "driver_location", driver_location)
+    return found
+
+
+def browser(monkeypatch, name: str, version: str):
+    engine = ENGINES[name]
+    monkeypatch.setattr(engine, "browser_version", lambda: version)
+    return engine
+
+
+def test_remembered_driver_is_used_while_the_major_version_matches(
+    remembered, lookups, drivers, monkeypatch
+):
+    engine = browser(monkeypatch, "edge", "123.0.2420.97")
+    assert resolve_driver(engine, engine.new_options()) == str(drivers["msedgedriver-123"])
+    assert resolve_driver(engine, engine.new_options()) == str(drivers["msedgedriver-123"])
+    assert lookups == []
+
+
+def test_browser_update_to_a_new_major_version_looks_again(
+    remembered, lookups, drivers, monkeypatch
+):
+    engine = browser(monkeypatch, "edge", "124.0.2478.51")
+    assert resolve_driver(engine, engine.new_options()) == str(drivers["msedgedriver-124"])
+    assert lookups == ["msedgedriver-124"]
+    assert helper.get_setting("web", "driver_path") == str(drivers["msedgedriver-124"])
+    assert helper.get_setting("web", "driver_version") == "124.0.1.0"
+    # Remembered for the rest of the process.
+    resolve_driver(engine, engine.new_options())
+    assert lookups == ["msedgedriver-124"]
+
+
+def test_engine_change_looks_again(remembered, lookups, drivers, monkeypatch):
+    engine = browser(monkeypatch, "chromium", "124.0.6367.60")
+    assert resolve_driver(engine, engine.new_options()) == str(drivers["chromedriver-124"])
+    assert lookups == ["chromedriver-124"]
+    assert helper.get_setting("web", "driver_engine") == "chromium"
+
+
+def test_failed_lookup_falls_back_to_the_remembered_driver(remembered, drivers, monkeypatch):
+    def offline(self, options):
+        raise OSError("no network")
+
+    monkeypatch.setattr(SeleniumManager, "driver_location", offline)
+    engine = browser(monkeypatch, "edge", "124.0.2478.51")
+    assert resolve_driver(engine, engine.new_options()) == str(drivers["msedgedriver-123"])
+    assert helper.get_setting("web", "driver_version") == "123.0.2420.65"
@@ -0,0 +1,29 @@
+import pytest
+
+from model.web.engines import ENGINES, ChromiumEngine, Engine, get_engine
+
+
+def test_every_engine_implements_the_whole_interface():
+    assert set(ENGINES) == {"edge", "chromium", "firefox"}
+    for engine in ENGINES.values():
+        assert not engine.__abstractmethods__
+        assert engine.new_options().arguments
+
+
+def test_half_implemented_engine_fails_when_instantiated():
+    class NoLaunch(ChromiumEngine):
+        name = "no-launch"
+
+        def service(self, executable_path):
+            return None
+
+    with pytest.raises(TypeError, match="launch"):
+        NoLaunch()
+    with pytest.raises(TypeError):
+        Engine()
+
+
+def test_get_engine_rejects_unknown_names():
+    assert get_engine("Firefox") is ENGINES["firefox"]
+    with pytest.raises(ValueError):
+        get_engine("netscape")
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+import helper
+
+CONFIG = """[surplus lines]
+output_dir = C:/stamped
+
+[web]
+pool_size = 2
+engine = edge
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = tmp_path / "configurations.ini"
+    path.write_text(CONFIG)
+    monkeypatch.setattr(helper, "CONFIG_PATH", path)
+    monkeypatch.setattr(helper, "_config", None)
+    monkeypatch.setattr(helper, "_config_stamp", None)
+    return path
+
+
+@pytest.fixture
+def reads(monkeypatch) -> list[int]:
+    "Counts how often the config file is parsed."
+    calls = []
+    open_config = helper.open_config
+
+    def counting():
+        calls.append(1)
+        return open_config()
+
+    monkeypatch.setattr(helper, "open_config", counting)
+    return calls
+
+
+def test_settings_are_parsed_once(config_path, reads):
+    for _ in range(20):
+        assert helper.get_setting("web", "pool_size") == "2"
+        assert helper.get_setting("web", "missing", "fallback") == "fallback"
+        assert helper.get_setting("nowhere", "engine", "edge") == "edge"
+    assert len(reads) == 1
+
+
+def test_changes_saved_elsewhere_are_read_again(config_path, reads):
+    assert helper.get_setting("web", "engine") == "edge"
+    config = helper.open_config()
+    config.set("web", "engine", "chromium")
+    config.update_file()
+    assert helper.get_setting("web", "engine") == "chromium"
+
+
+def test_missing_config_file(config_path):
+    config_path.unlink()
+    assert helper.get_setting("web", "pool_size", "1") == "1"
+    assert helper.set_setting("web", "pool_size", "3") is False
+    assert not config_path.exists()
+
+
+def test_set_setting_updates_the_file_and_the_parsed_config(config_path, reads):
+    assert helper.set_setting("web", "driver_path", "C:/drivers/msedgedriver.exe")
+    assert helper.set_setting("parser", "locate_workers", "2")
+    assert helper.get_setting("web", "driver_path") == "C:/drivers/msedgedriver.exe"
+    assert helper.get_setting("parser", "locate_workers") == "2"
+    assert len(reads) == 1
+    text = config_path.read_text()
+    assert text.startswith("[surplus lines]\noutput_dir = C:/stamped\n")
+    assert "driver_path = C:/drivers/msedgedriver.exe" in text
+    assert list(config_path.parent.iterdir()) == [config_path]
+
+
+def test_concurrent_writes_are_not_lost(config_path):
+    threads = [
+        threading.Thread(target=helper.set_setting, args=("web", "option{0}".format(i), str(i)))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    config = helper.open_config()
+    assert [config.get("web", "option{0}".format(i)).value for i in range(8)] == [
+        str(i) for i in range(8)
+    ]
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import fitz
+import pytest
+
+from model.carriers.registry import get_registry
+from model.doc.session import DocSession, Level
+
+
+CONCEPT = [
+    ["Concept Special Risks Ltd", "Temporary Binder", "Assured:", "Jane Doe", "Period of Cover:",
+     "From 00.01 1 March 2024 to 1 March 2025", "Total Premium:",
+     "US$12,500.00 cancelling US$50.00 Certificate fee", "Declaration Number:", "CSR-24-0012"],
+    ["Insurance Providers", "Schedule of underwriters"],
+    ["1. Definitions", "Vessel means the yacht described in the schedule"],
+]
+
+YACHTINSURE = [
+    ["www.yachtinsure.com", "Declarations page", "Insured: Bob Smith", "Date: 3/4/2024",
+     "Policy Number: YI-98765 issued"],
+    ["Total Amount Due: USD 1,500.00", "Total Amount Due: USD 75.00"],
+]
+
+
+def make_doc(path: Path, pages: list[list[str]]) -> Path:
+    doc = fitz.open()
+    for blocks in pages:
+        page = doc.new_page()
+        for i, block in enumerate(blocks):
+            page.insert_textbox(fitz.Rect(50, 40 + 30 * i, 560, 64 + 30 * i), block, fontsize=9)
+    doc.save(path)
+    return path
+
+
+def parse(path: Path) -> tuple[str, dict[int, Level]]:
+    with DocSession(path) as session:
+        market = get_registry().build(session.first_pages(3), path, session)
+        market.get_user_doc_type()
+        market.get_client_name()
+        market.get_eff_date()
+        market.get_policy_nums()
+        market.get_premiums()
+        return str(market), session.levels
+
+
+@pytest.mark.parametrize(
+    "pages, result, levels",
+    [
+        (
+            CONCEPT,
+            "Concept: doc_type=binder, client=Jane Doe, effective=03/01/2024, "
+            "policy number(s)=['CSR-24-0012'], premium(s)=[12550.0]",
+            # Page 1 is never read,  and page 3 only asked whether it has the definitions.
+            {0: Level.SORTED, 2: Level.RAW},
+        ),
+        (
+            YACHTINSURE,
+            "Yachtinsure: doc_type=policy, client=Bob Smith, effective=03/04/2024, "
+            "policy number(s)=['YI-98765'], premium(s)=[1500.0, 75.0]",
+            {0: Level.SORTED, 1: Level.SORTED},
+        ),
+    ],
+    ids=["concept", "yachtinsure"],
+)
+def test_each_page_is_extracted_only_as_far_as_the_steps_need(tmp_path, pages, result, levels):
+    path = make_doc(tmp_path / "doc.pdf", pages)
+    found, extracted = parse(path)
+    assert extracted == levels
+    assert found == result
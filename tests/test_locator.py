@@ -0,0 +1,75 @@
+from concurrent.futures import Future
+
+import fitz
+import pytest
+
+from model.doc.locator import PageLocator
+from model.doc.session import DocSession, Level
+
+NEEDLE = "DECLARATIONS"
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    """Twelve pages. Page 1 mentions the needle inside a longer block,  pages 5 and 9 have it as a block
+    of its own."""
+    path = tmp_path / "kemah.pdf"
+    doc = fitz.open()
+    for index in range(12):
+        page = doc.new_page()
+        blocks = ["Policy wording, page {0}".format(index + 1)]
+        if index == 1:
+            blocks.append("Refer to the {0} page for limits".format(NEEDLE))
+        if index in (5, 9):
+            blocks.append(NEEDLE)
+        for i, block in enumerate(blocks):
+            page.insert_textbox(fitz.Rect(50, 40 + 40 * i, 560, 60 + 40 * i), block, fontsize=9)
+    doc.save(path)
+    return path
+
+
+class HeldBack:
+    "An executor that runs the first `ready` submissions straight away and never starts the rest."
+
+    def __init__(self, ready: int) -> None:
+        self.ready = ready
+        self.futures: list[Future] = []
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        if len(self.futures) < self.ready:
+            future.set_result(fn(*args))
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+
+def test_raw_text_match_without_the_block_is_skipped(pdf):
+    with DocSession(pdf) as session:
+        assert NEEDLE in session.page(1, Level.RAW)[0]
+        assert PageLocator().find(session, NEEDLE, 0, 4) is None
+        assert PageLocator().find(session, NEEDLE, 0, 11) == 5
+        # Only the pages whose raw text passed were split into blocks,  and none were sorted.
+        assert {index for index, level in session.levels.items() if level != Level.RAW} == {1, 5}
+
+
+def test_parallel_finds_the_same_first_page_as_serial(pdf):
+    parallel = PageLocator(workers=2, min_pages=1, chunk_size=4)
+    try:
+        for start in (0, 6):
+            with DocSession(pdf) as serial_session, DocSession(pdf) as parallel_session:
+                expected = PageLocator().find(serial_session, NEEDLE, start, 11)
+                assert parallel.find(parallel_session, NEEDLE, start, 11) == expected
+                assert expected == (5 if start == 0 else 9)
+    finally:
+        parallel.close()
+
+
+def test_chunks_after_the_first_match_are_cancelled(pdf):
+    locator = PageLocator(workers=2, min_pages=1, chunk_size=2)
+    locator._executor = executor = HeldBack(ready=3)
+    with DocSession(pdf) as session:
+        assert locator.find(session, NEEDLE, 0, 11) == 5
+    assert [future.cancelled() for future in executor.futures] == [False] * 3 + [True] * 3
@@ -0,0 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import SimpleNamespace
+import sqlite3
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from exceptions.surplus_lines import EstimatorError
+from model import automation
+from model.web import cache as cache_module
+from model.web import policy as policy_module
+from model.web.cache import EstimatorCache
+from model.web.calculator import calculate
+from model.web.deadline import Deadline
+from model.web.policy import CircuitBreaker, WebCallPolicy
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+
+
+@dataclass
+class Payload:
+    uri: str = "https://estimator.invalid/"
+
+
+class HangingDriver:
+    "A webdriver whose page loads never finish,  until the browser is quit out from under them."
+
+    def __init__(self, slot: int) -> None:
+        self.gone = threading.Event()
+
+    def execute_script(self, script: str):
+        if self.gone.is_set():
+            raise WebDriverException("browser is gone")
+        return 1
+
+    def set_page_load_timeout(self, timeout: float) -> None:
+        pass
+
+    def get(self, uri: str) -> None:
+        self.gone.wait()
+        raise WebDriverException("browser is gone")
+
+    def quit(self) -> None:
+        self.gone.set()
+
+
+def policy(deadline: float, retries: int = 0) -> WebCallPolicy:
+    return WebCallPolicy(
+        deadline=deadline, retries=retries, backoff=0, breaker=CircuitBreaker(failure_threshold=10)
+    )
+
+
+def test_deadline_runs_callbacks_once_when_expired():
+    deadline = Deadline(60)
+    released = []
+    deadline.on_expire(lambda: released.append("session"))
+    assert deadline.cap(5) == 5
+    deadline.expire()
+    deadline.expire()
+    assert released == ["session"]
+    deadline.on_expire(lambda: released.append("late"))
+    assert released == ["session", "late"]
+
+
+def test_timed_out_call_is_told_to_let_go_and_the_retry_gets_a_fresh_deadline():
+    deadlines: list[Deadline] = []
+    released = threading.Event()
+
+    def call(payloads, deadline):
+        deadlines.append(deadline)
+        if len(deadlines) == 1:
+            deadline.on_expire(released.set)
+            released.wait(timeout=5)
+            raise RuntimeError("abandoned")
+        return ["response"]
+
+    p = policy(deadline=0.05, retries=1)
+    assert p.run(call, [Payload()]) == (["response"], False)
+    assert released.is_set()
+    assert deadlines[0].expired and not deadlines[1].expired
+    assert p.state()["timeouts"] == 1
+
+
+def test_timeout_raises_estimator_error_without_a_fallback():
+    p = policy(deadline=0.01)
+    with pytest.raises(EstimatorError):
+        p.run(lambda payloads, deadline: threading.Event().wait(1), [Payload()])
+
+
+def test_time_queued_for_a_worker_is_not_taken_out_of_the_deadline():
+    p = policy(deadline=0.5)
+    p._executor = ThreadPoolExecutor(max_workers=1)
+    p._executor.submit(time.sleep, 0.3)
+    left = []
+
+    def call(payloads, deadline):
+        left.append(deadline.remaining())
+        time.sleep(0.3)
+        return ["response"]
+
+    # Queued 0.3s,  then runs 0.3s: over the deadline in all,  but the call itself isn't.
+    assert p.run(call, [Payload()]) == (["response"], False)
+    assert left[0] > 0.4
+
+
+def test_call_that_never_gets_a_worker_is_cancelled():
+    p = policy(deadline=0.05)
+    p._executor = ThreadPoolExecutor(max_workers=1)
+    busy = threading.Event()
+    p._executor.submit(busy.wait, 5)
+    calls = []
+    with pytest.raises(EstimatorError, match="No worker was free"):
+        p.run(lambda payloads, deadline: calls.append(deadline), [Payload()])
+    busy.set()
+    p._executor.shutdown(wait=True)
+    assert calls == []
+    assert p.state()["timeouts"] == 1
+
+
+def test_expired_deadline_frees_the_stuck_browser_for_the_next_checkout():
+    pool = DriverPool(HangingDriver, size=1, checkout_timeout=0.05)
+    deadline = Deadline(60)
+    driver = Driver(
+        pool=pool,
+        eager=False,
+        scripted=False,
+        block_requests=False,
+        lean_profile=False,
+        report_page_weight=False,
+        engine="edge",
+        deadline=deadline,
+    )
+    errors = []
+
+    def send():
+        try:
+            driver.send_call(Payload())
+        except WebDriverException as e:
+            errors.append(e)
+
+    stuck = threading.Thread(target=send)
+    stuck.start()
+    while driver.session is None:
+        stuck.join(timeout=0.01)
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+    deadline.expire()
+    stuck.join(timeout=5)
+    assert not stuck.is_alive() and errors
+    fresh = pool.checkout()
+    assert not fresh.driver.gone.is_set()
+
+
+def test_checkout_waits_no_longer_than_the_deadline():
+    pool = DriverPool(HangingDriver, size=1, checkout_timeout=60)
+    pool.checkout()
+    driver = Driver(pool=pool, engine="edge", deadline=Deadline(0.05))
+    with pytest.raises(TimeoutError):
+        driver.send_call(Payload())
+
+
+@pytest.fixture
+def tripped(tmp_path, monkeypatch):
+    "Stamps against a fresh estimator cache,  with the breaker open and shadow mode on."
+    cache = EstimatorCache(tmp_path / "estimator.sqlite3", ttl_days=1)
+    monkeypatch.setattr(automation, "get_cache", lambda: cache)
+    monkeypatch.setattr(policy_module, "get_cache", lambda: cache)
+    monkeypatch.setattr(
+        automation,
+        "get_setting",
+        lambda section, option, fallback=None: "true" if option == "shadow" else fallback,
+    )
+    shadowed = []
+    monkeypatch.setattr(automation, "shadow_compare", lambda payload, response: shadowed.append(payload))
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+
+    def stamp(fallback: str):
+        p = WebCallPolicy(retries=0, breaker=breaker, fallback=fallback)
+        monkeypatch.setattr(automation, "get_policy", lambda: p)
+        automator = automation.Automator()
+        automator.carrier_obj = SimpleNamespace(
+            client_name="Bob Smith", eff_date="03/01/2024", exp_date="03/01/2025"
+        )
+        producer = SimpleNamespace(pname="", paddress="", city_st_zip="")
+        return automator.perform_web_calls([PAYLOAD], producer)
+
+    return SimpleNamespace(cache=cache, shadowed=shadowed, stamp=stamp)
+
+
+PAYLOAD = automation.Payload(
+    policy_num="YI-98765", premium=1000.0, eff_date="03/01/2024", transaction_type="1"
+)
+
+
+def rows(cache: EstimatorCache) -> list[tuple]:
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT key, created, last_used FROM responses").fetchall()
+
+
+def test_stale_cache_fallback_is_not_cached_as_fresh(tripped, monkeypatch):
+    clock = SimpleNamespace(time=lambda: 1_700_000_000.0)
+    monkeypatch.setattr(cache_module, "time", clock)
+    tripped.cache.put(PAYLOAD, calculate(PAYLOAD))
+    clock.time = lambda: 1_700_000_000.0 + 2 * 86400
+    (_, created, _), = rows(tripped.cache)
+    assert tripped.stamp("cache")[0]["total_cost"] == "1,050.00"
+    (_, still_created, _), = rows(tripped.cache)
+    assert still_created == created
+    # Still expired: the next stamp tries the estimator again instead of trusting it.
+    assert tripped.cache.get(PAYLOAD) is None
+    assert tripped.shadowed == []
+
+
+def test_local_fallback_is_not_cached(tripped):
+    assert tripped.stamp("local")[0]["total_cost"] == "1,050.00"
+    assert rows(tripped.cache) == []
+    assert tripped.shadowed == []
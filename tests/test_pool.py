@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from model.web.pool import DriverPool, get_pool, shutdown_pool
+
+
+class FakeDriver:
+    "Stands in for a browser's webdriver: answers the health check until it's told it's gone."
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+        self.healthy = True
+        self.quit_calls = 0
+
+    def execute_script(self, script: str):
+        if not self.healthy:
+            raise WebDriverException("browser is gone")
+        return 1
+
+    def quit(self) -> None:
+        self.quit_calls += 1
+
+
+class Launcher:
+    def __init__(self) -> None:
+        self.launched: list[FakeDriver] = []
+
+    def __call__(self, slot: int) -> FakeDriver:
+        driver = FakeDriver(slot)
+        self.launched.append(driver)
+        return driver
+
+
+@pytest.fixture
+def launcher() -> Launcher:
+    return Launcher()
+
+
+def test_checkin_keeps_the_session_warm_for_the_next_checkout(launcher):
+    pool = DriverPool(launcher, size=1)
+    session = pool.checkout()
+    pool.checkin(session)
+    assert pool.checkout() is session
+    assert len(launcher.launched) == 1
+    assert session.calls == 1
+
+
+def test_sessions_are_launched_up_to_size_on_their_own_slots(launcher):
+    pool = DriverPool(launcher, size=2)
+    first, second = pool.checkout(), pool.checkout()
+    assert {first.slot, second.slot} == {0, 1}
+    assert len(launcher.launched) == 2
+
+
+def test_checkout_times_out_when_every_session_is_out(launcher):
+    pool = DriverPool(launcher, size=1, checkout_timeout=0.05)
+    pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.01)
+
+
+def test_checkout_waits_for_a_checkin(launcher):
+    pool = DriverPool(launcher, size=1)
+    session = pool.checkout()
+    threading.Timer(0.05, pool.checkin, (session,)).start()
+    assert pool.checkout(timeout=5) is session
+
+
+def test_session_is_recycled_after_max_calls(launcher):
+    pool = DriverPool(launcher, size=1, max_calls=2)
+    session = pool.checkout()
+    pool.checkin(session)
+    assert pool.checkout() is session
+    pool.checkin(session)
+    assert session.driver.quit_calls == 1
+    replacement = pool.checkout()
+    assert replacement is not session
+    assert replacement.slot == session.slot
+
+
+def test_discarded_session_is_quit_and_its_slot_freed(launcher):
+    pool = DriverPool(launcher, size=1, checkout_timeout=0.05)
+    session = pool.checkout()
+    pool.checkin(session, discard=True)
+    assert session.driver.quit_calls == 1
+    assert pool.checkout() is not session
+
+
+def test_unhealthy_session_is_replaced_on_checkout(launcher):
+    pool = DriverPool(launcher, size=1)
+    session = pool.checkout()
+    pool.checkin(session)
+    session.driver.healthy = False
+    replacement = pool.checkout()
+    assert replacement is not session
+    assert session.driver.quit_calls == 1
+    assert len(launcher.launched) == 2
+
+
+def test_close_quits_idle_sessions_and_refuses_checkouts(launcher):
+    pool = DriverPool(launcher, size=2)
+    idle, out = pool.checkout(), pool.checkout()
+    pool.checkin(idle)
+    pool.close()
+    assert idle.driver.quit_calls == 1
+    pool.checkin(out)
+    assert out.driver.quit_calls == 1
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+
+
+def test_get_pool_keeps_a_pool_per_launch_key(launcher):
+    try:
+        edge = get_pool(launcher, key=("edge", True))
+        assert get_pool(Launcher(), key=("edge", True)) is edge
+        firefox = get_pool(launcher, key=("firefox", True))
+        assert firefox is not edge
+    finally:
+        shutdown_pool()
+    assert edge._closed and firefox._closed
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from model.carriers import registry
+from model.carriers.registry import CARRIERS, CarrierPlugin, CarrierRegistry, plugins_from
+
+
+PLUGIN = """
+from model.carriers.base import CarrierBuilder
+from model.carriers.registry import CarrierPlugin
+from model.carriers.signatures import Signature
+
+
+class PluggedBuilder(CarrierBuilder):
+    def __init__(self, pdf_path, pages, session=None):
+        super().__init__(pdf_path, pages, session)
+        self.name = "Plugged"
+
+
+CARRIERS = (CarrierPlugin("Plugged", "plugged_carrier:PluggedBuilder", (Signature("Plugged", ("PLUGGED",)),)),)
+"""
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch) -> str:
+    "A carrier plugin module outside model/carriers,  the way [parser] carrier_plugins lists them."
+    (tmp_path / "plugged_carrier.py").write_text(PLUGIN)
+    monkeypatch.syspath_prepend(tmp_path)
+    monkeypatch.delitem(sys.modules, "plugged_carrier", raising=False)
+    return "plugged_carrier"
+
+
+@pytest.fixture
+def unimported(monkeypatch):
+    "Forgets the builder modules,  so the test sees which ones get imported."
+    modules = [plugin.builder.partition(":")[0] for plugin in CARRIERS]
+    for module in modules:
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    return modules
+
+
+def test_builders_are_imported_only_when_their_carrier_matches(unimported):
+    carriers = CarrierRegistry()
+    assert not any(module in sys.modules for module in unimported)
+    builder = carriers.build([["www.yachtinsure.com", "Declarations page"]], Path("doc.pdf"))
+    assert builder.name == "Yachtinsure"
+    assert [module in sys.modules for module in unimported] == [False, False, True]
+
+
+def test_builder_class_is_imported_once(unimported):
+    carriers = CarrierRegistry()
+    first = carriers.builder_class("Concept")
+    del sys.modules[unimported[0]]
+    assert carriers.builder_class("Concept") is first
+    assert unimported[0] not in sys.modules
+
+
+def test_unmatched_page_builds_nothing(unimported):
+    assert CarrierRegistry().build([["Declarations page"]], Path("doc.pdf")) is None
+    assert not any(module in sys.modules for module in unimported)
+
+
+def test_plugins_are_checked():
+    concept = CARRIERS[0]
+    with pytest.raises(ValueError, match="twice"):
+        CarrierRegistry([concept, concept])
+    with pytest.raises(ValueError, match="signature"):
+        CarrierRegistry([CarrierPlugin("Other", concept.builder, concept.signatures)])
+
+
+def test_plugin_modules_add_carriers_after_the_built_in_ones(plugin):
+    carriers = CarrierRegistry(CARRIERS + tuple(plugins_from([plugin])))
+    builder = carriers.build([["PLUGGED", "Concept Special Risks"]], Path("doc.pdf"))
+    assert type(builder).__name__ == "PluggedBuilder"
+    # Built-in carriers keep precedence within a block.
+    assert carriers.identify(["PLUGGED Concept Special Risks"]).carrier == "Concept"
+
+
+def test_get_registry_reads_the_plugin_setting(plugin, monkeypatch):
+    monkeypatch.setattr(registry, "_registry", None)
+    monkeypatch.setattr(registry, "get_setting", lambda section, option, fallback: " {0} , ".format(plugin))
+    assert list(registry.get_registry().plugins) == ["Concept", "Kemah", "Yachtinsure", "Plugged"]
+    assert registry.get_registry() is registry.get_registry()
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import fitz
+import pytest
+
+from exceptions import surplus_lines as exceptions
+from model.carriers.base import CarrierBuilder
+from model.carriers.rules import Extractor, Rule
+from model.doc.parser import DocParser
+from model.doc.session import DocSession
+
+
+class Builder(CarrierBuilder):
+    anchors = ("Insured:", "Policy Number")
+    rules = Extractor((
+        Rule("client_name", "Insured:", ("policy",)),
+        Rule("policy_nums", "Policy Number", which="all", pattern=r":\s*(\S*)"),
+        Rule("eff_date", "Effective:", ("policy",), required=False),
+    ))
+
+    def __init__(self, pages: list[list[str]]) -> None:
+        super().__init__(Path("doc.pdf"), pages)
+        self.name = "Test"
+        self.user_doc_type = "policy"
+
+
+def test_rules_fill_the_builder():
+    builder = Builder([["Insured: Bob Smith", "Policy Number: P-1 issued", "Policy Number: P-2"]])
+    assert builder.rules.apply(builder, "client_name") == "Bob Smith"
+    builder.rules.apply(builder, "policy_nums")
+    assert builder.policy_nums == ["P-1", "P-2"]
+    assert builder.rules.apply(builder, "eff_date") is None
+
+
+def test_missing_required_value_is_a_doc_parse_error():
+    builder = Builder([["Named: Bob Smith"]])
+    with pytest.raises(exceptions.DocParseError):
+        builder.rules.apply(builder, "client_name")
+    builder.user_doc_type = "quote"
+    with pytest.raises(exceptions.DocParseError):
+        builder.rules.apply(builder, "client_name")
+
+
+def test_malformed_rule_is_a_value_error():
+    with pytest.raises(ValueError):
+        Extractor([Rule("client_name", "Insured:", which="middle")])
+
+
+def test_missing_anchor_reaches_the_parsers_doc_parse_error_path(tmp_path):
+    "What automation.parse_doc catches: a Yachtinsure policy with its 'Insured:' block gone."
+    path = tmp_path / "yachtinsure.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, block in enumerate(
+        ["www.yachtinsure.com", "Declarations page", "Date: 3/4/2024", "Policy Number: YI-98765",
+         "Total Amount Due: USD 1,500.00"]
+    ):
+        page.insert_textbox(fitz.Rect(50, 40 + 24 * i, 560, 60 + 24 * i), block, fontsize=9)
+    doc.save(path)
+    with DocSession(path) as session:
+        parser = DocParser(pdf_path=path, session=session)
+        assert parser.market.name == "Yachtinsure"
+        with pytest.raises(exceptions.DocParseError) as raised:
+            parser.build_market_class(path, override_not_applicable=True)
+    assert raised.value.file_name == "yachtinsure.pdf"
@@ -0,0 +1,127 @@
+"""Driver tests against the stand-in estimator. The ones on a real browser skip where none can be launched."""
+from dataclasses import dataclass, replace
+import logging
+
+import pytest
+
+from model.web import scraper
+from model.web.pool import DriverPool
+from model.web.scraper import Driver
+
+
+@dataclass(frozen=True)
+class Payload:
+    uri: str = ""
+    eff_date: str = "06/01/2024"
+    coverage_code: str = "3006"
+    transaction_type: str = "1"
+    tax_status: str = "0"
+    premium: str = "1000.00"
+    policy_fee: str = "50.00"
+
+
+# Each payload shares most of its fields with the one before,  so the batch only retypes a few.
+PAYLOADS = [
+    Payload(),
+    Payload(policy_fee="25.00"),
+    Payload(policy_fee="25.00", transaction_type="2"),
+    Payload(eff_date="12/31/2022", premium="-250.00", policy_fee="25.00", transaction_type="2"),
+    Payload(eff_date="12/31/2022", premium="-250.00", policy_fee="25.00", transaction_type="2"),
+    Payload(),
+]
+
+
+@pytest.fixture
+def payloads(stand_in) -> list[Payload]:
+    return [replace(payload, uri=stand_in.uri) for payload in PAYLOADS]
+
+
+def make_driver(browser, **kwargs) -> Driver:
+    pool, engine = browser
+    settings = dict(
+        eager=True,
+        scripted=False,
+        block_requests=False,
+        lean_profile=False,
+        report_page_weight=False,
+    )
+    settings.update(kwargs)
+    return Driver(pool=pool, engine=engine, **settings)
+
+
+def single(driver: Driver, payload: Payload):
+    driver.send_call(payload)
+    try:
+        return driver.get_response()
+    finally:
+        driver.close()
+
+
+def test_batch_returns_what_one_call_per_payload_does(browser, payloads):
+    driver = make_driver(browser)
+    assert driver.send_batch(payloads) == [single(driver, payload) for payload in payloads]
+
+
+@pytest.mark.parametrize("batch", [False, True], ids=["single", "batch"])
+def test_scripted_fill_and_read_match_element_by_element(browser, payloads, batch, caplog):
+    by_element = make_driver(browser)
+    scripted = make_driver(browser, scripted=True)
+    with caplog.at_level(logging.DEBUG, logger="model.web.scraper"):
+        if batch:
+            got = scripted.send_batch(payloads)
+        else:
+            got = [single(scripted, payload) for payload in payloads]
+    assert got == [single(by_element, payload) for payload in payloads]
+    assert "with one script" in caplog.text
+    assert "falling back" not in caplog.text
+
+
+def test_scripted_falls_back_when_the_page_does_not_match(browser, payloads, monkeypatch, caplog):
+    # What the scripts would find on a redesigned page: the fill checks before touching anything.
+    monkeypatch.setattr(scraper, "FILL_AND_SUBMIT_JS", 'return {error: "missing btnSubmit"};')
+    monkeypatch.setattr(scraper, "READ_RESULTS_JS", 'throw new Error("no result table");')
+    scripted = make_driver(browser, scripted=True)
+    with caplog.at_level(logging.WARNING, logger="model.web.scraper"):
+        got = single(scripted, payloads[0])
+    assert got == single(make_driver(browser), payloads[0])
+    assert "Scripted form fill couldn't run (missing btnSubmit)" in caplog.text
+    assert "Scripted result read failed" in caplog.text
+
+
+class FormPage:
+    "Just enough of a webdriver on the estimator form to submit it."
+
+    def __init__(self, slot: int = 0) -> None:
+        self.scripts: list[str] = []
+
+    def find_element(self, by=None, value=None):
+        return value
+
+    def execute_script(self, script: str, *args):
+        self.scripts.append(script)
+        return {"changed": len(args[0])} if script is scraper.FILL_AND_SUBMIT_JS else None
+
+
+@pytest.mark.parametrize(
+    "scripted, logged",
+    [(True, "submitted the form with one script"), (False, "Submitted the form from the submit btn")],
+)
+def test_logs_the_path_that_submitted(scripted, logged, caplog):
+    driver = Driver(
+        pool=DriverPool(FormPage),
+        eager=True,
+        scripted=scripted,
+        block_requests=False,
+        lean_profile=False,
+        report_page_weight=False,
+        engine="edge",
+    )
+    driver.driver = FormPage()
+    if not scripted:
+        # Element by element,  only the submit is of interest here.
+        driver._set_fields = lambda payload, only_changed: 7
+    with caplog.at_level(logging.DEBUG, logger="model.web.scraper"):
+        assert driver._fill(Payload()) == 7
+    assert logged in caplog.text
+    assert "Scrolled into view" not in caplog.text
+    assert len(driver.driver.scripts) == 1
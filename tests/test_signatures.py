@@ -0,0 +1,57 @@
+import pytest
+
+from model.carriers.registry import CARRIERS
+from model.carriers.signatures import CarrierIdentifier, Signature
+
+
+def if_elif(blocks: list[str]) -> str | None:
+    "The parser's identify_mrkt before signatures were declared as data."
+    for block in blocks:
+        if "Concept Special Risks" in block:
+            return "Concept"
+        elif "Company:" in block and "Sutton" in block:
+            return "Kemah"
+        elif "KMYSS" in block:
+            return "Kemah"
+        elif "yachtinsure" in block.lower():
+            return "Yachtinsure"
+    return None
+
+
+PAGES = {
+    "concept": ["Temporary Binder", "Concept Special Risks Ltd", "Assured:"],
+    "kemah_sutton": ["Insurance Company: Sutton Specialty", "Named Insured: John Doe"],
+    "kemah_kmyss": ["Binder", "KMYSS Recreational Yacht"],
+    "yachtinsure": ["www.YachtInsure.com", "Declarations page"],
+    "company_and_sutton_apart": ["Company: Acme", "Sutton Place"],
+    "concept_before_kemah": ["Concept Special Risks", "KMYSS"],
+    "kemah_before_concept": ["KMYSS", "Concept Special Risks"],
+    "same_block": ["KMYSS by Concept Special Risks via yachtinsure"],
+    "wrong_case": ["concept special risks", "kmyss"],
+    "nothing": ["Declarations page", "Total Amount Due: USD 1,500.00"],
+    "empty": [],
+}
+
+
+@pytest.fixture(scope="module")
+def identifier() -> CarrierIdentifier:
+    return CarrierIdentifier(signature for plugin in CARRIERS for signature in plugin.signatures)
+
+
+@pytest.mark.parametrize("blocks", PAGES.values(), ids=PAGES.keys())
+def test_identifies_the_same_carrier_as_the_old_if_elif_chain(identifier, blocks):
+    match = identifier.identify(blocks)
+    assert (match.carrier if match else None) == if_elif(blocks)
+
+
+def test_identification_counts_every_carriers_matches(identifier):
+    match = identifier.identify(PAGES["concept_before_kemah"] + ["KMYSS"])
+    assert (match.carrier, match.block) == ("Concept", 0)
+    assert match.matches == {"Concept": 1, "Kemah": 2}
+    assert match.ambiguous and match.confidence == 0.33
+
+
+def test_phrases_must_share_a_block():
+    identifier = CarrierIdentifier([Signature("Kemah", ("Company:", "Sutton"))])
+    assert identifier.identify(["Company: Sutton"]).carrier == "Kemah"
+    assert identifier.identify(["Company:", "Sutton"]) is None
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from model.doc import text_cache as text_cache_module
+from model.doc.text_cache import EXTRACTION_VERSION, TextCache
+
+MB = 1024 * 1024
+
+
+class Clock:
+    "Stands in for the time module inside model.doc.text_cache,  so every access is a tick later."
+
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def time(self) -> float:
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(text_cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "text.sqlite3"
+
+
+def blocks(page: int) -> list[str]:
+    "A page's blocks,  100 bytes once stored."
+    text = ["Page {0}".format(page)]
+    return text + ["x" * (100 - len(json.dumps(text + [""])))]
+
+
+def test_pages_beyond_the_size_limit_are_dropped_least_recently_used_first(path):
+    cache = TextCache(path, max_mb=300 / MB)
+    for page in range(3):
+        cache.put("doc", page, blocks(page))
+    assert cache.get("doc", 0) == blocks(0)
+    cache.put("doc", 3, blocks(3))
+    assert cache.get("doc", 1) is None
+    assert [cache.get("doc", page) for page in (0, 2, 3)] == [blocks(0), blocks(2), blocks(3)]
+    assert cache.stats()["bytes"] == 300
+
+
+def test_page_count_goes_with_the_documents_last_page(path):
+    cache = TextCache(path, max_mb=100 / MB)
+    cache.put("old", 0, blocks(0))
+    cache.put_page_count("old", 1)
+    cache.put("new", 0, blocks(0))
+    assert cache.get("old", 0) is None
+    assert cache.page_count("old") is None
+
+
+def test_new_extraction_version_misses_what_the_old_one_stored(path):
+    old = TextCache(path)
+    old.put("doc", 0, blocks(0))
+    assert old.get("doc", 0) == blocks(0)
+    bumped = TextCache(path, version=EXTRACTION_VERSION + ".1")
+    assert bumped.get("doc", 0) is None
+    assert bumped.stats() == {"hits": 0, "misses": 1, "hit_rate": 0.0, "entries": 0, "bytes": 0}
+    bumped.put("doc", 0, ["re-extracted"])
+    assert TextCache(path, version=EXTRACTION_VERSION + ".1").get("doc", 0) == ["re-extracted"]
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+
+import pytest
+import urllib3
+
+from exceptions.surplus_lines import EstimatorError
+from model.web.scraper import Response
+from model.web.stand_in import RESULTS
+from model.web.transport import EstimatorFormParser, HttpDriver
+
+
+@dataclass
+class Payload:
+    uri: str
+    eff_date: str = "06/01/2024"
+    coverage_code: str = "3006"
+    transaction_type: str = "1"
+    tax_status: str = "0"
+    premium: str = "1000.00"
+    policy_fee: str = "50.00"
+
+
+class RecordingPool(urllib3.PoolManager):
+    "Keeps every request made through it and the response it got back."
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: list[tuple[str, dict]] = []
+        self.responses: list[urllib3.BaseHTTPResponse] = []
+
+    def request(self, method, url, **kwargs):
+        r = super().request(method, url, **kwargs)
+        self.calls.append((method, kwargs))
+        self.responses.append(r)
+        return r
+
+
+def test_posts_the_payload_and_reads_the_result_table(stand_in):
+    driver = HttpDriver(http=RecordingPool())
+    driver.send_call(Payload(stand_in.uri))
+    assert driver.get_response() == Response(
+        tax="$51.87", service="$0.63", subtotal_fees="$52.50", total="$1,102.50"
+    )
+
+
+def test_sends_the_verification_token_and_cookie_back(stand_in):
+    http = RecordingPool()
+    HttpDriver(http=http).send_call(Payload(stand_in.uri))
+    (get, _), (post, sent) = http.calls
+    assert (get, post) == ("GET", "POST")
+    form = EstimatorFormParser()
+    form.feed(http.responses[0].data.decode())
+    token = form.hidden["__RequestVerificationToken"]
+    assert token
+    assert sent["fields"]["__RequestVerificationToken"] == token
+    assert sent["fields"]["Premium"] == "1000.00"
+    assert sent["headers"]["Cookie"] == "__RequestVerificationToken={0}".format(token)
+
+
+def test_missing_result_table_raises(stand_in):
+    # The stand-in leaves the results off when it can't read the premium,  like the live site.
+    driver = HttpDriver(http=RecordingPool())
+    with pytest.raises(EstimatorError):
+        driver.send_batch([Payload(stand_in.uri), Payload(stand_in.uri, premium="abc")])
+    driver.send_call(Payload(stand_in.uri, premium="abc"))
+    with pytest.raises(EstimatorError):
+        driver.get_response()
+
+
+def test_partial_result_table_raises():
+    driver = HttpDriver(http=RecordingPool())
+    table = RESULTS.format(
+        tax="$1.00", tax_rate="", service="$2.00", service_rate="", subtotal_fees="$3.00", total=""
+    )
+    driver.page = table.replace("<tr><td>Total Cost</td><td></td></tr>", "")
+    with pytest.raises(EstimatorError, match="total"):
+        driver.get_response()
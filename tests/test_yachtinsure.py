@@ -0,0 +1,72 @@
+"""Regression tests for the Yachtinsure builder,  against block lists shaped like its documents.
+
+Two scans changed behaviour when the builder moved onto the PageIndex,  and are pinned here:
+
+    - a cancellation's client name comes from its "Insured Name/ Company:" block. The old check was
+      missing its `in block`,  so it read whatever followed "Company:" in the page's last block.
+    - policy numbers go in `policy_nums`. They used to be appended to `premiums`.
+"""
+from pathlib import Path
+
+import pytest
+
+from model.carriers.builders.yachtinsure import YachtinsureBuilder
+
+
+POLICY = [
+    ["www.yachtinsure.com", "Declarations page", "Insured: Bob Smith", "Date: 3/4/2024",
+     "Policy Number: YI-98765 issued", "Issuing Company: Yachtinsure Ltd"],
+    ["Schedule of premiums", "Total Amount Due: USD 1,500.00"],
+]
+
+CANCELLATION = [
+    ["www.yachtinsure.com", "CANCELLATION ENDORSEMENT", "Insured Name/ Company: Sea Breeze LLC",
+     "Endorsement Effective: 05/01/2024", "Date: 04/20/2024", "Policy Number: YI-98765 issued",
+     "Issuing Company: Yachtinsure Ltd"],
+    ["Total Return Premium: USD -250.00 refunded to the insured"],
+]
+
+QUOTE = [
+    ["www.yachtinsure.com", "QUOTATION", "Insured: Ann Lee", "Date: June 3, 2024",
+     "Quote Number: Q-555 valid for 30 days"],
+    ["Total Amount Due: USD 2,100.50", "Total Amount Due: USD 75.00"],
+]
+
+
+def build(pages: list[list[str]]) -> YachtinsureBuilder:
+    builder = YachtinsureBuilder(Path("yachtinsure.pdf"), pages)
+    builder.get_user_doc_type()
+    builder.get_client_name()
+    builder.get_eff_date()
+    builder.get_policy_nums()
+    builder.get_premiums()
+    return builder
+
+
+@pytest.mark.parametrize(
+    "pages, expected",
+    [
+        (POLICY, ("policy", "Bob Smith", "03/04/2024", ["YI-98765"], [1500.0])),
+        (CANCELLATION, ("cancel", "Sea Breeze LLC", "05/01/2024", ["YI-98765"], [-250.0])),
+        (QUOTE, ("quote", "Ann Lee", "06/03/2024", ["Q-555"], [2100.5, 75.0])),
+    ],
+    ids=["policy", "cancellation", "quote"],
+)
+def test_fields(pages, expected):
+    builder = build(pages)
+    assert (
+        builder.user_doc_type,
+        builder.client_name,
+        builder.eff_date,
+        builder.policy_nums,
+        builder.premiums,
+    ) == expected
+
+
+def test_cancellation_client_name_ignores_other_company_blocks():
+    assert build(CANCELLATION).client_name != "Yachtinsure Ltd"
+
+
+def test_policy_numbers_stay_out_of_premiums():
+    builder = build(POLICY)
+    assert all(isinstance(premium, float) for premium in builder.premiums)